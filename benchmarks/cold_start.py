@@ -0,0 +1,164 @@
+"""Cold start to first vibration: headless CLI path vs the GUI path.
+
+Each run spawns a fresh interpreter and times from spawn until the child
+reports that its first motor frame was handed to the output. The headless
+child follows ``python -m dualsensual play``; the GUI child follows
+``src/main.py`` (QApplication, stylesheet, MainWindow) and then starts a
+pattern as the power toggle would. No controller is needed: the connect
+attempt is made and its result ignored.
+
+Usage::
+
+    python benchmarks/cold_start.py [--runs 10] [--json results.json]
+"""
+
+from pathlib import Path
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+MARKER = "first-frame"
+
+
+def _report(first_frame: threading.Event) -> None:
+    """Print the marker once the first frame is out, with loaded-module info."""
+    first_frame.wait(10.0)
+    print(
+        MARKER,
+        json.dumps({"qt_loaded": "PyQt6" in sys.modules, "modules": len(sys.modules)}),
+        flush=True,
+    )
+
+
+def child_headless() -> None:
+    """Start a pattern the way the CLI does."""
+    from controller.dualsense_manager import DualSenseManager
+    from controller.engine_core import EngineCore
+    from controller.patterns import PatternType
+
+    first_frame = threading.Event()
+    DualSenseManager().connect()
+    engine = EngineCore()
+    engine.telemetry.set_notify(first_frame.set)
+    engine.start_vibration(128, PatternType.CONSTANT)
+    _report(first_frame)
+    engine.shutdown()
+
+
+def child_gui() -> None:
+    """Start a pattern the way the GUI does after launch."""
+    from PyQt6.QtCore import QTimer
+    from PyQt6.QtWidgets import QApplication
+
+    from main import load_stylesheet
+    from controller.dualsense_manager import DualSenseManager
+    from controller.patterns import PatternType
+    from ui.main_window import MainWindow
+
+    app = QApplication(sys.argv[:1])
+    load_stylesheet(app)
+    window = MainWindow()
+    window.show()
+    DualSenseManager().connect()
+
+    engine = window._engine
+    first_frame = threading.Event()
+
+    def on_frame(_intensity: int) -> None:
+        first_frame.set()
+        _report(first_frame)
+        engine.stop_vibration()
+        app.quit()
+
+    engine.intensity_updated.connect(on_frame)
+    QTimer.singleShot(0, lambda: engine.start_vibration(128, PatternType.CONSTANT))
+    app.exec()
+    window.close()
+
+
+def measure(mode: str) -> dict:
+    """Spawn one child and time it to the first frame."""
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC), env.get("PYTHONPATH")]))
+
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, __file__, "--child", mode],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        env=env,
+        text=True,
+    )
+    elapsed = None
+    info = {}
+    for line in process.stdout:
+        if line.startswith(MARKER):
+            elapsed = time.perf_counter() - start
+            info = json.loads(line[len(MARKER):])
+            break
+    process.stdout.close()
+    process.wait(10.0)
+    if elapsed is None:
+        raise RuntimeError(f"{mode} child exited with {process.returncode} before a frame")
+    return {"seconds": elapsed, **info}
+
+
+def summarize(samples: list[dict]) -> dict:
+    seconds = [sample["seconds"] for sample in samples]
+    return {
+        "runs": len(seconds),
+        "median_ms": statistics.median(seconds) * 1000,
+        "min_ms": min(seconds) * 1000,
+        "max_ms": max(seconds) * 1000,
+        "qt_loaded": samples[0]["qt_loaded"],
+        "modules": samples[0]["modules"],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--child", choices=("headless", "gui"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child == "headless":
+        child_headless()
+        return 0
+    if args.child == "gui":
+        child_gui()
+        return 0
+
+    results = {}
+    for mode in ("headless", "gui"):
+        try:
+            results[mode] = summarize([measure(mode) for _ in range(args.runs)])
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            results[mode] = {"error": str(e)}
+
+    for mode, result in results.items():
+        if "error" in result:
+            print(f"{mode:>8}: {result['error']}")
+        else:
+            print(
+                f"{mode:>8}: median {result['median_ms']:.1f} ms "
+                f"(min {result['min_ms']:.1f}, max {result['max_ms']:.1f}), "
+                f"{result['modules']} modules, PyQt6 loaded: {result['qt_loaded']}"
+            )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
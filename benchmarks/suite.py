@@ -0,0 +1,523 @@
+"""Benchmark suite: pattern generation, mixing, output cost, jitter and latency.
+
+Results are written as JSON so releases can be compared::
+
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --compare results.json
+
+No controller is needed; output goes to a SimulatedBackend. Metrics whose
+name ends in ``_per_sec`` are better when higher, all others when lower.
+The slider latency part is skipped when PyQt6 is not installed.
+"""
+
+from pathlib import Path
+from typing import Callable
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+from controller.dualsense_device import DualSenseDevice  # noqa: E402
+from controller.dualsense_manager import DualSenseManager  # noqa: E402
+from controller.mixer import Layer, Mix, MixCursor  # noqa: E402
+from controller.resampler import Interpolation  # noqa: E402
+from controller.engine_core import EngineCore  # noqa: E402
+from controller.engine_process import EngineProcess  # noqa: E402
+from controller.output_frame import OutputFrame  # noqa: E402
+from controller.realtime import RealtimeProfile  # noqa: E402
+from controller.patterns import (  # noqa: E402
+    LIVE_PATTERNS,
+    PatternCursor,
+    PatternType,
+    compile_pattern,
+    get_pattern_generator,
+)
+from controller.simulated_backend import SimulatedBackend  # noqa: E402
+
+
+PATTERNS = [pattern for pattern in PatternType if pattern not in LIVE_PATTERNS]
+
+
+def _percentiles(values: list[float]) -> dict:
+    """Summarize samples (already in the unit the caller wants)."""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+
+    def pick(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    return {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": ordered[-1],
+    }
+
+
+def _best_rate(run: Callable[[int], None], count: int, repeats: int = 5) -> float:
+    """Run ``run(count)`` several times and return the best calls per second."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run(count)
+        best = min(best, time.perf_counter() - start)
+    return count / best
+
+
+def bench_patterns(steps: int) -> dict:
+    """Step throughput of the generators and compiled tables, and compile cost."""
+    results = {}
+    for pattern in PATTERNS:
+        def generator_steps(count: int) -> None:
+            generator = get_pattern_generator(pattern, 200)
+            for _ in range(count):
+                next(generator)
+
+        def table_steps(count: int) -> None:
+            cursor = PatternCursor(compile_pattern(pattern, 200))
+            for _ in range(count):
+                cursor.advance(cursor.remaining)
+
+        compile_times = []
+        for intensity in range(0, 256, 8):
+            compile_pattern.cache_clear()
+            start = time.perf_counter()
+            compile_pattern(pattern, intensity)
+            compile_times.append((time.perf_counter() - start) * 1e6)
+
+        results[pattern.name.lower()] = {
+            "generator_steps_per_sec": _best_rate(generator_steps, steps),
+            "table_steps_per_sec": _best_rate(table_steps, steps),
+            "compile_us": statistics.median(compile_times),
+        }
+    return results
+
+
+def bench_mixer(steps: int) -> dict:
+    """Tick throughput of a mix as layers are added."""
+    results = {}
+    for count in (1, 4, 16):
+        layers = [Layer(PATTERNS[i % len(PATTERNS)], 1.0 / count) for i in range(count)]
+        mix = Mix(layers)
+
+        def ticks(total: int) -> None:
+            cursor = MixCursor(mix)
+            for _ in range(total):
+                cursor.advance(cursor.step)
+
+        results[f"layers_{count}"] = {"ticks_per_sec": _best_rate(ticks, steps)}
+    return results
+
+
+def bench_set_motors(calls: int) -> dict:
+    """Cost of set_motors for changed frames, unchanged frames and the manager."""
+    backend = SimulatedBackend(capacity=1024)
+    device = DualSenseDevice(backend=backend)
+    device.open()
+
+    def changing(count: int) -> None:
+        for i in range(count):
+            device.set_motors(i & 0xFF, 255 - (i & 0xFF))
+
+    def unchanged(count: int) -> None:
+        for _ in range(count):
+            device.set_motors(100, 100)
+
+    manager = DualSenseManager()
+    manager.use_backend(SimulatedBackend(capacity=1024))
+    manager.connect()
+
+    def through_manager(count: int) -> None:
+        for i in range(count):
+            manager.set_motors(i & 0xFF, 255 - (i & 0xFF))
+
+    results = {
+        "device_changed_ns": 1e9 / _best_rate(changing, calls),
+        "device_unchanged_ns": 1e9 / _best_rate(unchanged, calls),
+        "manager_changed_ns": 1e9 / _best_rate(through_manager, calls),
+    }
+    manager.use_backend(None)
+    device.close()
+    return results
+
+
+class _RecordingOutput:
+    """MotorOutput that records every set_motors call, changed or not."""
+
+    def __init__(self, backend: SimulatedBackend) -> None:
+        self._backend = backend
+
+    def set_motors(self, left: int, right: int) -> None:
+        self._backend.write(OutputFrame(left, right))
+
+    def stop_motors(self) -> None:
+        pass
+
+
+def bench_worker_jitter(seconds: float, write_latency: float) -> dict:
+    """Deviation of the worker's writes from each pattern's requested timing."""
+    results = {}
+    for pattern in (PatternType.WAVE, PatternType.HEARTBEAT):
+        backend = SimulatedBackend(capacity=1 << 16, latency=write_latency)
+        backend.open()
+        engine = EngineCore(output=_RecordingOutput(backend))
+        engine.start_vibration(200, pattern)
+        time.sleep(seconds)
+        engine.shutdown()
+        stats = engine.timing_stats
+
+        times = backend.timestamps()
+        durations = compile_pattern(pattern, 200).durations
+        lateness = []
+        interval_error = []
+        expected = 0.0
+        for k in range(1, len(times)):
+            step = durations[(k - 1) % len(durations)]
+            expected += step
+            actual = (times[k] - times[0]) / 1e9
+            lateness.append((actual - expected) * 1e6)
+            interval_error.append(abs((times[k] - times[k - 1]) / 1e9 - step) * 1e6)
+
+        results[pattern.name.lower()] = {
+            "frames": len(times),
+            "drift_us": _percentiles(lateness),
+            "interval_error_us": _percentiles(interval_error),
+            "dropped_steps": stats.dropped,
+            "resyncs": stats.resyncs,
+        }
+    return results
+
+
+def bench_output_rate(seconds: float) -> dict:
+    """Process CPU time of playing Wave as the output rate rises."""
+    results = {}
+    for rate in (None, 50.0, 100.0, 250.0, 500.0, 1000.0):
+        backend = SimulatedBackend(capacity=1 << 16)
+        device = DualSenseDevice(backend=backend)
+        device.open()
+        engine = EngineCore(output=device)
+        engine.set_output(rate, Interpolation.CUBIC)
+        engine.start_vibration(200, PatternType.WAVE)
+        # Let compilation and the first steps settle before measuring
+        time.sleep(0.2)
+        writes = backend.writes
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        time.sleep(seconds)
+        cpu = time.process_time() - cpu
+        wall = time.perf_counter() - wall
+        writes = backend.writes - writes
+        engine.shutdown()
+        device.close()
+
+        results["steps" if rate is None else f"{rate:g}_hz"] = {
+            "cpu_percent": 100 * cpu / wall,
+            "frames_sent_per_sec": writes / wall,
+            "max_lateness_ms": engine.timing_stats.max_lateness * 1e3,
+        }
+    return results
+
+
+def bench_control_updates(seconds: float) -> dict:
+    """Setter throughput and output timing while settings change nonstop."""
+    backend = SimulatedBackend(capacity=1 << 16)
+    device = DualSenseDevice(backend=backend)
+    device.open()
+    engine = EngineCore(output=device)
+    engine.set_output(1000.0)
+    engine.start_vibration(200, PatternType.WAVE)
+    time.sleep(0.2)
+
+    updates = 0
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    while time.perf_counter() < deadline:
+        engine.set_intensity(100 + updates % 100)
+        engine.set_balance((updates % 64) / 32 - 1)
+        updates += 2
+    wall = time.perf_counter() - start
+    engine.shutdown()
+    device.close()
+    return {
+        "updates_per_sec": updates / wall,
+        "max_lateness_ms": engine.timing_stats.max_lateness * 1e3,
+    }
+
+
+def _churn(stop: threading.Event) -> None:
+    """Allocate cyclic garbage in bursts, like a busy UI or server thread."""
+    while not stop.is_set():
+        for _ in range(2000):
+            node = {}
+            node["self"] = node
+        time.sleep(0.001)
+
+
+def bench_realtime(seconds: float) -> dict:
+    """Output timing at 500 Hz under load, with and without the real-time profile.
+
+    The load is a large long-lived heap (so full collections are slow), a
+    thread making cyclic garbage, and one busy process per CPU.
+    """
+    heap = [{"index": i, "items": [i]} for i in range(500_000)]
+    stop = threading.Event()
+    churn = threading.Thread(target=_churn, args=(stop,), daemon=True)
+    churn.start()
+    hogs = [
+        subprocess.Popen([sys.executable, "-c", "while True: pass"])
+        for _ in range(os.cpu_count() or 1)
+    ]
+    results = {}
+    try:
+        for name, profile in (("default", None), ("realtime", RealtimeProfile())):
+            backend = SimulatedBackend(capacity=1 << 16)
+            backend.open()
+            engine = EngineCore(output=_RecordingOutput(backend))
+            engine.set_output(500.0)
+            engine.set_realtime(profile)
+            collections = sum(stat["collections"] for stat in gc.get_stats())
+            engine.start_vibration(200, PatternType.CONSTANT)
+            time.sleep(seconds)
+            engine.shutdown()
+            collections = sum(stat["collections"] for stat in gc.get_stats()) - collections
+
+            times = backend.timestamps()
+            interval_error = [
+                abs((times[k] - times[k - 1]) / 1e9 - 0.002) * 1e6 for k in range(1, len(times))
+            ]
+            status = engine.realtime_status
+            results[name] = {
+                "frames": len(times),
+                "interval_error_us": _percentiles(interval_error),
+                "max_lateness_ms": engine.timing_stats.max_lateness * 1e3,
+                "dropped_steps": engine.timing_stats.dropped,
+                "gc_collections": collections,
+                "profile": status.describe() if status is not None else "none",
+            }
+    finally:
+        for hog in hogs:
+            hog.kill()
+            hog.wait()
+        stop.set()
+        churn.join()
+    del heap
+    return results
+
+
+def _gui_load(seconds: float) -> None:
+    """Hold the GIL in Python bytecode in bursts, like painting and signal dispatch."""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        burst = time.perf_counter() + 0.02
+        while time.perf_counter() < burst:
+            sum(i * i for i in range(100))
+        time.sleep(0.002)
+
+
+def bench_engine_process(seconds: float) -> dict:
+    """Output timing at 500 Hz while this process keeps its GIL busy, per engine placement."""
+    results = {}
+
+    backend = SimulatedBackend(capacity=1 << 16)
+    device = DualSenseDevice(backend=backend)
+    device.open()
+    engine = EngineCore(output=device)
+    engine.set_output(500.0)
+    engine.start_vibration(200, PatternType.CONSTANT)
+    _gui_load(seconds)
+    engine.shutdown()
+    device.close()
+    results["in_process"] = engine.timing_stats
+
+    for name, profile in (("child_process", None), ("child_process_realtime", RealtimeProfile())):
+        process = EngineProcess(simulate=True, realtime=profile)
+        process.start()
+        process.set_output(500.0)
+        process.start_vibration(200, PatternType.CONSTANT)
+        _gui_load(seconds)
+        process.stop_vibration()
+        results[name] = process.timing_stats
+        process.shutdown()
+
+    return {
+        name: {
+            "steps": stats.steps,
+            "mean_lateness_us": stats.mean_lateness * 1e6,
+            "max_lateness_ms": stats.max_lateness * 1e3,
+            "dropped_steps": stats.dropped,
+        }
+        for name, stats in results.items()
+    }
+
+
+def bench_slider_latency(trials: int) -> dict:
+    """Time from an IntensitySlider change to the first frame carrying it."""
+    try:
+        from PyQt6.QtWidgets import QApplication
+    except ImportError:
+        return {"skipped": "PyQt6 is not installed"}
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from ui.main_window import MainWindow
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    window = MainWindow()
+    # The hot-plug monitor would disconnect the simulated controller
+    window._status_display.shutdown()
+
+    backend = SimulatedBackend(capacity=1024)
+    manager = DualSenseManager()
+    manager.use_backend(backend)
+    manager.connect()
+
+    slider = window._intensity_slider
+    slider.value = 50
+    window._power_toggle.set_checked(True, animated=False)
+    app.processEvents()
+
+    latencies = []
+    timeouts = 0
+    rng = random.Random(0)
+    for trial in range(trials):
+        percent = 30 if trial % 2 else 70
+        target = int(percent * 255 / 100)
+        # Land at a random phase of the engine tick
+        time.sleep(rng.uniform(0.0, 0.06))
+        writes = backend.writes
+        start = time.perf_counter_ns()
+        slider.value = percent
+        deadline = start + 1_000_000_000
+        while time.perf_counter_ns() < deadline:
+            if backend.writes != writes:
+                record = backend.records()[-1]
+                if record[1] == target:
+                    latencies.append((record[0] - start) / 1e6)
+                    break
+                writes = backend.writes
+            time.sleep(0.0001)
+        else:
+            timeouts += 1
+
+    window._power_toggle.set_checked(False, animated=False)
+    window.close()
+    app.processEvents()
+    manager.use_backend(None)
+    return {"latency_ms": _percentiles(latencies), "timeouts": timeouts}
+
+
+def _metadata() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=SRC, capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def _flatten(data: dict, prefix: str = "") -> dict[str, float]:
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """List metrics that got worse by more than ``threshold`` (a fraction)."""
+    before = _flatten(baseline.get("results", {}))
+    after = _flatten(current.get("results", {}))
+    regressions = []
+    for name, old in before.items():
+        new = after.get(name)
+        if new is None or old == 0 or name.endswith(".count") or name.endswith(".frames"):
+            continue
+        higher_is_better = name.endswith("_per_sec")
+        change = (new - old) / abs(old)
+        if (change < -threshold) if higher_is_better else (change > threshold):
+            regressions.append(f"{name}: {old:.4g} -> {new:.4g} ({change:+.0%})")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed regression")
+    parser.add_argument("--steps", type=int, default=200_000, help="pattern steps per run")
+    parser.add_argument("--calls", type=int, default=100_000, help="set_motors calls per run")
+    parser.add_argument("--jitter-seconds", type=float, default=10.0, help="per pattern")
+    parser.add_argument("--rate-seconds", type=float, default=3.0, help="per output rate")
+    parser.add_argument("--control-seconds", type=float, default=3.0, help="setter burst")
+    parser.add_argument("--realtime-seconds", type=float, default=5.0, help="per profile")
+    parser.add_argument("--process-seconds", type=float, default=5.0, help="per placement")
+    parser.add_argument("--write-latency", type=float, default=0.0, help="simulated seconds")
+    parser.add_argument("--trials", type=int, default=50, help="slider changes")
+    parser.add_argument(
+        "--only", nargs="+",
+        choices=(
+            "patterns", "mixer", "set_motors", "jitter", "output_rate", "control", "realtime",
+            "engine_process", "slider",
+        ),
+    )
+    args = parser.parse_args()
+
+    parts = {
+        "patterns": lambda: bench_patterns(args.steps),
+        "mixer": lambda: bench_mixer(args.steps),
+        "set_motors": lambda: bench_set_motors(args.calls),
+        "jitter": lambda: bench_worker_jitter(args.jitter_seconds, args.write_latency),
+        "output_rate": lambda: bench_output_rate(args.rate_seconds),
+        "control": lambda: bench_control_updates(args.control_seconds),
+        "realtime": lambda: bench_realtime(args.realtime_seconds),
+        "engine_process": lambda: bench_engine_process(args.process_seconds),
+        "slider": lambda: bench_slider_latency(args.trials),
+    }
+    results = {}
+    for name, run in parts.items():
+        if args.only and name not in args.only:
+            continue
+        print(f"running {name}...", file=sys.stderr)
+        results[name] = run()
+
+    report = {"meta": _metadata(), "results": results}
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
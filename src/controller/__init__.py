@@ -1,5 +1,75 @@
 from controller.dualsense_manager import DualSenseManager
-from controller.vibration_engine import VibrationEngine
 from controller.patterns import PatternType, get_pattern_generator
 
-__all__ = ["DualSenseManager", "VibrationEngine", "PatternType", "get_pattern_generator"]
+__all__ = [
+    "DualSenseManager",
+    "DualSenseDevice",
+    "DevicePool",
+    "EngineCore",
+    "EngineProcess",
+    "EngineStatus",
+    "Channel",
+    "FrameCompositor",
+    "ControlState",
+    "SimulatedBackend",
+    "VibrationEngine",
+    "PatternType",
+    "PatternTable",
+    "compile_pattern",
+    "get_pattern_generator",
+    "Timeline",
+    "import_script",
+    "RealtimeProfile",
+    "Recording",
+    "SessionRecorder",
+    "read_recording",
+    "ProgramTimeline",
+    "Segment",
+    "Layer",
+    "Mix",
+    "Route",
+    "InputPipeline",
+]
+
+# Everything else is imported on first use, so importing the package stays
+# cheap (VibrationEngine also needs PyQt6)
+_LAZY = {
+    "DualSenseDevice": "controller.dualsense_device",
+    "DevicePool": "controller.device_pool",
+    "EngineCore": "controller.engine_core",
+    "EngineProcess": "controller.engine_process",
+    "EngineStatus": "controller.engine_process",
+    "Channel": "controller.compositor",
+    "FrameCompositor": "controller.compositor",
+    "ControlState": "controller.control_state",
+    "SimulatedBackend": "controller.simulated_backend",
+    "VibrationEngine": "controller.vibration_engine",
+    "PatternTable": "controller.patterns",
+    "compile_pattern": "controller.patterns",
+    "Timeline": "controller.timeline",
+    "import_script": "controller.timeline",
+    "RealtimeProfile": "controller.realtime",
+    "Recording": "controller.recorder",
+    "SessionRecorder": "controller.recorder",
+    "read_recording": "controller.recorder",
+    "ProgramTimeline": "controller.sequencer",
+    "Segment": "controller.sequencer",
+    "Layer": "controller.mixer",
+    "Mix": "controller.mixer",
+    "Route": "controller.mixer",
+    "InputPipeline": "controller.input_pipeline",
+}
+
+
+def __getattr__(name: str):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
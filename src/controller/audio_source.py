@@ -0,0 +1,320 @@
+"""Audio-reactive motor source driven by low- and high-band envelopes."""
+
+from dataclasses import dataclass, replace
+from typing import BinaryIO, Callable, Optional
+import queue
+import sys
+import threading
+import time
+import wave
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, only audio sources need it
+    np = None
+
+
+@dataclass
+class AudioStats:
+    """Audio pipeline statistics; latencies in seconds."""
+    blocks: int = 0
+    underruns: int = 0
+    played: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        """Get the average latency from audio block read to motor write."""
+        if self.played == 0:
+            return 0.0
+        return self.total_latency / self.played
+
+
+class AudioSource:
+    """Turns a PCM stream into (left, right) motor frames in real time.
+
+    A reader thread processes fixed-size blocks with NumPy into reused
+    buffers: the block is mixed to mono, windowed, transformed with an FFT
+    and reduced to a low-band (left motor) and high-band (right motor)
+    envelope. Frames go through a bounded queue to the vibration worker,
+    which plays one per block. End-to-end latency is roughly
+    ``queue_size * block_size / sample_rate``.
+    """
+
+    def __init__(
+        self,
+        read: Callable[[memoryview], int],
+        sample_rate: int,
+        channels: int = 2,
+        sample_width: int = 2,
+        block_size: int = 1024,
+        queue_size: int = 2,
+        low_band: tuple[float, float] = (20.0, 150.0),
+        high_band: tuple[float, float] = (1000.0, 6000.0),
+        attack: float = 0.6,
+        release: float = 0.15,
+        noise_floor: float = 0.01,
+    ) -> None:
+        """Create an audio source.
+
+        Args:
+            read: Function that fills a buffer with PCM bytes and returns the
+                byte count (0 at end of stream)
+            sample_rate: Samples per second
+            channels: Interleaved channel count
+            sample_width: Bytes per sample (1 = unsigned 8-bit, 2 or 4 signed)
+            block_size: Frames per processed block
+            queue_size: Blocks buffered between reader and worker
+            low_band: Frequency range in Hz for the left motor
+            high_band: Frequency range in Hz for the right motor
+            attack: Envelope smoothing factor for rising levels (0-1)
+            release: Envelope smoothing factor for falling levels (0-1)
+            noise_floor: Band level, relative to a full-scale sine, below
+                which the auto-gain stops boosting
+
+        Raises:
+            RuntimeError: If NumPy is not installed
+            ValueError: If the sample width is unsupported
+        """
+        if np is None:
+            raise RuntimeError("Audio sources require NumPy (pip install numpy)")
+        dtypes = {1: np.uint8, 2: np.int16, 4: np.int32}
+        if sample_width not in dtypes:
+            raise ValueError(f"Unsupported sample width: {sample_width}")
+
+        self._read = read
+        self._sample_rate = sample_rate
+        self._block_size = block_size
+        self._block_duration = block_size / sample_rate
+        self._attack = attack
+        self._release = release
+
+        # Buffers reused for every block
+        self._raw = bytearray(block_size * channels * sample_width)
+        self._raw_view = memoryview(self._raw)
+        self._samples = np.frombuffer(self._raw, dtype=dtypes[sample_width]).reshape(
+            block_size, channels
+        )
+        self._offset = 128.0 if sample_width == 1 else 0.0
+        full_scale = float(1 << (8 * sample_width - 1))
+        # Hann-windowed FFT magnitude of a full-scale sine is about N/4
+        self._floor = noise_floor * full_scale * block_size / 4
+        self._mono = np.empty(block_size, dtype=np.float64)
+        self._window = np.hanning(block_size)
+
+        freqs = np.fft.rfftfreq(block_size, 1.0 / sample_rate)
+        self._low_mask = (freqs >= low_band[0]) & (freqs < low_band[1])
+        self._high_mask = (freqs >= high_band[0]) & (freqs < high_band[1])
+
+        self._queue: queue.Queue[tuple[float, int, int]] = queue.Queue(maxsize=queue_size)
+        self._stats = AudioStats()
+        self._eof = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_wav(cls, path: str, **kwargs) -> "AudioSource":
+        """Create a source that plays a WAV file.
+
+        Args:
+            path: WAV file path
+            **kwargs: Block and band options for AudioSource
+        """
+        reader = wave.open(path, "rb")
+        frame_bytes = reader.getsampwidth() * reader.getnchannels()
+        ended = False
+
+        def read(buffer: memoryview) -> int:
+            nonlocal ended
+            if ended:
+                return 0
+            data = reader.readframes(len(buffer) // frame_bytes)
+            if not data:
+                ended = True
+                reader.close()
+            buffer[:len(data)] = data
+            return len(data)
+
+        return cls(
+            read,
+            reader.getframerate(),
+            channels=reader.getnchannels(),
+            sample_width=reader.getsampwidth(),
+            **kwargs,
+        )
+
+    @classmethod
+    def from_pipe(
+        cls, stream: Optional[BinaryIO] = None, sample_rate: int = 44100, **kwargs
+    ) -> "AudioSource":
+        """Create a source that reads raw interleaved PCM from a pipe.
+
+        Args:
+            stream: Binary stream (defaults to stdin)
+            sample_rate: Samples per second
+            **kwargs: Format, block and band options for AudioSource
+        """
+        stream = stream if stream is not None else sys.stdin.buffer
+        return cls(stream.readinto, sample_rate, **kwargs)
+
+    @property
+    def block_duration(self) -> float:
+        """Get the length of one block in seconds."""
+        return self._block_duration
+
+    @property
+    def at_eof(self) -> bool:
+        """Check if the stream has ended and every frame was consumed."""
+        return self._eof.is_set() and self._queue.empty()
+
+    @property
+    def stats(self) -> AudioStats:
+        """Get a snapshot of the pipeline statistics."""
+        return replace(self._stats)
+
+    def start(self) -> None:
+        """Start reading and processing audio in the background."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="AudioSource", daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        """Stop the reader thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+
+    def _fill(self) -> int:
+        """Read one block, looping over short reads from pipes."""
+        view = self._raw_view
+        filled = 0
+        while filled < len(view):
+            count = self._read(view[filled:])
+            if not count:
+                break
+            filled += count
+        if 0 < filled < len(view):
+            view[filled:] = bytes(len(view) - filled)
+        return filled
+
+    def _run(self) -> None:
+        """Reader loop."""
+        low_env = high_env = 0.0
+        low_peak = high_peak = self._floor
+        peak_decay = 0.999
+
+        while not self._stop.is_set():
+            if not self._fill():
+                break
+            captured = time.perf_counter()
+
+            # Mono mix into the reused float buffer, then window it
+            np.mean(self._samples, axis=1, out=self._mono)
+            if self._offset:
+                self._mono -= self._offset
+            self._mono *= self._window
+            spectrum = np.abs(np.fft.rfft(self._mono))
+
+            low = float(spectrum[self._low_mask].sum())
+            high = float(spectrum[self._high_mask].sum())
+
+            # Auto-gain against slowly decaying peaks
+            low_peak = max(low, low_peak * peak_decay, self._floor)
+            high_peak = max(high, high_peak * peak_decay, self._floor)
+            low_level = low / low_peak
+            high_level = high / high_peak
+
+            low_env += (low_level - low_env) * (
+                self._attack if low_level > low_env else self._release
+            )
+            high_env += (high_level - high_env) * (
+                self._attack if high_level > high_env else self._release
+            )
+
+            frame = (captured, int(low_env * 255), int(high_env * 255))
+            self._stats.blocks += 1
+            while not self._stop.is_set():
+                try:
+                    self._queue.put(frame, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+        self._eof.set()
+
+    def next_frame(self) -> Optional[tuple[int, int]]:
+        """Take the next processed frame (called by the output loop).
+
+        Returns:
+            (left, right) values, or None if no block is ready
+        """
+        try:
+            captured, left, right = self._queue.get_nowait()
+        except queue.Empty:
+            if not self._eof.is_set():
+                self._stats.underruns += 1
+            return None
+
+        latency = time.perf_counter() - captured
+        stats = self._stats
+        stats.played += 1
+        stats.total_latency += latency
+        if latency > stats.max_latency:
+            stats.max_latency = latency
+        return left, right
+
+
+class AudioCursor:
+    """Plays an AudioSource one block per step.
+
+    Has the same stepping interface as PatternCursor; intensity is applied
+    as a gain. On an underrun the previous values are held.
+    """
+
+    __slots__ = ("source", "gain", "remaining", "left", "right", "finished", "_raw")
+
+    def __init__(self, source: AudioSource, gain: int = 255) -> None:
+        """Create a cursor.
+
+        Args:
+            source: Started audio source
+            gain: Output scale (0-255)
+        """
+        self.source = source
+        self.gain = gain
+        self.remaining = source.block_duration
+        self.left = 0
+        self.right = 0
+        self.finished = False
+        self._raw = (0, 0)
+        self._next()
+
+    def seek(self, position: float) -> None:
+        """Live sources cannot seek; kept for interface compatibility."""
+
+    def set_gain(self, gain: int) -> None:
+        """Change the output scale."""
+        self.gain = gain
+        self.left = self._raw[0] * gain // 255
+        self.right = self._raw[1] * gain // 255
+
+    def _next(self) -> None:
+        frame = self.source.next_frame()
+        if frame is None:
+            if self.source.at_eof:
+                self.finished = True
+                self.left = self.right = 0
+            return
+        self._raw = frame
+        self.set_gain(self.gain)
+
+    def advance(self, elapsed: float) -> None:
+        """Advance by elapsed seconds, taking a new block at each boundary."""
+        remaining = self.remaining - elapsed
+        while remaining <= 1e-9 and not self.finished:
+            self._next()
+            remaining += self.source.block_duration
+        self.remaining = remaining
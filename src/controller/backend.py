@@ -0,0 +1,39 @@
+"""Interface between DualSenseDevice and the hardware (or a stand-in)."""
+
+from typing import Protocol
+
+from controller.output_frame import OutputFrame
+
+
+class DeviceBackend(Protocol):
+    """Writes complete output frames to one controller.
+
+    DualSenseDevice does staging, change detection and keep-alive on top of
+    a backend; the backend only opens the device and sends frames.
+
+    A backend may also have a ``blocking`` attribute: False when write()
+    returns without waiting on the device, so a DevicePool writes it on
+    the calling thread. Backends without one are treated as blocking.
+    """
+
+    @property
+    def is_open(self) -> bool:
+        """Check if the device is open."""
+        ...
+
+    @property
+    def is_alive(self) -> bool:
+        """Check if the open device is still attached."""
+        ...
+
+    def open(self) -> None:
+        """Open the device (raises if it cannot be opened)."""
+        ...
+
+    def close(self) -> None:
+        """Close the device."""
+        ...
+
+    def write(self, frame: OutputFrame) -> None:
+        """Send one frame as a single report (raises on failure)."""
+        ...
@@ -0,0 +1,166 @@
+"""Merge rumble, trigger, lightbar and player LED channels into one frame."""
+
+from enum import Flag
+from typing import Optional
+
+from controller.output_frame import OutputFrame, TriggerEffect, STOP_FRAME
+
+
+class Channel(Flag):
+    """Output channels a pattern can drive."""
+    RUMBLE = 1
+    LEFT_TRIGGER = 2
+    RIGHT_TRIGGER = 4
+    LIGHTBAR = 8
+    PLAYER_LEDS = 16
+
+    NONE = 0
+    TRIGGERS = LEFT_TRIGGER | RIGHT_TRIGGER
+    ALL = RUMBLE | LEFT_TRIGGER | RIGHT_TRIGGER | LIGHTBAR | PLAYER_LEDS
+
+
+# OutputFrame field carrying each non-rumble channel
+CHANNEL_FIELDS = {
+    "left_trigger": Channel.LEFT_TRIGGER,
+    "right_trigger": Channel.RIGHT_TRIGGER,
+    "lightbar": Channel.LIGHTBAR,
+    "player_leds": Channel.PLAYER_LEDS,
+}
+
+# Values restored when a pattern stops driving a channel (the pydualsense
+# defaults: triggers off, blue lightbar, first player LED)
+NEUTRAL_FIELDS = {
+    "left_trigger": TriggerEffect(),
+    "right_trigger": TriggerEffect(),
+    "lightbar": (0, 0, 255),
+    "player_leds": 0b00100,
+}
+
+# Shared by steps that drive no channel, so they allocate nothing
+_NOT_DRIVEN: dict[str, object] = {}
+
+
+class FrameCompositor:
+    """Build one OutputFrame per step from every channel's current value.
+
+    Rumble comes from the playing source. Other channels come from the
+    source's fields when ``mask`` lets it drive them, otherwise from static
+    values set with set_static(), otherwise they are left unchanged on the
+    controller. By default patterns drive the motors only; their trigger
+    and LED effects are opt-in (e.g. ``mask=Channel.ALL``).
+
+    A step that composes the same frame as the last one gets the same
+    OutputFrame back, so steady output allocates nothing.
+    """
+
+    def __init__(self, mask: Channel = Channel.RUMBLE) -> None:
+        """Create a compositor.
+
+        Args:
+            mask: Channels the playing source may drive
+        """
+        self.mask = mask
+        self._static: dict[str, object] = {}
+        self._driven: set[str] = set()
+        self._frame = STOP_FRAME
+
+    @property
+    def mask(self) -> Channel:
+        """Get the channels the playing source may drive."""
+        return self._mask
+
+    @mask.setter
+    def mask(self, mask: Channel) -> None:
+        """Set the channels the playing source may drive."""
+        self._mask = mask
+        # Resolved once here so compose() does no Flag arithmetic
+        self._rumble = bool(mask & Channel.RUMBLE)
+        self._field_names = tuple(
+            name for name, channel in CHANNEL_FIELDS.items() if mask & channel
+        )
+
+    @property
+    def field_names(self) -> tuple[str, ...]:
+        """Get the OutputFrame fields the playing source may drive."""
+        return self._field_names
+
+    @property
+    def static_fields(self) -> dict[str, object]:
+        """Get the values held on channels no pattern drives."""
+        return dict(self._static)
+
+    def set_static(self, **fields) -> None:
+        """Hold channels at fixed values while patterns do not drive them.
+
+        Args:
+            **fields: OutputFrame fields other than the motors (None releases one)
+        """
+        static = dict(self._static)
+        for name, value in fields.items():
+            if name not in CHANNEL_FIELDS:
+                raise ValueError(f"Not a compositor channel: {name}")
+            if value is None:
+                static.pop(name, None)
+            else:
+                static[name] = value
+        # Replaced whole, so the output thread never sees a partial update
+        self._static = static
+
+    def compose(
+        self, left: int, right: int, fields: Optional[dict[str, object]] = None
+    ) -> OutputFrame:
+        """Merge the channels for one step.
+
+        Args:
+            left: Left motor intensity (0-255)
+            right: Right motor intensity (0-255)
+            fields: Non-rumble fields driven by the playing source
+
+        Returns:
+            Frame carrying every channel
+        """
+        if not self._rumble:
+            left = right = 0
+        static = self._static
+        driven = _NOT_DRIVEN
+        if fields and self._field_names:
+            driven = {name: fields[name] for name in self._field_names if name in fields}
+            self._driven.update(driven)
+
+        # Channels a source drove and no longer does go back to their static
+        # value or the default; None would leave the last effect on
+        released = self._driven
+        frame = self._frame
+        if frame.left_motor == left and frame.right_motor == right:
+            for name in CHANNEL_FIELDS:
+                if name in driven:
+                    value = driven[name]
+                elif name in released:
+                    value = static.get(name, NEUTRAL_FIELDS[name])
+                else:
+                    value = static.get(name)
+                if getattr(frame, name) != value:
+                    break
+            else:
+                return frame
+        values = dict(static)
+        for name in released:
+            if name not in values:
+                values[name] = NEUTRAL_FIELDS[name]
+        values.update(driven)
+        frame = self._frame = OutputFrame(left, right, **values)
+        return frame
+
+    def release(self) -> OutputFrame:
+        """Get the frame that ends a run.
+
+        The motors stop and channels that were driven go back to their
+        static value, or to the controller default if there is none.
+        """
+        values = dict(self._static)
+        for name in self._driven:
+            if name not in values:
+                values[name] = NEUTRAL_FIELDS[name]
+        self._driven = set()
+        frame = self._frame = OutputFrame(0, 0, **values)
+        return frame
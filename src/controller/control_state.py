@@ -0,0 +1,139 @@
+"""Versioned control state shared between setters and the output thread."""
+
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING, Optional
+import threading
+
+from controller.frame_stream import FrameSlot
+from controller.mixer import Mix
+from controller.patterns import PatternType
+from controller.resampler import Interpolation
+from controller.timeline import Timeline
+
+if TYPE_CHECKING:
+    from controller.audio_source import AudioSource
+
+
+@dataclass(frozen=True)
+class ControlState:
+    """Every setting the output loop reads, as one immutable snapshot.
+
+    Attributes:
+        version: Incremented by every publish, so a reader can tell a new
+            snapshot from the one it last applied with one comparison
+        intensity: Motor intensity (0-255)
+        pattern_type: Pattern played when no timeline or mix is set
+        timeline: Timeline played instead of the pattern
+        timeline_loop: Restart the timeline when it ends
+        timeline_start: Position in seconds the timeline starts or seeks to
+        timeline_seek: Changes with every seek, so a seek to the same
+            position is still noticed
+        mix: Mix played instead of the pattern
+        audio_source: Source played by PatternType.AUDIO
+        frame_slot: Slot played by PatternType.STREAM
+        crossfade: Pattern crossfade window in seconds
+        balance: Left/right balance (-1 to 1)
+        max_step: Longest time in seconds between writes
+        output_rate: Rate in Hz motors are written at
+        interpolation: Curve between pattern steps at the output rate
+        slew_rate: Largest motor change per second
+        input_time: perf_counter time of the last controller input
+    """
+    version: int = 0
+    intensity: int = 128
+    pattern_type: PatternType = PatternType.CONSTANT
+    timeline: Optional[Timeline] = None
+    timeline_loop: bool = False
+    timeline_start: float = 0.0
+    timeline_seek: int = 0
+    mix: Optional[Mix] = None
+    audio_source: Optional["AudioSource"] = None
+    frame_slot: Optional[FrameSlot] = None
+    crossfade: float = 0.5
+    balance: float = 0.0
+    max_step: Optional[float] = None
+    output_rate: Optional[float] = None
+    interpolation: Interpolation = Interpolation.LINEAR
+    slew_rate: Optional[float] = None
+    input_time: Optional[float] = None
+
+    @property
+    def source(self) -> PatternType | Timeline | Mix:
+        """Get the active source (timeline, then mix, then pattern)."""
+        if self.timeline is not None:
+            return self.timeline
+        if self.mix is not None:
+            return self.mix
+        return self.pattern_type
+
+    @property
+    def output(self) -> tuple[Optional[float], Interpolation]:
+        """Get the settings that decide a compiled table's layout."""
+        return (self.output_rate, self.interpolation)
+
+
+_FIELDS = frozenset(f.name for f in fields(ControlState))
+
+
+def _next(current: ControlState, changes: dict) -> ControlState:
+    """Copy a snapshot with some fields changed and the version bumped.
+
+    Much cheaper than dataclasses.replace(), which runs __init__ again, so
+    setters stay fast enough to be called on every slider event.
+    """
+    unknown = changes.keys() - _FIELDS
+    if unknown:
+        raise TypeError(f"Unknown control fields: {', '.join(sorted(unknown))}")
+    state = object.__new__(ControlState)
+    values = state.__dict__
+    values.update(current.__dict__)
+    values.update(changes)
+    values["version"] = current.version + 1
+    return state
+
+
+class ControlBlock:
+    """Double-buffered holder of the current ControlState.
+
+    Writers build the next snapshot beside the current one and publish it
+    with a single reference assignment; the lock only orders writers among
+    themselves. Readers take ``block.state`` once and use that snapshot, so
+    they never block on a writer and never see half of an update.
+    """
+
+    def __init__(self, state: Optional[ControlState] = None) -> None:
+        """Create a block.
+
+        Args:
+            state: Initial snapshot (defaults to ControlState())
+        """
+        self.state = state if state is not None else ControlState()
+        self._write_lock = threading.Lock()
+
+    def publish(self, **changes) -> ControlState:
+        """Publish a snapshot with some settings changed.
+
+        Args:
+            **changes: ControlState fields to change
+
+        Returns:
+            The published snapshot
+        """
+        with self._write_lock:
+            state = _next(self.state, changes)
+            self.state = state
+        return state
+
+    def mark_input(self, timestamp: float, seen: Optional[float]) -> None:
+        """Stamp a controller input, keeping the oldest one not yet applied.
+
+        Args:
+            timestamp: perf_counter time the input arrived
+            seen: Stamp the reader applied last
+        """
+        with self._write_lock:
+            current = self.state
+            if current.input_time is not None and current.input_time != seen:
+                # An earlier input is still waiting for a write
+                return
+            self.state = _next(current, {"input_time": timestamp})
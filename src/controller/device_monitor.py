@@ -0,0 +1,127 @@
+"""Background hot-plug monitor for DualSense controllers."""
+
+from enum import Enum
+from typing import Callable, Optional
+import threading
+
+from controller.dualsense_device import DeviceInfo, enumerate_dualsense
+from controller.dualsense_manager import DualSenseManager
+
+
+class DeviceEvent(Enum):
+    """Hot-plug event type."""
+    CONNECTED = "Connected"
+    DISCONNECTED = "Disconnected"
+
+
+DeviceListener = Callable[[DeviceEvent, list[DeviceInfo]], None]
+
+
+class DeviceMonitor:
+    """Thread that enumerates HID devices and connects the manager.
+
+    Connect attempts that fail back off exponentially up to
+    ``max_backoff``. Listeners are called on the monitor thread.
+    """
+
+    def __init__(
+        self,
+        poll_interval: float = 2.0,
+        max_backoff: float = 30.0,
+        manager: Optional[DualSenseManager] = None,
+    ) -> None:
+        """Create a monitor.
+
+        Args:
+            poll_interval: Seconds between enumerations
+            max_backoff: Maximum seconds between failed connect attempts
+            manager: Manager to connect (defaults to the singleton)
+        """
+        self._poll_interval = poll_interval
+        self._max_backoff = max_backoff
+        self._manager = manager if manager is not None else DualSenseManager()
+        self._devices: list[DeviceInfo] = []
+        self._listeners: list[DeviceListener] = []
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def devices(self) -> list[DeviceInfo]:
+        """Get the devices found by the last enumeration."""
+        return list(self._devices)
+
+    def add_listener(self, listener: DeviceListener) -> None:
+        """Register a callback for connect and disconnect events."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: DeviceListener) -> None:
+        """Unregister a callback."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def start(self) -> None:
+        """Start monitoring in the background."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="DeviceMonitor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """Stop monitoring.
+
+        Args:
+            timeout: Seconds to wait for the thread to exit
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def poke(self) -> None:
+        """Probe immediately instead of waiting for the next poll."""
+        self._wake.set()
+
+    def _publish(self, event: DeviceEvent) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(event, self._devices)
+            except Exception:
+                pass
+
+    def _run(self) -> None:
+        """Monitor loop."""
+        manager = self._manager
+        delay = 0.0
+        backoff = self._poll_interval
+
+        while not self._stop.is_set():
+            self._wake.wait(delay)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+
+            try:
+                self._devices = enumerate_dualsense()
+            except Exception:
+                # HID enumeration failed, try again later
+                backoff = min(backoff * 2, self._max_backoff)
+                delay = backoff
+                continue
+
+            delay = self._poll_interval
+            if manager.is_connected:
+                if not self._devices or not manager.is_alive:
+                    manager.disconnect()
+                    self._publish(DeviceEvent.DISCONNECTED)
+            elif self._devices:
+                if manager.connect():
+                    backoff = self._poll_interval
+                    self._publish(DeviceEvent.CONNECTED)
+                else:
+                    backoff = min(backoff * 2, self._max_backoff)
+                    delay = backoff
@@ -0,0 +1,227 @@
+"""Pool of DualSense controllers with output fan-out."""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Optional
+import threading
+
+from controller.dualsense_device import DeviceInfo, DualSenseDevice, enumerate_dualsense
+from controller.output_frame import OutputFrame
+
+
+class DevicePool:
+    """Opens every attached DualSense and fans frames out to a selection.
+
+    Devices are addressed by serial number or HID path. Writes to devices
+    whose backend blocks are issued concurrently, so each added device does
+    not add its HID latency to every tick; the others are written serially
+    on the calling thread. The pool has the same ``set_motors`` /
+    ``stop_motors`` interface as DualSenseManager and can be passed to a
+    VibrationEngine as its output.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        """Create an empty pool.
+
+        Args:
+            max_workers: Threads used for fan-out (defaults to one per device)
+        """
+        self._devices: dict[bytes, DualSenseDevice] = {}
+        self._selected: Optional[tuple[DualSenseDevice, ...]] = None
+        # Immutable snapshots republished under _lock on every change, so
+        # the output thread never iterates the dict while it is mutated
+        self._all: tuple[DualSenseDevice, ...] = ()
+        self._targets_snapshot: tuple[DualSenseDevice, ...] = ()
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_workers = 0
+        self._lock = threading.Lock()
+
+    @property
+    def devices(self) -> list[DualSenseDevice]:
+        """Get all open devices."""
+        return list(self._all)
+
+    @property
+    def selected(self) -> list[DualSenseDevice]:
+        """Get the devices that receive fan-out writes."""
+        return list(self._targets())
+
+    def open_all(self) -> list[DualSenseDevice]:
+        """Open every attached controller that is not open yet.
+
+        Returns:
+            Newly opened devices
+        """
+        opened = []
+        with self._lock:
+            for info in enumerate_dualsense():
+                if info.path in self._devices:
+                    continue
+                device = DualSenseDevice(info)
+                try:
+                    device.open()
+                except Exception:
+                    continue
+                self._devices[info.path] = device
+                opened.append(device)
+            self._resize_executor()
+            self._publish()
+        return opened
+
+    def close_all(self) -> None:
+        """Stop and close every device."""
+        with self._lock:
+            for device in self._devices.values():
+                device.close()
+            self._devices.clear()
+            self._selected = None
+            self._publish()
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def prune(self) -> list[DeviceInfo]:
+        """Close devices that have been unplugged.
+
+        Returns:
+            Info of the removed devices
+        """
+        removed = []
+        with self._lock:
+            for path, device in list(self._devices.items()):
+                if not device.is_alive:
+                    device.close()
+                    del self._devices[path]
+                    removed.append(device.info)
+            if removed and self._selected is not None:
+                self._selected = tuple(d for d in self._selected if d.is_open)
+            self._publish()
+        return removed
+
+    def get(self, key: str | bytes) -> Optional[DualSenseDevice]:
+        """Find a device by serial number or HID path.
+
+        Args:
+            key: Serial number, or HID path as str or bytes
+
+        Returns:
+            The device, or None if it is not in the pool
+        """
+        path = key.encode() if isinstance(key, str) else key
+        device = self._devices.get(path)
+        if device is not None:
+            return device
+        for device in self._all:
+            if device.info is not None and device.info.serial_number == key:
+                return device
+        return None
+
+    def select(self, keys: Optional[Iterable[str | bytes]] = None) -> None:
+        """Choose which devices receive fan-out writes.
+
+        Args:
+            keys: Serial numbers or paths (None selects every device)
+
+        Raises:
+            KeyError: If a key does not match an open device
+        """
+        devices = None
+        if keys is not None:
+            devices = []
+            for key in keys:
+                device = self.get(key)
+                if device is None:
+                    raise KeyError(key)
+                devices.append(device)
+        with self._lock:
+            if devices is not None:
+                # Skip devices closed since they were looked up
+                devices = tuple(d for d in devices if d in self._all)
+            self._selected = devices
+            self._publish()
+
+    def _publish(self) -> None:
+        """Snapshot the devices and the fan-out targets (call under _lock)."""
+        self._all = tuple(self._devices.values())
+        self._targets_snapshot = self._selected if self._selected is not None else self._all
+
+    def _targets(self) -> tuple[DualSenseDevice, ...]:
+        return self._targets_snapshot
+
+    def _resize_executor(self) -> None:
+        """Keep one fan-out thread per device unless a limit was given."""
+        workers = self._max_workers or max(1, len(self._devices))
+        if self._executor is not None and self._executor_workers == workers:
+            return
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="DevicePool"
+        )
+        self._executor_workers = workers
+
+    def _fan_out(
+        self, write: Callable[[DualSenseDevice], bool], devices: tuple[DualSenseDevice, ...]
+    ) -> int:
+        """Run a write on each device and count successes.
+
+        Blocking devices go to the executor when there are at least two of
+        them; everything else is written on the calling thread meanwhile.
+        """
+        executor = self._executor
+        blocking = [device for device in devices if device.blocking]
+        if len(blocking) < 2 or executor is None:
+            return sum(bool(write(device)) for device in devices)
+        futures = []
+        try:
+            for device in blocking:
+                futures.append(executor.submit(write, device))
+        except RuntimeError:
+            # Shut down by a concurrent resize or close_all(); what was
+            # queued still runs, the rest is written here
+            pass
+        queued = blocking[:len(futures)]
+        written = sum(bool(write(device)) for device in devices if device not in queued)
+        return written + sum(bool(future.result()) for future in futures)
+
+    def write_frame(self, frame: OutputFrame) -> int:
+        """Send one frame to every selected device.
+
+        Args:
+            frame: Output frame to send
+
+        Returns:
+            Number of devices that were written
+        """
+        return self._fan_out(lambda device: device.write_frame(frame), self._targets())
+
+    def write_frames(self, frames: dict[str | bytes, OutputFrame]) -> int:
+        """Send a different frame to each addressed device.
+
+        Args:
+            frames: Frame per serial number or HID path
+
+        Returns:
+            Number of devices that were written
+        """
+        by_device = {}
+        for key, frame in frames.items():
+            device = self.get(key)
+            if device is not None:
+                by_device[device] = frame
+        return self._fan_out(
+            lambda device: device.write_frame(by_device[device]), tuple(by_device)
+        )
+
+    def set_motors(self, left: int, right: int) -> None:
+        """Set motor intensities on every selected device.
+
+        Args:
+            left: Left motor intensity (0-255)
+            right: Right motor intensity (0-255)
+        """
+        self._fan_out(lambda device: device.set_motors(left, right), self._targets())
+
+    def stop_motors(self) -> None:
+        """Stop all motor vibration on every selected device."""
+        self._fan_out(lambda device: device.stop_motors(), self._targets())
@@ -0,0 +1,383 @@
+"""Single DualSense controller with frame-level output."""
+
+from dataclasses import dataclass, replace
+from functools import cache
+from typing import TYPE_CHECKING, Optional
+import threading
+import time
+
+from controller.backend import DeviceBackend
+from controller.instrumentation import Instrumentation, instrumentation
+from controller.output_frame import OutputFrame, TriggerEffect, STOP_FRAME
+
+# hidapi and pydualsense load libhidapi when imported, so they are only
+# imported once real hardware is used; simulated backends work without them
+if TYPE_CHECKING:
+    from pydualsense import pydualsense
+
+
+DUALSENSE_VENDOR_ID = 0x054C
+DUALSENSE_PRODUCT_IDS = (0x0CE6, 0x0DF2)  # DualSense, DualSense Edge
+
+
+@dataclass(frozen=True)
+class DeviceInfo:
+    """Enumerated DualSense HID device."""
+    path: bytes
+    serial_number: str
+    product_id: int
+
+
+def enumerate_dualsense() -> list[DeviceInfo]:
+    """List attached DualSense controllers.
+
+    Returns:
+        DeviceInfo for every matching HID device
+    """
+    import hidapi
+
+    return [
+        DeviceInfo(device.path, device.serial_number or "", device.product_id)
+        for device in hidapi.enumerate(vendor_id=DUALSENSE_VENDOR_ID)
+        if device.product_id in DUALSENSE_PRODUCT_IDS
+    ]
+
+
+@cache
+def _path_dualsense() -> type:
+    """Build the pydualsense subclass that opens a specific HID path."""
+    import hidapi
+    from pydualsense import pydualsense
+
+    class _PathDualSense(pydualsense):
+        """pydualsense that opens a specific HID path instead of the first match."""
+
+        def __init__(self, info: DeviceInfo) -> None:
+            super().__init__()
+            self._device_info = info
+
+        def _pydualsense__find_device(self) -> tuple[hidapi.Device, bool]:
+            # Same contract as pydualsense's private finder: (device, is_edge)
+            info = self._device_info
+            return hidapi.Device(path=info.path), info.product_id == DUALSENSE_PRODUCT_IDS[1]
+
+    return _PathDualSense
+
+
+class PydualsenseBackend:
+    """Backend that drives a controller through pydualsense.
+
+    Frame fields are written under a lock that pydualsense's report thread
+    also takes, so a report never mixes two frames. Writes only hand the
+    fields to that thread and never wait on the device.
+    """
+
+    blocking = False
+
+    def __init__(self, info: Optional[DeviceInfo] = None) -> None:
+        """Create an unopened backend.
+
+        Args:
+            info: Device to open (None opens the first DualSense found)
+        """
+        self._info = info
+        self._controller: Optional["pydualsense"] = None
+        self._report_lock = threading.Lock()
+
+    @property
+    def info(self) -> Optional[DeviceInfo]:
+        """Get the enumerated device this backend opens."""
+        return self._info
+
+    @property
+    def controller(self) -> Optional["pydualsense"]:
+        """Get the pydualsense instance."""
+        return self._controller
+
+    @property
+    def is_open(self) -> bool:
+        """Check if the device is open."""
+        return self._controller is not None
+
+    @property
+    def is_alive(self) -> bool:
+        """Check if the open controller's report thread is still running.
+
+        pydualsense stops its report thread when the device is unplugged.
+        """
+        controller = self._controller
+        if controller is None:
+            return False
+        if not getattr(controller, "connected", True):
+            return False
+        report_thread = getattr(controller, "report_thread", None)
+        return report_thread is None or report_thread.is_alive()
+
+    def open(self) -> None:
+        """Open the controller and start pydualsense's report thread.
+
+        Raises:
+            Exception: If the device cannot be opened
+        """
+        if self._controller is not None:
+            return
+
+        if self._info is None:
+            from pydualsense import pydualsense
+
+            controller = pydualsense()
+        else:
+            controller = _path_dualsense()(self._info)
+        controller.init()
+        self._guard_report_thread(controller)
+        self._controller = controller
+
+    def close(self) -> None:
+        """Close the controller."""
+        controller = self._controller
+        self._controller = None
+        if controller is not None:
+            controller.close()
+
+    def _guard_report_thread(self, controller: "pydualsense") -> None:
+        """Make pydualsense build each output report under the frame lock.
+
+        The report thread calls ``prepareReport`` for every report, so
+        wrapping it guarantees a report never mixes fields from two frames.
+        """
+        prepare_report = controller.prepareReport
+        lock = self._report_lock
+
+        def locked_prepare_report():
+            with lock:
+                return prepare_report()
+
+        controller.prepareReport = locked_prepare_report
+
+    def write(self, frame: OutputFrame) -> None:
+        """Write every field of a frame for the next output report.
+
+        Raises:
+            RuntimeError: If the device is not open
+        """
+        controller = self._controller
+        if controller is None:
+            raise RuntimeError("Device is not open")
+        with self._report_lock:
+            controller.leftMotor = frame.left_motor
+            controller.rightMotor = frame.right_motor
+            if frame.left_trigger is not None:
+                self._apply_trigger(controller.triggerL, frame.left_trigger)
+            if frame.right_trigger is not None:
+                self._apply_trigger(controller.triggerR, frame.right_trigger)
+            if frame.lightbar is not None:
+                controller.light.setColorI(*frame.lightbar)
+            if frame.player_leds is not None:
+                from pydualsense import PlayerID
+
+                controller.light.setPlayerID(PlayerID(frame.player_leds & 0x1F))
+
+    @staticmethod
+    def _apply_trigger(trigger, effect: TriggerEffect) -> None:
+        """Apply an adaptive trigger effect to a pydualsense trigger."""
+        from pydualsense import TriggerModes
+
+        trigger.setMode(TriggerModes(effect.mode))
+        for index, force in enumerate(effect.forces):
+            trigger.setForce(index, force)
+
+
+class DualSenseDevice:
+    """One DualSense controller that commits whole output frames.
+
+    Each commit sends every field of the staged frame through the backend
+    as one report. Commits of an unchanged frame are skipped.
+    """
+
+    def __init__(
+        self,
+        info: Optional[DeviceInfo] = None,
+        backend: Optional[DeviceBackend] = None,
+        instrumentation: Instrumentation = instrumentation,
+    ) -> None:
+        """Create an unopened device.
+
+        Args:
+            info: Device to open (None opens the first DualSense found)
+            backend: Backend to drive instead of pydualsense, e.g. a
+                SimulatedBackend
+            instrumentation: Where write times and failures are recorded
+        """
+        self._info = info
+        self._instrumentation = instrumentation
+        self._backend = backend if backend is not None else PydualsenseBackend(info)
+        self._staged = STOP_FRAME
+        self._committed: Optional[OutputFrame] = None
+        self._last_commit_time = 0.0
+        self._keepalive_interval: Optional[float] = None
+        self._suppressed_writes = 0
+        self._failed_writes = 0
+
+    @property
+    def info(self) -> Optional[DeviceInfo]:
+        """Get the enumerated device this instance opens."""
+        return self._info
+
+    @property
+    def backend(self) -> DeviceBackend:
+        """Get the backend frames are sent through."""
+        return self._backend
+
+    @property
+    def blocking(self) -> bool:
+        """Check if writes wait on the device (see DeviceBackend)."""
+        return getattr(self._backend, "blocking", True)
+
+    @property
+    def is_open(self) -> bool:
+        """Check if the device is open."""
+        return self._backend.is_open
+
+    @property
+    def is_alive(self) -> bool:
+        """Check if the open device is still attached."""
+        return self._backend.is_open and self._backend.is_alive
+
+    @property
+    def controller(self) -> Optional["pydualsense"]:
+        """Get the pydualsense instance (None for other backends)."""
+        return getattr(self._backend, "controller", None)
+
+    @property
+    def keepalive_interval(self) -> Optional[float]:
+        """Get the interval in seconds at which unchanged frames are resent."""
+        return self._keepalive_interval
+
+    @keepalive_interval.setter
+    def keepalive_interval(self, value: Optional[float]) -> None:
+        """Set the keep-alive interval (None never resends unchanged frames)."""
+        self._keepalive_interval = value
+
+    @property
+    def suppressed_writes(self) -> int:
+        """Get the number of commits skipped because nothing changed."""
+        return self._suppressed_writes
+
+    @property
+    def failed_writes(self) -> int:
+        """Get the number of commits the backend failed to send."""
+        return self._failed_writes
+
+    def open(self) -> None:
+        """Open the controller.
+
+        Raises:
+            Exception: If the device cannot be opened
+        """
+        if self._backend.is_open:
+            return
+        self._backend.open()
+        self._committed = None
+
+    def close(self) -> None:
+        """Stop the motors and close the controller."""
+        if not self._backend.is_open:
+            return
+        try:
+            # Stop any vibration before closing
+            self._staged = STOP_FRAME
+            self.commit(force=True)
+            self._backend.close()
+        except Exception:
+            pass
+        finally:
+            self._committed = None
+
+    @property
+    def staged_frame(self) -> OutputFrame:
+        """Get the frame that the next commit will send."""
+        return self._staged
+
+    def stage(self, **fields) -> None:
+        """Stage output fields for the next commit.
+
+        Args:
+            **fields: OutputFrame fields to change (e.g. left_motor=128)
+        """
+        self._staged = replace(self._staged, **fields)
+
+    def commit(self, force: bool = False) -> bool:
+        """Send the staged frame to the controller as one output report.
+
+        The write is skipped when the frame equals the last committed one,
+        unless the keep-alive interval has elapsed.
+
+        Args:
+            force: Write even if the frame is unchanged
+
+        Returns:
+            True if the frame was written to the controller.
+        """
+        if not self._backend.is_open:
+            return False
+
+        frame = self._staged
+        now = time.perf_counter()
+        if not force and frame == self._committed:
+            keepalive = self._keepalive_interval
+            if keepalive is None or now - self._last_commit_time < keepalive:
+                self._suppressed_writes += 1
+                return False
+
+        instrumentation = self._instrumentation
+        try:
+            if instrumentation.enabled:
+                start = time.perf_counter()
+                self._backend.write(frame)
+                instrumentation.write_time.record(time.perf_counter() - start)
+            else:
+                self._backend.write(frame)
+        except Exception:
+            self._failed_writes += 1
+            instrumentation.failed_writes += 1
+            return False
+
+        self._committed = frame
+        self._last_commit_time = now
+        return True
+
+    def write_frame(self, frame: OutputFrame) -> bool:
+        """Stage a complete frame and commit it.
+
+        Args:
+            frame: Output frame to send
+
+        Returns:
+            True if the frame was written to the controller.
+        """
+        self._staged = frame
+        return self.commit()
+
+    def set_motors(self, left: int, right: int) -> bool:
+        """Set motor intensities.
+
+        Args:
+            left: Left motor intensity (0-255)
+            right: Right motor intensity (0-255)
+
+        Returns:
+            True if the frame was written to the controller.
+        """
+        if not self._backend.is_open:
+            return False
+
+        # Clamp values to valid range
+        left = max(0, min(255, left))
+        right = max(0, min(255, right))
+
+        self.stage(left_motor=left, right_motor=right)
+        return self.commit()
+
+    def stop_motors(self) -> None:
+        """Stop all motor vibration."""
+        self.set_motors(0, 0)
@@ -1,10 +1,17 @@
 """DualSense controller connection manager (singleton pattern)."""
 
 from enum import Enum
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 import threading
 
-from pydualsense import pydualsense
+from controller.backend import DeviceBackend
+from controller.dualsense_device import DualSenseDevice
+from controller.output_frame import OutputFrame
+
+if TYPE_CHECKING:
+    from pydualsense import pydualsense
+
+    from controller.recorder import SessionRecorder
 
 
 class ConnectionType(Enum):
@@ -32,14 +39,24 @@ class DualSenseManager:
         if self._initialized:
             return
         self._initialized = True
-        self._controller: Optional[pydualsense] = None
+        self._device = DualSenseDevice()
         self._connected = False
         self._connection_type = ConnectionType.NONE
+        self._connect_lock = threading.RLock()
+        self._recorder: Optional["SessionRecorder"] = None
 
     @property
     def is_connected(self) -> bool:
         """Check if controller is connected."""
-        return self._connected and self._controller is not None
+        return self._connected and self._device.is_open
+
+    @property
+    def is_alive(self) -> bool:
+        """Check if the connected controller's report thread is still running.
+
+        pydualsense stops its report thread when the device is unplugged.
+        """
+        return self._connected and self._device.is_alive
 
     @property
     def connection_type(self) -> ConnectionType:
@@ -47,9 +64,50 @@ class DualSenseManager:
         return self._connection_type
 
     @property
-    def controller(self) -> Optional[pydualsense]:
+    def controller(self) -> Optional["pydualsense"]:
         """Get the controller instance."""
-        return self._controller
+        return self._device.controller
+
+    @property
+    def device(self) -> DualSenseDevice:
+        """Get the device driven by this manager."""
+        return self._device
+
+    @property
+    def keepalive_interval(self) -> Optional[float]:
+        """Get the interval in seconds at which unchanged frames are resent."""
+        return self._device.keepalive_interval
+
+    @keepalive_interval.setter
+    def keepalive_interval(self, value: Optional[float]) -> None:
+        """Set the keep-alive interval (None never resends unchanged frames)."""
+        self._device.keepalive_interval = value
+
+    @property
+    def suppressed_writes(self) -> int:
+        """Get the number of commits skipped because nothing changed."""
+        return self._device.suppressed_writes
+
+    @property
+    def failed_writes(self) -> int:
+        """Get the number of commits the controller failed to send."""
+        return self._device.failed_writes
+
+    @property
+    def recorder(self) -> Optional["SessionRecorder"]:
+        """Get the recorder that receives every motor write sent to the controller."""
+        return self._recorder
+
+    def set_recorder(self, recorder: Optional["SessionRecorder"]) -> None:
+        """Record the motor values of every write while connected.
+
+        Only writes that reach the controller are recorded: commits skipped
+        because nothing changed, and writes that failed, are not.
+
+        Args:
+            recorder: Started recorder (None stops recording)
+        """
+        self._recorder = recorder
 
     def connect(self) -> bool:
         """Attempt to connect to a DualSense controller.
@@ -57,40 +115,88 @@ class DualSenseManager:
         Returns:
             True if connection successful, False otherwise.
         """
-        if self._connected:
-            return True
-
-        try:
-            self._controller = pydualsense()
-            self._controller.init()
-            self._connected = True
-
-            # Determine connection type based on controller properties
-            # pydualsense doesn't expose this directly, but USB is more common
-            # and required for full haptic control
-            self._connection_type = ConnectionType.USB
-
-            return True
-        except Exception:
-            self._controller = None
-            self._connected = False
-            self._connection_type = ConnectionType.NONE
-            return False
+        with self._connect_lock:
+            if self._connected:
+                return True
 
-    def disconnect(self) -> None:
-        """Disconnect from the controller."""
-        if self._controller is not None:
             try:
-                # Stop any vibration before disconnecting
-                self._controller.setLeftMotor(0)
-                self._controller.setRightMotor(0)
-                self._controller.close()
+                self._device.open()
+                self._connected = True
+
+                # Determine connection type based on controller properties
+                # pydualsense doesn't expose this directly, but USB is more common
+                # and required for full haptic control
+                self._connection_type = ConnectionType.USB
+
+                return True
             except Exception:
-                pass
-            finally:
-                self._controller = None
+                self._device.close()
                 self._connected = False
                 self._connection_type = ConnectionType.NONE
+                return False
+
+    def disconnect(self) -> None:
+        """Disconnect from the controller."""
+        with self._connect_lock:
+            self._device.close()
+            self._connected = False
+            self._connection_type = ConnectionType.NONE
+
+    def use_backend(self, backend: Optional[DeviceBackend]) -> None:
+        """Drive a different backend, disconnecting the current one first.
+
+        Args:
+            backend: Backend such as a SimulatedBackend (None restores
+                pydualsense)
+        """
+        with self._connect_lock:
+            self.disconnect()
+            keepalive = self._device.keepalive_interval
+            self._device = DualSenseDevice(backend=backend)
+            self._device.keepalive_interval = keepalive
+
+    @property
+    def staged_frame(self) -> OutputFrame:
+        """Get the frame that the next commit will send."""
+        return self._device.staged_frame
+
+    def stage(self, **fields) -> None:
+        """Stage output fields for the next commit.
+
+        Args:
+            **fields: OutputFrame fields to change (e.g. left_motor=128)
+        """
+        self._device.stage(**fields)
+
+    def commit(self, force: bool = False) -> bool:
+        """Send the staged frame to the controller as one output report.
+
+        Args:
+            force: Write even if the frame is unchanged
+
+        Returns:
+            True if the frame was written to the controller.
+        """
+        if not self._connected:
+            return False
+        return self._device.commit(force)
+
+    def write_frame(self, frame: OutputFrame) -> bool:
+        """Stage a complete frame and commit it.
+
+        Args:
+            frame: Output frame to send
+
+        Returns:
+            True if the frame was written to the controller.
+        """
+        if not self._connected:
+            return False
+        written = self._device.write_frame(frame)
+        recorder = self._recorder
+        if written and recorder is not None:
+            recorder.append(frame.left_motor, frame.right_motor)
+        return written
 
     def set_motors(self, left: int, right: int) -> None:
         """Set motor intensities.
@@ -99,18 +205,12 @@ class DualSenseManager:
             left: Left motor intensity (0-255)
             right: Right motor intensity (0-255)
         """
-        if not self.is_connected or self._controller is None:
+        if not self.is_connected:
             return
-
-        # Clamp values to valid range
-        left = max(0, min(255, left))
-        right = max(0, min(255, right))
-
-        try:
-            self._controller.setLeftMotor(left)
-            self._controller.setRightMotor(right)
-        except Exception:
-            pass
+        written = self._device.set_motors(left, right)
+        recorder = self._recorder
+        if written and recorder is not None:
+            recorder.append(max(0, min(255, left)), max(0, min(255, right)))
 
     def stop_motors(self) -> None:
         """Stop all motor vibration."""
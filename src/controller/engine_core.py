@@ -0,0 +1,1025 @@
+"""Qt-free vibration engine core.
+
+Everything here runs without PyQt6, so headless tools (the CLI, daemon and
+control server) start without loading a GUI toolkit. VibrationEngine in
+controller.vibration_engine adapts EngineCore to Qt signals.
+"""
+
+from typing import TYPE_CHECKING, Callable, Optional
+import itertools
+import threading
+import time
+
+from controller.compositor import FrameCompositor
+from controller.control_state import ControlBlock, ControlState
+from controller.dualsense_manager import DualSenseManager
+from controller.frame_stream import FrameSlot, StreamCursor
+from controller.instrumentation import Instrumentation, instrumentation
+from controller.mixer import Mix, MixCursor
+from controller.output_frame import MotorOutput
+from controller.patterns import (
+    DEFAULT_TICK_RATE,
+    PatternCursor,
+    PatternTable,
+    PatternType,
+    compile_pattern,
+)
+from controller.realtime import RealtimeProfile, RealtimeStatus, RealtimeThread
+from controller.recorder import Recording
+from controller.resampler import MAX_OUTPUT_RATE, Interpolation, compile_resampled
+from controller.scheduler import DeadlineScheduler, LatenessStats
+from controller.sequencer import ProgramTimeline
+from controller.telemetry import MotorSample, TelemetryChannel
+from controller.timeline import Timeline, TimelineCursor
+
+if TYPE_CHECKING:
+    # Imported lazily: audio sources need NumPy, which is slow to import
+    from controller.audio_source import AudioCursor, AudioSource
+
+
+def _step_limit(state: ControlState) -> Optional[float]:
+    """Get the longest step the output loop may write for a snapshot."""
+    max_step = state.max_step
+    if state.output_rate is not None:
+        step_limit = 1.0 / state.output_rate
+        if max_step is None or step_limit < max_step:
+            max_step = step_limit
+    return max_step
+
+
+class VibrationWorker:
+    """Worker that runs vibration patterns on a long-lived thread.
+
+    The thread idles on a condition variable between runs, so start,
+    stop and reconfigure are non-blocking commands. Settings are published
+    as ControlState snapshots; the loop loads the current one once per step
+    and only re-evaluates when its version changed, so setters never wait
+    for the loop and the loop never waits for a setter.
+    """
+
+    def __init__(
+        self,
+        scheduler: Optional[DeadlineScheduler] = None,
+        tick_rate: float = DEFAULT_TICK_RATE,
+        telemetry: Optional[TelemetryChannel] = None,
+        output: Optional[MotorOutput] = None,
+        on_finished: Optional[Callable[[], None]] = None,
+        on_error: Optional[Callable[[str], None]] = None,
+        instrumentation: Instrumentation = instrumentation,
+        compositor: Optional[FrameCompositor] = None,
+    ) -> None:
+        """Create a worker.
+
+        Args:
+            scheduler: Step scheduler (defaults to a new DeadlineScheduler)
+            tick_rate: Pattern table resolution in steps per second
+            telemetry: Telemetry channel (defaults to a new TelemetryChannel)
+            output: Motor destination (defaults to the DualSenseManager singleton)
+            on_finished: Called on the worker thread when a timeline ends
+            on_error: Called on the worker thread with the error message
+            instrumentation: Where loop timing and dropped steps are recorded
+            compositor: Merges every output channel into one frame per step
+                (defaults to a new FrameCompositor)
+        """
+        self._instrumentation = instrumentation
+        self._compositor = compositor if compositor is not None else FrameCompositor()
+        self._stop_event = threading.Event()
+        self._tick_rate = tick_rate
+        self._scheduler = scheduler if scheduler is not None else DeadlineScheduler()
+        self._telemetry = telemetry if telemetry is not None else TelemetryChannel()
+        self._running = False
+        self._control = ControlBlock()
+        # Snapshot the output loop is playing (read and written by that thread only)
+        self._applied = self._control.state
+        # Input stamp the output loop applied last (written by that thread only)
+        self._input_seen: Optional[float] = None
+        self._seek_ids = itertools.count(1)
+        # Position seek() chose for the next timeline while none was set
+        self._next_start: Optional[float] = None
+        # Cursor of the last run, read by timeline_position
+        self._cursor = None
+        self._realtime: Optional[RealtimeProfile] = None
+        self._realtime_status: Optional[RealtimeStatus] = None
+        self._manager = output if output is not None else DualSenseManager()
+        # Outputs without write_frame only receive the motors
+        self._write_frame = getattr(self._manager, "write_frame", None)
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._shutdown = False
+        self._thread: Optional[threading.Thread] = None
+        self._on_finished = on_finished
+        self._on_error = on_error
+
+    @property
+    def control(self) -> ControlState:
+        """Get the current control snapshot."""
+        return self._control.state
+
+    @property
+    def intensity(self) -> int:
+        """Get current intensity."""
+        return self._control.state.intensity
+
+    @intensity.setter
+    def intensity(self, value: int) -> None:
+        """Set intensity (0-255)."""
+        self._control.publish(intensity=max(0, min(255, value)))
+
+    @property
+    def pattern_type(self) -> PatternType:
+        """Get current pattern type."""
+        return self._control.state.pattern_type
+
+    @pattern_type.setter
+    def pattern_type(self, value: PatternType) -> None:
+        """Set pattern type (replaces any timeline or mix being played)."""
+        self._control.publish(pattern_type=value, timeline=None, mix=None)
+
+    @property
+    def timeline(self) -> Optional[Timeline]:
+        """Get the timeline being played instead of a pattern."""
+        return self._control.state.timeline
+
+    def set_timeline(
+        self, timeline: Optional[Timeline], loop: bool = False, position: Optional[float] = None
+    ) -> None:
+        """Play a timeline instead of the pattern.
+
+        Intensity scales the timeline's authored values.
+
+        Args:
+            timeline: Timeline to play (None returns to the pattern)
+            loop: Restart the timeline when it ends
+            position: Start position in seconds (None starts where seek()
+                moved the next timeline, or at the beginning)
+        """
+        if position is None:
+            position = self._next_start if self._next_start is not None else 0.0
+        if timeline is not None:
+            self._next_start = None
+        self._control.publish(timeline=timeline, timeline_loop=loop, timeline_start=position)
+
+    @property
+    def timeline_position(self) -> Optional[float]:
+        """Get the play position in seconds of the timeline (None when none played)."""
+        cursor = self._cursor
+        if not isinstance(cursor, TimelineCursor):
+            return None
+        position = cursor.position
+        if self._running:
+            # The cursor moves on as soon as a step is written, so take off
+            # the part of that step that has not played yet
+            position -= max(0.0, self._scheduler.deadline - time.perf_counter())
+            if position < 0 and cursor.loop:
+                position += cursor.timeline.duration
+        return max(0.0, position)
+
+    def seek(self, position: float) -> None:
+        """Move the timeline to a position, now or when the next run starts.
+
+        While no timeline is set, the position applies to the next one
+        passed to set_timeline() without a position.
+
+        Args:
+            position: Position in seconds
+        """
+        self._next_start = position if self._control.state.timeline is None else None
+        self._control.publish(timeline_start=position, timeline_seek=next(self._seek_ids))
+
+    @property
+    def mix(self) -> Optional[Mix]:
+        """Get the mix being played instead of a pattern."""
+        return self._control.state.mix
+
+    def set_mix(self, mix: Optional[Mix]) -> None:
+        """Play a layered mix instead of the pattern.
+
+        Intensity scales the whole mix. A timeline, if set, takes precedence.
+
+        Args:
+            mix: Mix to play (None returns to the pattern)
+        """
+        self._control.publish(mix=mix)
+
+    def set_audio_source(self, source: Optional["AudioSource"]) -> None:
+        """Set the audio source played by PatternType.AUDIO.
+
+        Args:
+            source: Started audio source (None makes AUDIO silent)
+        """
+        self._control.publish(audio_source=source)
+
+    def set_frame_slot(self, slot: Optional[FrameSlot]) -> None:
+        """Set the frame slot played by PatternType.STREAM.
+
+        Args:
+            slot: Slot fed by a frame producer (None makes STREAM silent)
+        """
+        self._control.publish(frame_slot=slot)
+
+    @property
+    def crossfade(self) -> float:
+        """Get the pattern crossfade window in seconds."""
+        return self._control.state.crossfade
+
+    @crossfade.setter
+    def crossfade(self, value: float) -> None:
+        """Set the pattern crossfade window in seconds (0 cuts over)."""
+        self._control.publish(crossfade=max(0.0, value))
+
+    @property
+    def balance(self) -> float:
+        """Get the left/right balance (-1 left only, 0 centred, 1 right only)."""
+        return self._control.state.balance
+
+    @balance.setter
+    def balance(self, value: float) -> None:
+        """Set the left/right balance (-1 to 1)."""
+        self._control.publish(balance=max(-1.0, min(1.0, value)))
+
+    @property
+    def max_step(self) -> Optional[float]:
+        """Get the longest time in seconds between writes (None for whole steps)."""
+        return self._control.state.max_step
+
+    @max_step.setter
+    def max_step(self, value: Optional[float]) -> None:
+        """Split long pattern steps so setting changes apply within this time.
+
+        Raises:
+            ValueError: If the time is not positive
+        """
+        if value is not None and not value > 0:
+            raise ValueError(f"Max step must be positive, got {value}")
+        self._control.publish(max_step=value)
+
+    @property
+    def tick_rate(self) -> float:
+        """Get the pattern table resolution in steps per second."""
+        return self._tick_rate
+
+    @property
+    def output_rate(self) -> Optional[float]:
+        """Get the rate in Hz motors are written at (None follows pattern steps)."""
+        return self._control.state.output_rate
+
+    @property
+    def interpolation(self) -> Interpolation:
+        """Get the curve used between pattern steps at the output rate."""
+        return self._control.state.interpolation
+
+    @property
+    def slew_rate(self) -> Optional[float]:
+        """Get the largest motor change per second (None is unlimited)."""
+        return self._control.state.slew_rate
+
+    def set_output(
+        self,
+        rate: Optional[float],
+        interpolation: Interpolation = Interpolation.LINEAR,
+        slew_rate: Optional[float] = None,
+    ) -> None:
+        """Configure high-rate output.
+
+        Patterns keep their authored steps and are upsampled to ``rate``;
+        other sources are written at ``rate`` and only slew limited.
+
+        Args:
+            rate: Output rate in Hz, up to MAX_OUTPUT_RATE (None writes once
+                per pattern step)
+            interpolation: Curve between pattern steps
+            slew_rate: Largest motor change in intensity units per second
+        """
+        if rate is not None and not 0 < rate <= MAX_OUTPUT_RATE:
+            raise ValueError(f"Output rate must be between 0 and {MAX_OUTPUT_RATE:g} Hz")
+        self._control.publish(
+            output_rate=rate,
+            interpolation=interpolation,
+            slew_rate=slew_rate if slew_rate is None else max(0.0, slew_rate),
+        )
+
+    def mark_input(self, timestamp: float) -> None:
+        """Note that a controller input changed a setting.
+
+        The delay until the next write is recorded in the instrumentation's
+        input latency histogram.
+
+        Args:
+            timestamp: ``time.perf_counter()`` when the input arrived
+        """
+        self._control.mark_input(timestamp, self._input_seen)
+
+    @property
+    def timing_stats(self) -> LatenessStats:
+        """Get per-step lateness statistics."""
+        return self._scheduler.stats
+
+    @property
+    def realtime(self) -> Optional[RealtimeProfile]:
+        """Get the real-time profile runs are played with."""
+        return self._realtime
+
+    @property
+    def realtime_status(self) -> Optional[RealtimeStatus]:
+        """Get what the real-time profile changed for the current or last run.
+
+        None when that run was played without a profile.
+        """
+        return self._realtime_status
+
+    def set_realtime(self, profile: Optional[RealtimeProfile]) -> None:
+        """Play runs with a real-time profile (see controller.realtime).
+
+        Scheduling is per thread, so the profile is applied by the output
+        thread when the next run starts.
+
+        Args:
+            profile: Profile to apply (None plays with default scheduling)
+        """
+        self._realtime = profile
+
+    @property
+    def compositor(self) -> FrameCompositor:
+        """Get the compositor that builds each output frame."""
+        return self._compositor
+
+    @property
+    def is_running(self) -> bool:
+        """Check if a pattern is currently requested to run."""
+        return self._running
+
+    def start_thread(self) -> None:
+        """Start the worker thread so it idles ready for the first run."""
+        with self._wake:
+            if self._thread is None:
+                self._shutdown = False
+                self._thread = threading.Thread(
+                    target=self._thread_main, name="VibrationWorker", daemon=True
+                )
+                self._thread.start()
+
+    def start_pattern(self) -> None:
+        """Start the vibration pattern loop (returns immediately)."""
+        self.start_thread()
+        with self._wake:
+            self._stop_event.clear()
+            self._running = True
+            self._wake.notify()
+
+    def stop_pattern(self) -> None:
+        """Stop the vibration pattern loop (returns immediately)."""
+        with self._wake:
+            self._running = False
+            self._stop_event.set()
+        # Silence the motors now instead of waiting for the loop to exit
+        self._manager.stop_motors()
+
+    def shutdown(self, timeout: float = 1.0) -> None:
+        """Stop the pattern loop and end the worker thread.
+
+        Args:
+            timeout: Seconds to wait for the thread to exit
+        """
+        with self._wake:
+            self._shutdown = True
+            self._running = False
+            self._stop_event.set()
+            self._wake.notify()
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            thread.join(timeout)
+
+    def _thread_main(self) -> None:
+        """Idle until a run is requested, run it, and repeat."""
+        while True:
+            with self._wake:
+                while not self._running and not self._shutdown:
+                    self._wake.wait()
+                if self._shutdown:
+                    return
+            self._run_pattern_loop()
+
+    def _compile(self, pattern_type: PatternType, intensity: int) -> PatternTable:
+        """Compile a pattern at the tick rate, upsampled to the output rate if set."""
+        output_rate = self._applied.output_rate
+        if output_rate is None:
+            return compile_pattern(pattern_type, intensity, self._tick_rate)
+        return compile_resampled(
+            pattern_type, intensity, self._tick_rate, output_rate, self._applied.interpolation
+        )
+
+    def _step_rate(self) -> float:
+        """Get the rate live sources are read at."""
+        return self._applied.output_rate or self._tick_rate
+
+    def _open_layer(
+        self, source: PatternType | Timeline, gain: int, clock: float
+    ) -> "PatternCursor | TimelineCursor | AudioCursor | StreamCursor":
+        """Create a cursor for a timeline or live layer of a mix.
+
+        Timeline layers start at the clock, in phase with the pattern layers.
+        """
+        if not isinstance(source, PatternType):
+            return TimelineCursor(source, clock, loop=True, gain=gain)
+        return self._open_source(source, gain, clock, loop=True)
+
+    def _open_source(
+        self, source: PatternType | Timeline | Mix, intensity: int, clock: float, loop: bool
+    ) -> "PatternCursor | TimelineCursor | MixCursor | AudioCursor | StreamCursor":
+        """Create a cursor for a pattern (at the running clock) or live source."""
+        if isinstance(source, Mix):
+            return MixCursor(
+                source, self._step_rate(), gain=intensity, position=clock,
+                open_layer=self._open_layer, compile=self._compile,
+            )
+        if not isinstance(source, PatternType):
+            # Timelines and anything with their read interface
+            state = self._applied
+            start = state.timeline_start if source is state.timeline else 0.0
+            return TimelineCursor(source, start, loop=loop, gain=intensity)
+        if source == PatternType.AUDIO:
+            audio_source = self._applied.audio_source
+            if audio_source is not None:
+                from controller.audio_source import AudioCursor
+
+                return AudioCursor(audio_source, gain=intensity)
+        if source == PatternType.STREAM:
+            frame_slot = self._applied.frame_slot
+            if frame_slot is not None:
+                return StreamCursor(frame_slot, 1.0 / self._step_rate(), gain=intensity)
+        return PatternCursor(self._compile(source, intensity), clock)
+
+    def _retarget(
+        self,
+        cursor: "PatternCursor | TimelineCursor | MixCursor | AudioCursor | StreamCursor",
+        source: PatternType | Timeline | Mix,
+        intensity: int,
+    ) -> None:
+        """Apply a new intensity to a cursor without moving it."""
+        if isinstance(cursor, PatternCursor):
+            # Tables share their layout across intensities
+            cursor.table = self._compile(source, intensity)
+        else:
+            cursor.set_gain(intensity)
+
+    def _run_pattern_loop(self) -> None:
+        """Main pattern execution loop."""
+        scheduler = self._scheduler
+        telemetry = self._telemetry
+        instrumentation = self._instrumentation
+        compositor = self._compositor
+        write_frame = self._write_frame
+
+        fade_step = 1.0 / self._tick_rate
+        finished = False
+        realtime = None
+        self._realtime_status = None
+        if self._realtime is not None:
+            realtime = RealtimeThread(self._realtime)
+            self._realtime_status = realtime.enter()
+
+        try:
+            # Get current settings
+            state = self._applied = self._control.state
+            intensity = state.intensity
+            source = state.source
+            loop = state.timeline_loop
+            output = state.output
+            crossfade, balance, slew_rate = state.crossfade, state.balance, state.slew_rate
+            max_step = _step_limit(state)
+            # Inputs that arrived while idle had nothing to drive
+            self._input_seen = state.input_time
+            seek = state.timeline_seek
+
+            # Pattern clock, kept running across parameter changes
+            clock = 0.0
+            cursor = self._cursor = self._open_source(source, intensity, clock, loop)
+            if realtime is not None:
+                # Freeze what compiling allocated before the first deadline
+                realtime.warmed_up()
+            # Anchor the schedule after compiling, so the first steps are on time
+            scheduler.reset()
+
+            # Outgoing source during a crossfade
+            fading = None
+            fading_source = source
+            fade_window = 0.0
+            fade_elapsed = 0.0
+
+            # Motor values after slew limiting, and how long they were held
+            slewed_left = 0.0
+            slewed_right = 0.0
+            held = 0.0
+
+            # Wait for each step's absolute deadline
+            while scheduler.wait(self._stop_event):
+                timed = instrumentation.enabled
+                if timed:
+                    woke = time.perf_counter()
+                    instrumentation.lateness.record(max(0.0, woke - scheduler.deadline))
+
+                # One reference load; the rest of the tick uses this snapshot
+                state = self._control.state
+                input_time = None
+                if state.version != self._applied.version:
+                    # Settings changed
+                    self._applied = state
+                    loop = state.timeline_loop
+                    crossfade = state.crossfade
+                    balance = state.balance
+                    slew_rate = state.slew_rate
+                    max_step = _step_limit(state)
+                    if state.input_time != self._input_seen:
+                        input_time = self._input_seen = state.input_time
+
+                    new_source = state.source
+                    new_output = state.output
+                    if new_source is not source:
+                        # A fade needs both tables at the same output rate
+                        if crossfade > 0 and new_output == output:
+                            fading = cursor
+                            fading_source = source
+                            fade_window = crossfade
+                            fade_elapsed = 0.0
+                        source = new_source
+                        intensity = state.intensity
+                        output = new_output
+                        cursor = self._cursor = self._open_source(source, intensity, clock, loop)
+                    elif new_output != output:
+                        # Tables change layout with the output rate
+                        intensity = state.intensity
+                        output = new_output
+                        fading = None
+                        previous = cursor
+                        cursor = self._cursor = self._open_source(source, intensity, clock, loop)
+                        if isinstance(previous, TimelineCursor):
+                            cursor.seek(previous.position)
+                    elif state.intensity != intensity:
+                        # The cursors keep their phase
+                        intensity = state.intensity
+                        self._retarget(cursor, source, intensity)
+                        if fading is not None:
+                            self._retarget(fading, fading_source, intensity)
+
+                    if state.timeline_seek != seek:
+                        seek = state.timeline_seek
+                        if isinstance(cursor, TimelineCursor):
+                            cursor.seek(state.timeline_start)
+
+                if fading is not None and (fading.finished or cursor.finished):
+                    # A timeline that ran out holds no time to fade over
+                    fading = None
+
+                if fading is None:
+                    if cursor.finished:
+                        finished = True
+                        break
+                    elapsed = cursor.remaining
+                    if max_step is not None and elapsed > max_step:
+                        elapsed = max_step
+                    if elapsed > fade_step and isinstance(cursor, TimelineCursor):
+                        # Timeline holds can last minutes; split them into
+                        # ticks so seeks and setting changes apply promptly
+                        elapsed = fade_step
+                    left = cursor.left
+                    right = cursor.right
+                    shown = cursor
+                else:
+                    elapsed = min(
+                        cursor.remaining,
+                        fading.remaining,
+                        fade_step if max_step is None else min(fade_step, max_step),
+                        fade_window - fade_elapsed,
+                    )
+                    mix = fade_elapsed / fade_window
+                    left = int(fading.left + (cursor.left - fading.left) * mix)
+                    right = int(fading.right + (cursor.right - fading.right) * mix)
+                    # Other channels switch over halfway through the fade
+                    shown = cursor if mix >= 0.5 else fading
+
+                if balance > 0:
+                    left = int(left * (1.0 - balance))
+                elif balance < 0:
+                    right = int(right * (1.0 + balance))
+
+                if slew_rate is not None:
+                    # Limit the change since the last write to what the
+                    # previous value's hold time allows
+                    limit = slew_rate * (held or elapsed)
+                    slewed_left = min(max(left, slewed_left - limit), slewed_left + limit)
+                    slewed_right = min(max(right, slewed_right - limit), slewed_right + limit)
+                    left = int(slewed_left + 0.5)
+                    right = int(slewed_right + 0.5)
+                else:
+                    slewed_left = left
+                    slewed_right = right
+                held = elapsed
+
+                # Late steps may be dropped to keep the tempo
+                if scheduler.begin_step(elapsed):
+                    if write_frame is not None:
+                        # Every channel goes out in a single report
+                        fields = (
+                            shown.fields()
+                            if compositor.field_names
+                            and isinstance(shown, (PatternCursor, MixCursor))
+                            else None
+                        )
+                        write_frame(compositor.compose(left, right, fields))
+                    else:
+                        self._manager.set_motors(left, right)
+                    telemetry.publish(left, right)
+                else:
+                    instrumentation.dropped_writes += 1
+                if input_time is not None:
+                    instrumentation.input_latency.record(time.perf_counter() - input_time)
+
+                clock += elapsed
+                cursor.advance(elapsed)
+                if fading is not None:
+                    fading.advance(elapsed)
+                    fade_elapsed += elapsed
+                    if fade_elapsed >= fade_window - 1e-9:
+                        fading = None
+
+                if timed:
+                    instrumentation.loop_time.record(time.perf_counter() - woke)
+                if realtime is not None:
+                    # Collect in the gap before the next deadline, not during a step
+                    realtime.collect_idle(scheduler.deadline - time.perf_counter())
+
+            if finished:
+                # The timeline ran to its end
+                with self._wake:
+                    self._running = False
+                if self._on_finished is not None:
+                    self._on_finished()
+
+        except Exception as e:
+            with self._wake:
+                self._running = False
+            if self._on_error is not None:
+                self._on_error(str(e))
+
+        try:
+            # Ensure motors are stopped and driven channels are released
+            if write_frame is not None:
+                write_frame(compositor.release())
+            else:
+                self._manager.stop_motors()
+            telemetry.publish(0, 0)
+            telemetry.flush()
+        finally:
+            if realtime is not None:
+                realtime.leave()
+
+
+class EngineCore:
+    """Engine that drives a persistent vibration worker.
+
+    Callbacks are invoked on the worker thread; adapters that need them on
+    another thread (such as the Qt event loop) must hand them over.
+    """
+
+    def __init__(
+        self,
+        scheduler: Optional[DeadlineScheduler] = None,
+        telemetry: Optional[TelemetryChannel] = None,
+        output: Optional[MotorOutput] = None,
+        on_finished: Optional[Callable[[], None]] = None,
+        on_error: Optional[Callable[[str], None]] = None,
+        instrumentation: Instrumentation = instrumentation,
+        compositor: Optional[FrameCompositor] = None,
+        tick_rate: float = DEFAULT_TICK_RATE,
+    ) -> None:
+        """Create an engine.
+
+        Args:
+            scheduler: Step scheduler (defaults to a new DeadlineScheduler)
+            telemetry: Telemetry channel (defaults to a new TelemetryChannel)
+            output: Motor destination, e.g. a DualSenseDevice or DevicePool
+                (defaults to the DualSenseManager singleton)
+            on_finished: Called when a timeline reaches its end
+            on_error: Called with the error message when the worker fails
+            instrumentation: Where loop timing and dropped steps are recorded
+            compositor: Merges every output channel into one frame per step
+                (defaults to a new FrameCompositor)
+            tick_rate: Rate in Hz patterns are authored at (see set_output()
+                for writing faster than that)
+        """
+        self._instrumentation = instrumentation
+        self._scheduler = scheduler if scheduler is not None else DeadlineScheduler()
+        self._telemetry = telemetry if telemetry is not None else TelemetryChannel()
+        self._active = False
+        self._paused = False
+        self._pause_position: Optional[float] = None
+        self._on_finished = on_finished
+        self._on_error = on_error
+
+        self._worker = VibrationWorker(
+            self._scheduler,
+            tick_rate=tick_rate,
+            telemetry=self._telemetry,
+            output=output,
+            on_finished=self._handle_finished,
+            on_error=self._handle_error,
+            instrumentation=instrumentation,
+            compositor=compositor,
+        )
+        self._worker.start_thread()
+
+    @property
+    def is_active(self) -> bool:
+        """Check if engine is currently running."""
+        return self._active
+
+    @property
+    def is_paused(self) -> bool:
+        """Check if playback is paused (see pause())."""
+        return self._paused
+
+    @property
+    def timeline_position(self) -> Optional[float]:
+        """Get the play position in seconds of the timeline (None when none played)."""
+        if self._paused:
+            return self._pause_position
+        return self._worker.timeline_position
+
+    @property
+    def scheduler(self) -> DeadlineScheduler:
+        """Get the step scheduler (late policy and sleep mode are adjustable)."""
+        return self._scheduler
+
+    @property
+    def timing_stats(self) -> LatenessStats:
+        """Get per-step lateness statistics of the current or last run."""
+        return self._scheduler.stats
+
+    @property
+    def telemetry(self) -> TelemetryChannel:
+        """Get the telemetry channel (rate limit and history are adjustable)."""
+        return self._telemetry
+
+    @property
+    def instrumentation(self) -> Instrumentation:
+        """Get the loop and write histograms (enable() to start recording)."""
+        return self._instrumentation
+
+    @property
+    def compositor(self) -> FrameCompositor:
+        """Get the compositor (channel mask and static channel values)."""
+        return self._worker.compositor
+
+    @property
+    def tick_rate(self) -> float:
+        """Get the pattern table resolution in steps per second."""
+        return self._worker.tick_rate
+
+    @property
+    def worker(self) -> VibrationWorker:
+        """Get the worker that owns the output thread."""
+        return self._worker
+
+    @property
+    def control(self) -> ControlState:
+        """Get the settings the worker plays, as one consistent snapshot."""
+        return self._worker.control
+
+    def recent_samples(self) -> list[MotorSample]:
+        """Get recent motor samples for graphing, oldest first."""
+        return self._telemetry.recent_samples()
+
+    def start_vibration(
+        self, intensity: int = 128, pattern_type: PatternType = PatternType.CONSTANT
+    ) -> None:
+        """Start vibration with specified settings.
+
+        Args:
+            intensity: Motor intensity (0-255)
+            pattern_type: Type of vibration pattern
+        """
+        self._worker.intensity = intensity
+        self._worker.pattern_type = pattern_type
+
+        self._paused = False
+        self._active = True
+        self._worker.start_pattern()
+
+    def start_timeline(
+        self,
+        timeline: Timeline | Recording | ProgramTimeline,
+        intensity: int = 255,
+        loop: bool = False,
+        position: Optional[float] = None,
+    ) -> None:
+        """Start playing a timeline.
+
+        Args:
+            timeline: Timeline to play, a Recording to replay with its
+                original timing, or a compiled program
+            intensity: Output scale (0-255, 255 plays authored values)
+            loop: Restart the timeline when it ends
+            position: Start position in seconds (None starts where seek()
+                moved the next timeline, or at the beginning)
+        """
+        self._worker.intensity = intensity
+        self._worker.set_timeline(timeline, loop, position)
+
+        self._paused = False
+        self._active = True
+        self._worker.start_pattern()
+
+    def pause(self) -> None:
+        """Stop the motors, keeping the timeline position for resume()."""
+        if not self._active:
+            return
+        position = self._worker.timeline_position
+        self.stop_vibration()
+        self._paused = True
+        self._pause_position = position
+        if position is not None:
+            self._worker.seek(position)
+
+    def resume(self) -> None:
+        """Continue after pause(): timelines from where they paused, patterns afresh."""
+        if not self._paused:
+            return
+        self._paused = False
+        self._active = True
+        self._worker.start_pattern()
+
+    def seek(self, position: float) -> None:
+        """Move the timeline being played (or, if none is set, the next one started) to a position.
+
+        Args:
+            position: Position in seconds
+        """
+        self._worker.seek(position)
+
+    def stop_vibration(self) -> None:
+        """Stop vibration without waiting for the worker loop to exit."""
+        self._paused = False
+        if not self._active:
+            return
+
+        self._active = False
+        self._worker.stop_pattern()
+
+    def shutdown(self) -> None:
+        """Stop vibration and end the worker and telemetry threads."""
+        self.stop_vibration()
+        self._worker.shutdown()
+        self._telemetry.close()
+
+    def set_intensity(self, intensity: int) -> None:
+        """Update vibration intensity.
+
+        Args:
+            intensity: Motor intensity (0-255)
+        """
+        self._worker.intensity = intensity
+
+    def set_pattern(self, pattern_type: PatternType) -> None:
+        """Update vibration pattern.
+
+        Args:
+            pattern_type: Type of vibration pattern
+        """
+        self._worker.pattern_type = pattern_type
+
+    def set_timeline(
+        self, timeline: Optional[Timeline], loop: bool = False, position: Optional[float] = None
+    ) -> None:
+        """Switch to a timeline, or back to the pattern with None.
+
+        Args:
+            timeline: Timeline to play
+            loop: Restart the timeline when it ends
+            position: Start position in seconds (None starts where seek()
+                moved the next timeline, or at the beginning)
+        """
+        self._worker.set_timeline(timeline, loop, position)
+
+    def start_mix(self, mix: Mix, intensity: int = 255) -> None:
+        """Start playing a layered mix.
+
+        Args:
+            mix: Mix to play
+            intensity: Output scale of the whole mix (0-255)
+        """
+        self._worker.intensity = intensity
+        self._worker.set_mix(mix)
+
+        self._paused = False
+        self._active = True
+        self._worker.start_pattern()
+
+    def set_mix(self, mix: Optional[Mix]) -> None:
+        """Switch to a layered mix, or back to the pattern with None.
+
+        Args:
+            mix: Mix to play
+        """
+        self._worker.set_mix(mix)
+
+    def set_audio_source(self, source: Optional["AudioSource"]) -> None:
+        """Set the audio source played by PatternType.AUDIO.
+
+        Args:
+            source: Started audio source (None makes AUDIO silent)
+        """
+        self._worker.set_audio_source(source)
+
+    def set_frame_slot(self, slot: Optional[FrameSlot]) -> None:
+        """Set the frame slot played by PatternType.STREAM.
+
+        Args:
+            slot: Slot fed by a frame producer (None makes STREAM silent)
+        """
+        self._worker.set_frame_slot(slot)
+
+    def set_crossfade(self, seconds: float) -> None:
+        """Update the crossfade window used when switching patterns.
+
+        Args:
+            seconds: Crossfade length in seconds (0 switches immediately)
+        """
+        self._worker.crossfade = seconds
+
+    def set_balance(self, balance: float) -> None:
+        """Update the left/right balance.
+
+        Args:
+            balance: -1 plays only the left motor, 0 both, 1 only the right
+        """
+        self._worker.balance = balance
+
+    def set_output(
+        self,
+        rate: Optional[float],
+        interpolation: Interpolation = Interpolation.LINEAR,
+        slew_rate: Optional[float] = None,
+    ) -> None:
+        """Write motors at a fixed rate, upsampling patterns to it.
+
+        Each write costs one wake-up of the worker thread, so CPU use grows
+        linearly with the rate (see benchmarks/suite.py --only output_rate).
+
+        Args:
+            rate: Output rate in Hz, up to MAX_OUTPUT_RATE (None writes once
+                per pattern step)
+            interpolation: Curve between pattern steps
+            slew_rate: Largest motor change in intensity units per second
+
+        Raises:
+            ValueError: If the rate is out of range
+        """
+        self._worker.set_output(rate, interpolation, slew_rate)
+
+    def set_max_step(self, seconds: Optional[float]) -> None:
+        """Bound the time until setting changes reach the motors.
+
+        Long pattern steps are split so the worker writes at least this
+        often; unchanged frames are not resent to the controller.
+
+        Args:
+            seconds: Longest time between writes (None plays whole steps)
+
+        Raises:
+            ValueError: If the time is not positive
+        """
+        self._worker.max_step = seconds
+
+    def mark_input(self, timestamp: float) -> None:
+        """Note that a controller input changed a setting (see VibrationWorker)."""
+        self._worker.mark_input(timestamp)
+
+    @property
+    def realtime_status(self) -> Optional[RealtimeStatus]:
+        """Get what the real-time profile changed for the current or last run."""
+        return self._worker.realtime_status
+
+    def set_realtime(self, profile: Optional[RealtimeProfile]) -> None:
+        """Play with real-time scheduling and deferred garbage collection.
+
+        Takes effect when the next run starts. Settings the platform or
+        permissions do not allow are skipped and listed in realtime_status.
+
+        Args:
+            profile: Profile to apply (None plays with default scheduling)
+        """
+        self._worker.set_realtime(profile)
+
+    def _handle_finished(self) -> None:
+        """Handle a timeline reaching its end."""
+        if not self._worker.is_running:
+            self._active = False
+        if self._on_finished is not None:
+            self._on_finished()
+
+    def _handle_error(self, error: str) -> None:
+        """Handle worker error (the worker has already stopped the run)."""
+        self._active = False
+        if self._on_error is not None:
+            self._on_error(error)
@@ -0,0 +1,616 @@
+"""Vibration engine in a child process, controlled through shared memory.
+
+The child owns the controller and an EngineCore, so its output thread
+never competes with the GUI for the GIL. The parent and the child share
+one ``multiprocessing.shared_memory`` segment holding two blocks:
+
+    control  written by the parent only: the settings to play
+    status   written by the child only: connection, motors, timing, errors
+
+Each block is a sequence lock: the writer makes its counter odd, packs
+the fields and makes it even again, and a reader retries until it reads
+the same even counter before and after. Readers never take a lock and
+never block the writer.
+
+A one-way pipe wakes the child when the control block changes. When the
+parent exits or dies the operating system closes its end, the child
+reads end-of-file, stops the motors and exits.
+"""
+
+from dataclasses import dataclass, field
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Optional
+import math
+import multiprocessing
+import signal
+import struct
+import threading
+import time
+
+from controller.dualsense_manager import ConnectionType, DualSenseManager
+from controller.patterns import DEFAULT_TICK_RATE, PatternType
+from controller.realtime import RealtimeProfile
+from controller.resampler import MAX_OUTPUT_RATE, Interpolation
+from controller.scheduler import LatenessStats
+
+
+_SEQUENCE = struct.Struct("<Q")
+# run, running, intensity, pattern, interpolation, crossfade, balance,
+# output_rate, slew_rate, max_step (NaN for None)
+_CONTROL = struct.Struct("<I?BBBddddd")
+# run, connected, connection, active, left, right, steps, dropped, resyncs,
+# mean_lateness, max_lateness, errors, error (UTF-8, truncated)
+_ERROR_SIZE = 128
+_STATUS = struct.Struct(f"<I?B?BBQQQddI{_ERROR_SIZE}s")
+# Blocks start on separate cache lines
+_STATUS_OFFSET = 64
+_SIZE = _STATUS_OFFSET + _SEQUENCE.size + _STATUS.size
+
+_PATTERNS = list(PatternType)
+_INTERPOLATIONS = list(Interpolation)
+_CONNECTIONS = list(ConnectionType)
+
+
+def _optional(value: Optional[float]) -> float:
+    return math.nan if value is None else value
+
+
+def _read_control(block: "_SeqBlock") -> tuple:
+    """Read the control block with NaN turned back into None."""
+    values = block.read()
+    return values[:7] + tuple(None if math.isnan(value) else value for value in values[7:])
+
+
+class _SeqBlock:
+    """Sequence-locked fields in a shared buffer, for a single writer process."""
+
+    def __init__(self, buffer: memoryview, offset: int, layout: struct.Struct) -> None:
+        self._buffer = buffer
+        self._offset = offset
+        self._fields = offset + _SEQUENCE.size
+        self._end = self._fields + layout.size
+        self._layout = layout
+        # Fields are packed here first, so bad values never leave the
+        # counter odd (readers would spin on it forever)
+        self._scratch = bytearray(layout.size)
+        # Orders writer threads within the writing process
+        self._write_lock = threading.Lock()
+
+    def write(self, *values) -> None:
+        """Publish every field at once.
+
+        Raises:
+            struct.error: If a value does not fit its field (nothing is published)
+        """
+        buffer = self._buffer
+        with self._write_lock:
+            self._layout.pack_into(self._scratch, 0, *values)
+            (sequence,) = _SEQUENCE.unpack_from(buffer, self._offset)
+            _SEQUENCE.pack_into(buffer, self._offset, sequence + 1)
+            buffer[self._fields:self._end] = self._scratch
+            _SEQUENCE.pack_into(buffer, self._offset, sequence + 2)
+
+    def read(self) -> tuple:
+        """Read a consistent copy of every field."""
+        buffer = self._buffer
+        while True:
+            (before,) = _SEQUENCE.unpack_from(buffer, self._offset)
+            if not before & 1:
+                values = self._layout.unpack_from(buffer, self._fields)
+                (after,) = _SEQUENCE.unpack_from(buffer, self._offset)
+                if after == before:
+                    return values
+            # The writer is mid-update; let it finish
+            time.sleep(0)
+
+
+@dataclass(frozen=True)
+class EngineStatus:
+    """What the engine process last reported.
+
+    Attributes:
+        connected: A controller is connected to the child
+        connection_type: How it is connected
+        active: A pattern is playing
+        left: Last left motor value written
+        right: Last right motor value written
+        timing: Per-step lateness statistics of the current or last run
+        errors: Number of runs that ended with an error
+        error: Message of the last error
+    """
+    connected: bool = False
+    connection_type: ConnectionType = ConnectionType.NONE
+    active: bool = False
+    left: int = 0
+    right: int = 0
+    timing: LatenessStats = field(default_factory=LatenessStats)
+    errors: int = 0
+    error: str = ""
+
+
+class EngineProcess:
+    """EngineCore running in a child process.
+
+    Setters only write the shared control block, and status reads only
+    read the shared status block, so neither waits for the child. Only
+    patterns can be played: timelines, mixes and live sources are Python
+    objects that do not fit in shared memory.
+
+    Callbacks are invoked from poll(), on the thread that calls it.
+    """
+
+    def __init__(
+        self,
+        simulate: bool = False,
+        realtime: Optional[RealtimeProfile] = None,
+        tick_rate: float = DEFAULT_TICK_RATE,
+        on_error: Optional[Callable[[str], None]] = None,
+        on_connection: Optional[Callable[[bool], None]] = None,
+    ) -> None:
+        """Create a stopped engine process (see start()).
+
+        Args:
+            simulate: Play to a simulated controller in the child
+            realtime: Real-time profile for the child's output thread
+            tick_rate: Rate in Hz patterns are authored at
+            on_error: Called with the error message when a run fails
+            on_connection: Called with the new state when the controller
+                connects or disconnects
+        """
+        self._simulate = simulate
+        self._realtime = realtime
+        self._tick_rate = tick_rate
+        self._on_error = on_error
+        self._on_connection = on_connection
+
+        self._memory: Optional[SharedMemory] = None
+        self._control: Optional[_SeqBlock] = None
+        self._status: Optional[_SeqBlock] = None
+        self._doorbell = None
+        self._process = None
+
+        self._lock = threading.Lock()
+        self._settings = {
+            "run": 0,
+            "running": False,
+            "intensity": 128,
+            "pattern": PatternType.CONSTANT,
+            "interpolation": Interpolation.LINEAR,
+            "crossfade": 0.5,
+            "balance": 0.0,
+            "output_rate": None,
+            "slew_rate": None,
+            "max_step": None,
+        }
+        self._active = False
+        self._last = EngineStatus()
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the child process is alive."""
+        return self._process is not None and self._process.is_alive()
+
+    @property
+    def pid(self) -> Optional[int]:
+        """Get the child's process id."""
+        return self._process.pid if self._process is not None else None
+
+    @property
+    def is_active(self) -> bool:
+        """Check if a pattern is requested to play (cleared by a failed run in poll())."""
+        return self._active
+
+    @property
+    def status(self) -> EngineStatus:
+        """Read the child's latest status without waiting for it."""
+        if self._status is None:
+            return EngineStatus()
+        (
+            _, connected, connection, active, left, right, steps, dropped, resyncs,
+            mean_lateness, max_lateness, errors, error,
+        ) = self._status.read()
+        return EngineStatus(
+            connected=connected,
+            connection_type=_CONNECTIONS[connection],
+            active=active,
+            left=left,
+            right=right,
+            timing=LatenessStats(
+                steps=steps,
+                dropped=dropped,
+                resyncs=resyncs,
+                total_lateness=mean_lateness * steps,
+                max_lateness=max_lateness,
+            ),
+            errors=errors,
+            error=error.rstrip(b"\0").decode("utf-8", "replace"),
+        )
+
+    @property
+    def is_connected(self) -> bool:
+        """Check if the child has a controller connected."""
+        return self.status.connected
+
+    @property
+    def connection_type(self) -> ConnectionType:
+        """Get how the child's controller is connected."""
+        return self.status.connection_type
+
+    @property
+    def timing_stats(self) -> LatenessStats:
+        """Get per-step lateness statistics of the current or last run."""
+        return self.status.timing
+
+    def start(self, timeout: float = 10.0) -> None:
+        """Start the child process and wait until it is serving.
+
+        Args:
+            timeout: Seconds to wait for the child to start
+
+        Raises:
+            RuntimeError: If the child does not start in time
+        """
+        if self._process is not None:
+            return
+        context = multiprocessing.get_context("spawn")
+        self._memory = SharedMemory(create=True, size=_SIZE)
+        self._control = _SeqBlock(self._memory.buf, 0, _CONTROL)
+        self._status = _SeqBlock(self._memory.buf, _STATUS_OFFSET, _STATUS)
+        self._publish()
+
+        reader, self._doorbell = context.Pipe(duplex=False)
+        ready = context.Event()
+        self._process = context.Process(
+            target=_serve,
+            args=(
+                self._memory.name, reader, ready,
+                self._simulate, self._realtime, self._tick_rate,
+            ),
+            name="EngineProcess",
+            daemon=True,
+        )
+        self._process.start()
+        # Only the child may hold the read end, so it sees our exit as EOF
+        reader.close()
+        deadline = time.monotonic() + timeout
+        while not ready.wait(0.05):
+            if not self._process.is_alive() or time.monotonic() > deadline:
+                self.shutdown()
+                raise RuntimeError("Engine process did not start")
+        # Apply settings made before starting
+        self._publish()
+
+    def shutdown(self, timeout: float = 2.0) -> None:
+        """Stop the motors and end the child process.
+
+        Args:
+            timeout: Seconds to wait before killing the child
+        """
+        process = self._process
+        self._process = None
+        self._active = False
+        if self._doorbell is not None:
+            # End of file tells the child to stop, as if we had died
+            self._doorbell.close()
+            self._doorbell = None
+        if process is not None:
+            process.join(timeout)
+            if process.is_alive():
+                process.kill()
+                process.join()
+        if self._memory is not None:
+            self._control = self._status = None
+            self._memory.close()
+            self._memory.unlink()
+            self._memory = None
+
+    def poll(self) -> EngineStatus:
+        """Read the status and invoke callbacks for what changed since the last poll.
+
+        Returns:
+            The status read
+        """
+        status = self.status
+        last = self._last
+        self._last = status
+        if status.errors != last.errors:
+            self._active = False
+            if self._on_error is not None:
+                self._on_error(status.error)
+        if status.connected != last.connected:
+            if not status.connected:
+                # The child stopped playing when the controller went away
+                self._active = False
+            if self._on_connection is not None:
+                self._on_connection(status.connected)
+        return status
+
+    def start_vibration(
+        self, intensity: int = 128, pattern_type: PatternType = PatternType.CONSTANT
+    ) -> None:
+        """Start vibration with specified settings.
+
+        Args:
+            intensity: Motor intensity (0-255)
+            pattern_type: Type of vibration pattern
+        """
+        self._active = True
+        self._publish(
+            restart=True,
+            running=True,
+            intensity=max(0, min(255, intensity)),
+            pattern=pattern_type,
+        )
+
+    def stop_vibration(self) -> None:
+        """Stop vibration."""
+        self._active = False
+        self._publish(running=False)
+
+    def set_intensity(self, intensity: int) -> None:
+        """Update vibration intensity.
+
+        Args:
+            intensity: Motor intensity (0-255)
+        """
+        self._publish(intensity=max(0, min(255, intensity)))
+
+    def set_pattern(self, pattern_type: PatternType) -> None:
+        """Update vibration pattern.
+
+        Args:
+            pattern_type: Type of vibration pattern
+        """
+        self._publish(pattern=pattern_type)
+
+    def set_crossfade(self, seconds: float) -> None:
+        """Update the crossfade window used when switching patterns.
+
+        Args:
+            seconds: Crossfade length in seconds (0 switches immediately)
+        """
+        self._publish(crossfade=max(0.0, seconds))
+
+    def set_balance(self, balance: float) -> None:
+        """Shift vibration between the left and right motors.
+
+        Args:
+            balance: -1 plays only the left motor, 0 both, 1 only the right
+        """
+        self._publish(balance=max(-1.0, min(1.0, balance)))
+
+    def set_output(
+        self,
+        rate: Optional[float],
+        interpolation: Interpolation = Interpolation.LINEAR,
+        slew_rate: Optional[float] = None,
+    ) -> None:
+        """Write motors at a fixed rate, upsampling patterns to it.
+
+        Args:
+            rate: Output rate in Hz, up to MAX_OUTPUT_RATE (None writes once
+                per pattern step)
+            interpolation: Curve between pattern steps
+            slew_rate: Largest motor change in intensity units per second
+
+        Raises:
+            ValueError: If the rate is out of range
+        """
+        if rate is not None and not 0 < rate <= MAX_OUTPUT_RATE:
+            raise ValueError(f"Output rate must be between 0 and {MAX_OUTPUT_RATE:g} Hz")
+        self._publish(
+            output_rate=rate,
+            interpolation=interpolation,
+            slew_rate=slew_rate if slew_rate is None else max(0.0, slew_rate),
+        )
+
+    def set_max_step(self, seconds: Optional[float]) -> None:
+        """Bound the time until setting changes reach the motors.
+
+        Args:
+            seconds: Longest time between writes (None plays whole steps)
+
+        Raises:
+            ValueError: If the time is not positive
+        """
+        if seconds is not None and not seconds > 0:
+            raise ValueError(f"Max step must be positive, got {seconds}")
+        self._publish(max_step=seconds)
+
+    def _publish(self, restart: bool = False, **changes) -> None:
+        """Write the control block and wake the child.
+
+        Args:
+            restart: Start a new run, even if one is playing
+            **changes: Settings to change
+        """
+        with self._lock:
+            # Kept only once it packs, so one bad value cannot stick
+            settings = {**self._settings, **changes}
+            if restart:
+                settings["run"] += 1
+            if self._control is None:
+                self._settings = settings
+                return
+            self._control.write(
+                settings["run"],
+                settings["running"],
+                settings["intensity"],
+                _PATTERNS.index(settings["pattern"]),
+                _INTERPOLATIONS.index(settings["interpolation"]),
+                settings["crossfade"],
+                settings["balance"],
+                _optional(settings["output_rate"]),
+                _optional(settings["slew_rate"]),
+                _optional(settings["max_step"]),
+            )
+            self._settings = settings
+            if self._doorbell is not None:
+                try:
+                    self._doorbell.send_bytes(b"")
+                except OSError:
+                    # The child is gone; status reads keep working
+                    pass
+
+
+class _StatusWriter:
+    """Child-side state behind the status block."""
+
+    def __init__(self, block: _SeqBlock) -> None:
+        self.block = block
+        self.run = 0
+        self.connected = False
+        self.connection = ConnectionType.NONE
+        self.active = False
+        self.left = 0
+        self.right = 0
+        self.timing = LatenessStats()
+        self.errors = 0
+        self.error = b""
+
+    def write(self) -> None:
+        timing = self.timing
+        self.block.write(
+            self.run,
+            self.connected,
+            _CONNECTIONS.index(self.connection),
+            self.active,
+            self.left,
+            self.right,
+            timing.steps,
+            timing.dropped,
+            timing.resyncs,
+            timing.mean_lateness,
+            timing.max_lateness,
+            self.errors,
+            self.error,
+        )
+
+
+def _serve(
+    name: str,
+    doorbell,
+    ready,
+    simulate: bool,
+    realtime: Optional[RealtimeProfile],
+    tick_rate: float,
+) -> None:
+    """Child process entry point: play what the control block says until EOF."""
+    # Ctrl+C reaches the whole process group; the parent decides when to stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    # Only the child needs these; the parent stays free of the engine
+    from controller.device_monitor import DeviceEvent, DeviceMonitor
+    from controller.engine_core import EngineCore
+    from controller.simulated_backend import SimulatedBackend
+    from utils.config import Config
+
+    memory = SharedMemory(name)
+    control = _SeqBlock(memory.buf, 0, _CONTROL)
+    status = _StatusWriter(_SeqBlock(memory.buf, _STATUS_OFFSET, _STATUS))
+    manager = DualSenseManager()
+
+    def on_error(error: str) -> None:
+        status.active = False
+        status.errors += 1
+        status.error = error.encode("utf-8")[:_ERROR_SIZE]
+        status.timing = engine.timing_stats
+        status.write()
+
+    engine = EngineCore(on_error=on_error, tick_rate=tick_rate)
+    engine.set_realtime(realtime)
+
+    def on_telemetry() -> None:
+        # Called on the output thread, at most the telemetry rate
+        sample = engine.telemetry.latest()
+        if sample is not None:
+            status.left = sample.left
+            status.right = sample.right
+        status.timing = engine.timing_stats
+        status.write()
+
+    engine.telemetry.set_notify(on_telemetry)
+
+    def on_device(event: DeviceEvent, devices) -> None:
+        if event == DeviceEvent.DISCONNECTED:
+            engine.stop_vibration()
+            status.active = False
+        status.connected = manager.is_connected
+        status.connection = manager.connection_type
+        status.write()
+
+    monitor = None
+    if simulate:
+        manager.use_backend(SimulatedBackend())
+        manager.connect()
+        on_device(DeviceEvent.CONNECTED, [])
+    else:
+        monitor = DeviceMonitor(poll_interval=Config.CONNECTION_CHECK_INTERVAL / 1000)
+        monitor.add_listener(on_device)
+        monitor.start()
+
+    applied = None
+    ready.set()
+    try:
+        while True:
+            try:
+                doorbell.recv_bytes()
+                # Changes that rang while we were busy are all in the block
+                while doorbell.poll():
+                    doorbell.recv_bytes()
+            except (EOFError, OSError):
+                # The parent shut us down or died
+                break
+            values = _read_control(control)
+            _apply(engine, values, applied, status)
+            applied = values
+    finally:
+        engine.stop_vibration()
+        engine.shutdown()
+        if monitor is not None:
+            monitor.stop()
+        manager.disconnect()
+        status.active = False
+        status.write()
+        memory.close()
+
+
+def _apply(engine, values: tuple, applied: Optional[tuple], status: _StatusWriter) -> None:
+    """Play a control block, changing only what differs from the last one."""
+    (
+        run, running, intensity, pattern, interpolation,
+        crossfade, balance, output_rate, slew_rate, max_step,
+    ) = values
+    if applied is None:
+        # Nothing applied yet: every setting differs
+        applied = (None,) * len(values)
+    (
+        applied_run, applied_running, applied_intensity, applied_pattern, applied_interpolation,
+        applied_crossfade, applied_balance, applied_rate, applied_slew, applied_max_step,
+    ) = applied
+
+    if crossfade != applied_crossfade:
+        engine.set_crossfade(crossfade)
+    if balance != applied_balance:
+        engine.set_balance(balance)
+    if (output_rate, interpolation, slew_rate) != (applied_rate, applied_interpolation, applied_slew):
+        engine.set_output(output_rate, _INTERPOLATIONS[interpolation], slew_rate)
+    if max_step != applied_max_step:
+        engine.set_max_step(max_step)
+
+    if running and run != applied_run:
+        engine.start_vibration(intensity, _PATTERNS[pattern])
+        status.run = run
+        status.active = True
+        status.write()
+    elif running:
+        # A run that failed stays stopped until the next start
+        if engine.is_active:
+            if intensity != applied_intensity:
+                engine.set_intensity(intensity)
+            if pattern != applied_pattern:
+                engine.set_pattern(_PATTERNS[pattern])
+    elif applied_running:
+        engine.stop_vibration()
+        status.active = False
+        status.write()
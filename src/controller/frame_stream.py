@@ -0,0 +1,121 @@
+"""Externally streamed motor frames, coalesced to the engine tick."""
+
+from typing import Optional
+import time
+
+
+class FrameSlot:
+    """Latest-value slot written by a frame producer.
+
+    Writers only replace the stored frame, so a burst of frames between two
+    engine steps collapses into the newest one instead of queueing up.
+    """
+
+    def __init__(self) -> None:
+        self._frame: tuple[float, int, int] = (0.0, 0, 0)
+        self._received = 0
+        self._played = 0
+
+    @property
+    def received(self) -> int:
+        """Get the number of frames written."""
+        return self._received
+
+    @property
+    def played(self) -> int:
+        """Get the number of frames that reached the output loop."""
+        return self._played
+
+    @property
+    def coalesced(self) -> int:
+        """Get the number of frames replaced before they were played."""
+        return max(0, self._received - self._played)
+
+    def write(self, left: int, right: int, count: int = 1) -> None:
+        """Store a frame (called from any thread).
+
+        Args:
+            left: Left motor intensity (0-255)
+            right: Right motor intensity (0-255)
+            count: Frames this write stands for, when the producer already
+                dropped older ones from the same burst
+        """
+        # One tuple assignment, so readers never see a torn frame
+        self._frame = (
+            time.perf_counter(),
+            max(0, min(255, left)),
+            max(0, min(255, right)),
+        )
+        self._received += count
+
+    def take(self, since: float) -> Optional[tuple[float, int, int]]:
+        """Get the current frame if it was written after ``since``.
+
+        Args:
+            since: Timestamp of the frame taken last
+
+        Returns:
+            (timestamp, left, right), or None if nothing new arrived
+        """
+        frame = self._frame
+        if frame[0] <= since:
+            return None
+        self._played += 1
+        return frame
+
+
+class StreamCursor:
+    """Plays a FrameSlot one engine tick per step.
+
+    Has the same stepping interface as PatternCursor; intensity is applied
+    as a gain and the last frame is held until a new one arrives.
+    """
+
+    __slots__ = ("slot", "step", "gain", "remaining", "left", "right", "_raw", "_since")
+
+    finished = False
+
+    def __init__(self, slot: FrameSlot, step: float, gain: int = 255) -> None:
+        """Create a cursor.
+
+        Args:
+            slot: Slot to read
+            step: Seconds between reads (one engine tick)
+            gain: Output scale (0-255)
+        """
+        self.slot = slot
+        self.step = step
+        self.gain = gain
+        self.remaining = step
+        self.left = 0
+        self.right = 0
+        self._raw = (0, 0)
+        self._since = 0.0
+        self._next()
+
+    def seek(self, position: float) -> None:
+        """Live sources cannot seek; kept for interface compatibility."""
+
+    def set_gain(self, gain: int) -> None:
+        """Change the output scale."""
+        self.gain = gain
+        self.left = self._raw[0] * gain // 255
+        self.right = self._raw[1] * gain // 255
+
+    def _next(self) -> None:
+        frame = self.slot.take(self._since)
+        if frame is None:
+            return
+        self._since, left, right = frame
+        self._raw = (left, right)
+        self.set_gain(self.gain)
+
+    def advance(self, elapsed: float) -> None:
+        """Advance by elapsed seconds, reading the slot at each tick."""
+        remaining = self.remaining - elapsed
+        if remaining <= 1e-9:
+            self._next()
+            # Skip ticks that were missed instead of reading several times
+            while remaining <= 1e-9:
+                remaining += self.step
+        self.remaining = remaining
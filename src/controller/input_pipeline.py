@@ -0,0 +1,166 @@
+"""Controller input driving the vibration engine."""
+
+from typing import TYPE_CHECKING, Optional, Sequence
+import time
+
+from controller.patterns import LIVE_PATTERNS, PatternType
+
+if TYPE_CHECKING:
+    from pydualsense import pydualsense
+
+    from controller.engine_core import EngineCore
+
+
+# Largest touchpad X coordinate reported by pydualsense
+TOUCHPAD_WIDTH = 1919
+
+# Balance is forwarded in steps of this size, so jitter of a resting finger
+# does not produce a stream of changes
+BALANCE_STEP = 1 / 32
+
+# Buttons that can cycle patterns, by their pydualsense event
+BUTTON_EVENTS = {
+    "triangle": "triangle_pressed",
+    "circle": "circle_pressed",
+    "cross": "cross_pressed",
+    "square": "square_pressed",
+    "options": "option_pressed",
+    "share": "share_pressed",
+    "touchpad": "touch_pressed",
+}
+
+TRIGGER_EVENTS = {
+    "l2": "l2_value_changed",
+    "r2": "r2_value_changed",
+}
+
+CYCLE_PATTERNS = tuple(pattern for pattern in PatternType if pattern not in LIVE_PATTERNS)
+
+
+class InputPipeline:
+    """Forward controller input changes to an engine.
+
+    Handlers run on pydualsense's report thread as each input report is
+    parsed: trigger and button changes arrive as pydualsense events, and
+    touchpad position (which has no event) is compared after every report.
+    Only values that change after mapping are forwarded. While attached the
+    engine writes at least once per tick, so an input reaches the motors
+    within one tick; the measured delay is recorded in the engine's
+    ``instrumentation.input_latency``.
+    """
+
+    def __init__(
+        self,
+        engine: "EngineCore",
+        trigger: Optional[str] = "r2",
+        touchpad_balance: bool = True,
+        cycle_button: Optional[str] = "triangle",
+        patterns: Sequence[PatternType] = CYCLE_PATTERNS,
+    ) -> None:
+        """Create a detached pipeline.
+
+        Args:
+            engine: Engine to drive
+            trigger: Trigger whose pressure scales intensity ("l2", "r2" or None)
+            touchpad_balance: Set the left/right balance from touch position
+            cycle_button: Button that selects the next pattern (see BUTTON_EVENTS)
+            patterns: Patterns the button cycles through
+        """
+        if trigger is not None and trigger not in TRIGGER_EVENTS:
+            raise ValueError(f"Unknown trigger: {trigger}")
+        if cycle_button is not None and cycle_button not in BUTTON_EVENTS:
+            raise ValueError(f"Unknown button: {cycle_button}")
+
+        self._engine = engine
+        self._trigger = trigger
+        self._touchpad_balance = touchpad_balance
+        self._cycle_button = cycle_button
+        self._patterns = tuple(patterns)
+        self._controller: Optional["pydualsense"] = None
+        self._read_input = None
+
+        self.base_intensity = 255
+        self._intensity: Optional[int] = None
+        self._balance: Optional[float] = None
+        self._forwarded = 0
+
+    @property
+    def is_attached(self) -> bool:
+        """Check if the pipeline is listening to a controller."""
+        return self._controller is not None
+
+    @property
+    def forwarded(self) -> int:
+        """Get the number of changes forwarded to the engine."""
+        return self._forwarded
+
+    def attach(self, controller: "pydualsense") -> None:
+        """Start listening to an initialized pydualsense controller.
+
+        Args:
+            controller: Controller whose report thread is running
+        """
+        self.detach()
+        if self._trigger is not None:
+            getattr(controller, TRIGGER_EVENTS[self._trigger]).subscribe(self._on_trigger)
+        if self._cycle_button is not None:
+            getattr(controller, BUTTON_EVENTS[self._cycle_button]).subscribe(self._on_button)
+        if self._touchpad_balance:
+            read_input = controller.readInput
+            touch = controller.state.trackPadTouch0
+
+            def read_input_and_touchpad(report):
+                read_input(report)
+                if touch.isActive:
+                    self._on_touch(touch.X)
+
+            controller.readInput = read_input_and_touchpad
+            self._read_input = read_input
+        self._controller = controller
+        self._engine.set_max_step(1.0 / self._engine.tick_rate)
+
+    def detach(self) -> None:
+        """Stop listening and let the engine play whole steps again."""
+        controller = self._controller
+        if controller is None:
+            return
+        self._controller = None
+        if self._trigger is not None:
+            getattr(controller, TRIGGER_EVENTS[self._trigger]).unsubscribe(self._on_trigger)
+        if self._cycle_button is not None:
+            getattr(controller, BUTTON_EVENTS[self._cycle_button]).unsubscribe(self._on_button)
+        if self._read_input is not None:
+            # Drop the instance attribute so the class method is used again
+            del controller.readInput
+            self._read_input = None
+        self._engine.set_max_step(None)
+
+    def _on_trigger(self, value: int) -> None:
+        intensity = self.base_intensity * value // 255
+        if intensity == self._intensity:
+            return
+        self._intensity = intensity
+        self._engine.set_intensity(intensity)
+        self._forward()
+
+    def _on_touch(self, x: int) -> None:
+        position = min(max(x, 0), TOUCHPAD_WIDTH) / TOUCHPAD_WIDTH
+        balance = round((position * 2 - 1) / BALANCE_STEP) * BALANCE_STEP
+        if balance == self._balance:
+            return
+        self._balance = balance
+        self._engine.set_balance(balance)
+        self._forward()
+
+    def _on_button(self, pressed: bool) -> None:
+        if not pressed or not self._patterns:
+            return
+        # Continue from whatever is playing, which may have been set elsewhere
+        current = self._engine.worker.pattern_type
+        index = self._patterns.index(current) + 1 if current in self._patterns else 0
+        self._engine.set_pattern(self._patterns[index % len(self._patterns)])
+        self._forward()
+
+    def _forward(self) -> None:
+        self._forwarded += 1
+        self._engine.mark_input(time.perf_counter())
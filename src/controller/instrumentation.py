@@ -0,0 +1,188 @@
+"""Low-overhead timing histograms and counters for the output path."""
+
+from array import array
+from bisect import bisect_left
+from typing import Callable, Optional
+import json
+import sys
+import threading
+
+
+# Bucket upper bounds in seconds; values above the last go to an overflow bucket
+DEFAULT_BOUNDS = (
+    10e-6, 25e-6, 50e-6, 100e-6, 250e-6, 500e-6,
+    1e-3, 2.5e-3, 5e-3, 10e-3, 25e-3, 50e-3, 100e-3,
+)
+
+
+class Histogram:
+    """Fixed-bucket histogram of durations in seconds.
+
+    Recording is a bisect over the bounds and an array increment, with no
+    allocation, so it can run on every step of the output loop.
+    """
+
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds: tuple[float, ...] = DEFAULT_BOUNDS) -> None:
+        """Create an empty histogram.
+
+        Args:
+            bounds: Ascending bucket upper bounds in seconds
+        """
+        self.bounds = tuple(bounds)
+        self.counts = array("Q", bytes(8 * (len(self.bounds) + 1)))
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """Add one sample in seconds."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def reset(self) -> None:
+        """Clear every bucket."""
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @property
+    def mean(self) -> float:
+        """Get the mean sample in seconds."""
+        if self.count == 0:
+            return 0.0
+        return self.total / self.count
+
+    def percentile(self, fraction: float) -> float:
+        """Estimate a percentile as the upper bound of its bucket.
+
+        Args:
+            fraction: Percentile as a fraction (0.99 for p99)
+
+        Returns:
+            Bucket upper bound in seconds, capped at the maximum sample
+        """
+        if self.count == 0:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                if index < len(self.bounds):
+                    return min(self.bounds[index], self.max)
+                return self.max
+        return self.max
+
+    def snapshot(self) -> dict:
+        """Summarize the histogram in microseconds."""
+        buckets = [
+            [round(bound * 1e6, 3) if bound is not None else None, count]
+            for bound, count in zip(self.bounds + (None,), self.counts)
+        ]
+        return {
+            "count": self.count,
+            "mean_us": self.mean * 1e6,
+            "max_us": self.max * 1e6,
+            "p50_us": self.percentile(0.50) * 1e6,
+            "p99_us": self.percentile(0.99) * 1e6,
+            "buckets": buckets,
+        }
+
+
+class Instrumentation:
+    """Histograms and counters shared by the worker and the devices.
+
+    Histograms are only recorded while ``enabled`` is set; a disabled hot
+    path costs one attribute check per step. Failure and drop counters are
+    only touched on those rare paths, so they are always kept, as is the
+    input latency histogram (one sample per controller input change).
+    """
+
+    def __init__(self, bounds: tuple[float, ...] = DEFAULT_BOUNDS) -> None:
+        """Create disabled instrumentation.
+
+        Args:
+            bounds: Bucket upper bounds in seconds for every histogram
+        """
+        self.enabled = False
+        self.loop_time = Histogram(bounds)
+        self.write_time = Histogram(bounds)
+        self.lateness = Histogram(bounds)
+        self.input_latency = Histogram(bounds)
+        self.dropped_writes = 0
+        self.failed_writes = 0
+        self._dump_stop = threading.Event()
+        self._dump_thread: Optional[threading.Thread] = None
+
+    def enable(self, enabled: bool = True) -> None:
+        """Start or stop recording histograms."""
+        self.enabled = enabled
+
+    def reset(self) -> None:
+        """Clear histograms and counters."""
+        self.loop_time.reset()
+        self.write_time.reset()
+        self.lateness.reset()
+        self.input_latency.reset()
+        self.dropped_writes = 0
+        self.failed_writes = 0
+
+    def stats(self) -> dict:
+        """Get a JSON-serializable snapshot of every histogram and counter."""
+        return {
+            "enabled": self.enabled,
+            "loop_time": self.loop_time.snapshot(),
+            "write_time": self.write_time.snapshot(),
+            "lateness": self.lateness.snapshot(),
+            "input_latency": self.input_latency.snapshot(),
+            "dropped_writes": self.dropped_writes,
+            "failed_writes": self.failed_writes,
+        }
+
+    def start_dump(
+        self, interval: float = 10.0, sink: Optional[Callable[[dict], None]] = None
+    ) -> None:
+        """Enable recording and report stats periodically on a background thread.
+
+        Args:
+            interval: Seconds between reports
+            sink: Receives each stats snapshot (defaults to a JSON line on stderr)
+        """
+        self.stop_dump()
+        self.enable()
+        if sink is None:
+            sink = _print_stats
+        self._dump_stop.clear()
+        self._dump_thread = threading.Thread(
+            target=self._dump_loop, args=(interval, sink), name="Instrumentation", daemon=True
+        )
+        self._dump_thread.start()
+
+    def stop_dump(self) -> None:
+        """Stop periodic reports."""
+        self._dump_stop.set()
+        if self._dump_thread is not None:
+            self._dump_thread.join(1.0)
+            self._dump_thread = None
+
+    def _dump_loop(self, interval: float, sink: Callable[[dict], None]) -> None:
+        while not self._dump_stop.wait(interval):
+            try:
+                sink(self.stats())
+            except Exception:
+                pass
+
+
+def _print_stats(stats: dict) -> None:
+    print(json.dumps(stats), file=sys.stderr, flush=True)
+
+
+# Process-wide instance used by default by workers and devices
+instrumentation = Instrumentation()
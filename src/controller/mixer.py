@@ -0,0 +1,298 @@
+"""Layered mixing of several vibration sources into one motor stream."""
+
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Optional
+
+from controller.patterns import (
+    DEFAULT_TICK_RATE,
+    LIVE_PATTERNS,
+    PatternTable,
+    PatternType,
+    _numpy,
+    compile_pattern,
+)
+from controller.timeline import Timeline, TimelineCursor
+
+# Ticks rendered per block for compiled layers
+DEFAULT_BLOCK = 32
+
+
+class Route(Enum):
+    """Motors a layer is sent to."""
+    BOTH = "both"
+    LEFT = "left"
+    RIGHT = "right"
+
+
+@dataclass(frozen=True)
+class Layer:
+    """One source in a mix.
+
+    Attributes:
+        source: Pattern or timeline to play (timelines loop)
+        gain: Scale of this layer (0-1) before the mix intensity
+        route: Motors the layer drives
+    """
+    source: PatternType | Timeline
+    gain: float = 1.0
+    route: Route = Route.BOTH
+
+
+@dataclass(frozen=True, eq=False)
+class Mix:
+    """Layers summed into one output, clipped at full intensity.
+
+    Compared by identity, like Timeline, so setting a new Mix restarts
+    playback while an unchanged one keeps its phase.
+    """
+    layers: tuple[Layer, ...]
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "layers", tuple(self.layers))
+
+
+def _expand(table: PatternTable, tick_rate: float) -> tuple[list[int], list[int], list[int]]:
+    """Sample one cycle of a table at every tick.
+
+    Returns:
+        Per-tick (left, right, step index) lists covering one cycle
+    """
+    period = max(1, round(table.cycle_duration * tick_rate))
+    last = len(table.durations) - 1
+    steps = []
+    step = 0
+    end = table.durations[0]
+    for tick in range(period):
+        # Sample at the middle of the tick so step edges on the grid are stable
+        time = (tick + 0.5) / tick_rate
+        while step < last and time >= end:
+            step += 1
+            end += table.durations[step]
+        steps.append(step)
+    left = table.left
+    right = table.right
+    return [left[s] for s in steps], [right[s] for s in steps], steps
+
+
+class MixCursor:
+    """Plays a Mix at a fixed tick rate.
+
+    Compiled pattern layers are sampled on the tick grid and rendered a
+    block at a time; with NumPy every layer of a block is gathered and
+    summed in a few array operations, so extra layers add almost nothing
+    per tick. Timeline and live layers are stepped once per tick. Has the
+    same stepping interface as PatternCursor, with intensity as a gain.
+
+    Pattern layers are compiled once at full intensity and weighted while
+    rendering, so a gain change only re-renders the current block.
+    """
+
+    # Mixes play until stopped
+    finished = False
+
+    def __init__(
+        self,
+        mix: Mix,
+        tick_rate: float = DEFAULT_TICK_RATE,
+        gain: int = 255,
+        position: float = 0.0,
+        open_layer: Optional[Callable[[PatternType | Timeline, int, float], object]] = None,
+        block: int = DEFAULT_BLOCK,
+        compile: Optional[Callable[[PatternType, int], PatternTable]] = None,
+    ) -> None:
+        """Create a cursor.
+
+        Args:
+            mix: Mix to play
+            tick_rate: Common step rate of every layer in Hz
+            gain: Output scale (0-255)
+            position: Start position in seconds
+            open_layer: Opens a cursor for a timeline or live layer, given the
+                source, its gain and the start position (live patterns need it)
+            block: Ticks rendered per block for compiled layers
+            compile: Compiles a pattern layer at an intensity (defaults to
+                compile_pattern at tick_rate)
+        """
+        self.mix = mix
+        self.step = 1.0 / tick_rate
+        self.gain = gain
+        self.remaining = self.step
+        self.left = 0
+        self.right = 0
+        self._tick_rate = tick_rate
+        self._block = max(1, block)
+        self._open_layer = open_layer if open_layer is not None else _open_timeline
+        if compile is None:
+            def compile(pattern_type: PatternType, intensity: int) -> PatternTable:
+                return compile_pattern(pattern_type, intensity, tick_rate)
+        self._compile_table = compile
+
+        self._tick = round(position * tick_rate)
+        self._index = 0
+        self._block_left: list[int] = []
+        self._block_right: list[int] = []
+
+        # Compiled layers: per-tick tracks at full intensity, routed, and
+        # the weight of each at the current gain
+        self._compiled: list[Layer] = []
+        self._tracks: list[tuple[list[int], list[int]]] = []
+        self._weights: list[float] = []
+        self._arrays = None
+        self._weight_array = None
+        # First layer with other channels: (layer, steps), and its table
+        # compiled at the gain its fields were last read at
+        self._lead: Optional[tuple[Layer, list[int]]] = None
+        self._lead_table: Optional[PatternTable] = None
+        # Timeline and live layers: (cursor, layer)
+        self._stepped: list[tuple[object, Layer]] = []
+
+        for layer in mix.layers:
+            if isinstance(layer.source, PatternType) and layer.source not in LIVE_PATTERNS:
+                self._compiled.append(layer)
+            else:
+                cursor = self._open_layer(layer.source, self._layer_gain(layer), position)
+                self._stepped.append((cursor, layer))
+        self._compile()
+        self._weigh()
+        self._render()
+        self._load()
+
+    def _layer_gain(self, layer: Layer) -> int:
+        return max(0, min(255, round(self.gain * layer.gain)))
+
+    def _compile(self) -> None:
+        """Compile every pattern layer at full intensity and sample it per tick."""
+        self._tracks = []
+        self._lead = None
+        for layer in self._compiled:
+            table = self._compile_table(layer.source, 255)
+            left, right, steps = _expand(table, self._tick_rate)
+            if layer.route is Route.RIGHT:
+                left = [0] * len(left)
+            elif layer.route is Route.LEFT:
+                right = [0] * len(right)
+            self._tracks.append((left, right))
+            # The first layer with other channels drives them
+            if self._lead is None and table.tracks:
+                self._lead = (layer, steps)
+
+        self._arrays = None
+        np = _numpy()
+        if np is not None and self._tracks:
+            periods = np.array([len(left) for left, _ in self._tracks])
+            width = int(periods.max())
+            left = np.zeros((len(self._tracks), width), dtype=np.uint16)
+            right = np.zeros_like(left)
+            for row, (left_track, right_track) in enumerate(self._tracks):
+                left[row, :len(left_track)] = left_track
+                right[row, :len(right_track)] = right_track
+            self._arrays = (periods[:, None], left, right)
+
+    def _weigh(self) -> None:
+        """Weight each compiled layer for the current gain."""
+        self._weights = [self._layer_gain(layer) / 255 for layer in self._compiled]
+        np = _numpy()
+        if self._arrays is not None:
+            self._weight_array = np.array(self._weights)[:, None]
+        self._lead_table = None
+
+    def _render(self) -> None:
+        """Sum the compiled layers for the block starting at the current tick."""
+        start = self._tick
+        count = self._block
+        self._index = 0
+        if not self._tracks:
+            self._block_left = [0] * count
+            self._block_right = [0] * count
+            return
+
+        if self._arrays is not None:
+            np = _numpy()
+            periods, left, right = self._arrays
+            weights = self._weight_array
+            index = (start + np.arange(count))[None, :] % periods
+            block_left = (np.take_along_axis(left, index, axis=1) * weights).sum(axis=0)
+            block_right = (np.take_along_axis(right, index, axis=1) * weights).sum(axis=0)
+            self._block_left = np.minimum(block_left + 0.5, 255).astype(np.int64).tolist()
+            self._block_right = np.minimum(block_right + 0.5, 255).astype(np.int64).tolist()
+            return
+
+        block_left = [0.0] * count
+        block_right = [0.0] * count
+        for (left, right), weight in zip(self._tracks, self._weights):
+            period = len(left)
+            for i in range(count):
+                tick = (start + i) % period
+                block_left[i] += left[tick] * weight
+                block_right[i] += right[tick] * weight
+        self._block_left = [min(255, int(value + 0.5)) for value in block_left]
+        self._block_right = [min(255, int(value + 0.5)) for value in block_right]
+
+    def _load(self) -> None:
+        """Set the output of the current tick."""
+        left = self._block_left[self._index]
+        right = self._block_right[self._index]
+        for cursor, layer in self._stepped:
+            if layer.route is not Route.RIGHT:
+                left += cursor.left
+            if layer.route is not Route.LEFT:
+                right += cursor.right
+        self.left = min(255, left)
+        self.right = min(255, right)
+
+    def fields(self) -> Optional[dict[str, object]]:
+        """Get the non-rumble output fields of the lead pattern layer."""
+        if self._lead is None:
+            return None
+        layer, steps = self._lead
+        table = self._lead_table
+        if table is None:
+            # Compiled on first read after a gain change; tables share
+            # their layout across intensities, so the steps still apply
+            table = self._lead_table = self._compile_table(layer.source, self._layer_gain(layer))
+        return table.fields(steps[(self._tick + self._index) % len(steps)])
+
+    def seek(self, position: float) -> None:
+        """Move every layer to a position in seconds."""
+        self._tick = round(position * self._tick_rate)
+        self.remaining = self.step
+        for cursor, _ in self._stepped:
+            cursor.seek(position)
+        self._render()
+        self._load()
+
+    def set_gain(self, gain: int) -> None:
+        """Change the output scale without moving the cursor."""
+        self.gain = gain
+        for cursor, layer in self._stepped:
+            cursor.set_gain(self._layer_gain(layer))
+        self._tick += self._index
+        self._weigh()
+        self._render()
+        self._load()
+
+    def advance(self, elapsed: float) -> None:
+        """Advance by elapsed seconds, one tick of every layer at a time."""
+        remaining = self.remaining - elapsed
+        if remaining > 1e-9:
+            self.remaining = remaining
+            return
+        step = self.step
+        while remaining <= 1e-9:
+            remaining += step
+            for cursor, _ in self._stepped:
+                cursor.advance(step)
+            self._index += 1
+            if self._index == len(self._block_left):
+                self._tick += self._index
+                self._render()
+        self.remaining = remaining
+        self._load()
+
+
+def _open_timeline(source: PatternType | Timeline, gain: int, position: float) -> TimelineCursor:
+    """Open a layer cursor without the engine's live sources."""
+    if not isinstance(source, Timeline):
+        raise ValueError(f"{source.value} layers need an engine to play")
+    return TimelineCursor(source, position, loop=True, gain=gain)
@@ -0,0 +1,44 @@
+"""Output frame committed to the controller in a single report."""
+
+from dataclasses import dataclass
+from typing import Optional, Protocol
+
+
+@dataclass(frozen=True)
+class TriggerEffect:
+    """Adaptive trigger effect.
+
+    Attributes:
+        mode: pydualsense ``TriggerModes`` value
+        forces: Up to seven force parameters (0-255)
+    """
+    mode: int = 0
+    forces: tuple[int, ...] = ()
+
+
+@dataclass(frozen=True)
+class OutputFrame:
+    """Complete set of output fields for one report.
+
+    Optional fields left as None keep the controller's current state.
+    ``player_leds`` is a 5-bit mask, one bit per LED from left to right.
+    """
+    left_motor: int = 0
+    right_motor: int = 0
+    left_trigger: Optional[TriggerEffect] = None
+    right_trigger: Optional[TriggerEffect] = None
+    lightbar: Optional[tuple[int, int, int]] = None
+    player_leds: Optional[int] = None
+
+
+STOP_FRAME = OutputFrame()
+
+
+class MotorOutput(Protocol):
+    """Destination for motor values (a manager, device or device pool)."""
+
+    def set_motors(self, left: int, right: int) -> None:
+        ...
+
+    def stop_motors(self) -> None:
+        ...
@@ -1,9 +1,44 @@
 """Vibration pattern generators."""
 
+from array import array
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Generator
+from functools import lru_cache
+from typing import Callable, Generator, Optional
 import math
 
+from controller.compositor import CHANNEL_FIELDS, Channel
+from controller.output_frame import TriggerEffect
+
+# NumPy is optional (tables fall back to pure Python) and imported on first
+# use, so starting a pattern does not pay for it
+_np = None
+_np_checked = False
+
+
+def _numpy():
+    """Get the numpy module, or None if it is not installed."""
+    global _np, _np_checked
+    if not _np_checked:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = None
+        _np_checked = True
+    return _np
+
+
+# Step rate of continuously modulated patterns (Constant, Wave) in Hz
+DEFAULT_TICK_RATE = 20.0
+
+# Length of one Wave cycle in seconds
+WAVE_PERIOD = 2.0
+
+# pydualsense TriggerModes.Rigid: continuous resistance, forces are
+# (start position, strength)
+TRIGGER_RIGID = 0x1
+
 
 class PatternType(Enum):
     """Available vibration patterns."""
@@ -11,6 +46,12 @@ class PatternType(Enum):
     PULSE = "Pulse"
     WAVE = "Wave"
     HEARTBEAT = "Heartbeat"
+    AUDIO = "Audio"
+    STREAM = "Stream"
+
+
+# Patterns driven by a live source rather than a compiled table
+LIVE_PATTERNS = frozenset({PatternType.AUDIO, PatternType.STREAM})
 
 
 def constant_pattern(intensity: int) -> Generator[tuple[int, int, float], None, None]:
@@ -98,3 +139,201 @@ def get_pattern_generator(
 
     generator_func = generators.get(pattern_type, constant_pattern)
     return generator_func(intensity)
+
+
+@dataclass(frozen=True)
+class PatternTable:
+    """One cycle of a pattern compiled into parallel arrays.
+
+    Attributes:
+        left: Left motor intensities, ``array('B')``
+        right: Right motor intensities, ``array('B')``
+        durations: Step durations in seconds, ``array('f')``
+        tracks: Per-step values of other output channels, keyed by
+            OutputFrame field (e.g. ``lightbar``), each as long as durations
+    """
+    left: array
+    right: array
+    durations: array
+    tracks: dict[str, tuple] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.durations)
+
+    @property
+    def channels(self) -> Channel:
+        """Get the output channels this pattern drives."""
+        channels = Channel.RUMBLE
+        for name in self.tracks:
+            channels |= CHANNEL_FIELDS[name]
+        return channels
+
+    def fields(self, step: int) -> Optional[dict[str, object]]:
+        """Get the non-rumble output fields of a step (None if there are none)."""
+        if not self.tracks:
+            return None
+        return {name: track[step] for name, track in self.tracks.items()}
+
+    @property
+    def cycle_duration(self) -> float:
+        """Get the length of one cycle in seconds."""
+        return sum(self.durations)
+
+
+def _table(values: list[int], durations: list[float], **tracks: tuple) -> PatternTable:
+    """Build a table that drives both motors with the same values."""
+    motor = array("B", values)
+    return PatternTable(motor, array("B", motor), array("f", durations), tracks)
+
+
+def _compile_constant(intensity: int, tick_rate: float) -> PatternTable:
+    return _table([intensity], [1.0 / tick_rate])
+
+
+def _compile_pulse(intensity: int, tick_rate: float) -> PatternTable:
+    # Triggers stiffen and every player LED lights on the beat
+    kick = TriggerEffect(TRIGGER_RIGID, (0, intensity))
+    triggers = (kick, TriggerEffect())
+    return _table(
+        [intensity, 0],
+        [0.3, 0.3],
+        left_trigger=triggers,
+        right_trigger=triggers,
+        player_leds=(0b11111, 0),
+    )
+
+
+def _compile_wave(intensity: int, tick_rate: float) -> PatternTable:
+    steps = max(1, round(WAVE_PERIOD * tick_rate))
+    step_duration = 1.0 / tick_rate
+
+    np = _numpy()
+    if np is not None:
+        phase = np.arange(steps) * (2 * np.pi / steps)
+        values = (intensity * ((np.sin(phase) + 1) / 2)).astype(np.uint8)
+        motor = array("B", values.tobytes())
+        durations = array("f", np.full(steps, step_duration, dtype=np.float32).tobytes())
+        return PatternTable(motor, array("B", motor), durations, _wave_tracks(motor))
+
+    values = [
+        int(intensity * ((math.sin(2 * math.pi * step / steps) + 1) / 2))
+        for step in range(steps)
+    ]
+    return _table(values, [step_duration] * steps, **_wave_tracks(values))
+
+
+def _wave_tracks(values) -> dict[str, tuple]:
+    # The lightbar swells with the wave
+    return {"lightbar": tuple((0, 0, value) for value in values)}
+
+
+def _compile_heartbeat(intensity: int, tick_rate: float) -> PatternTable:
+    weak = int(intensity * 0.7)
+    values = [intensity, 0, weak, 0]
+    # The lightbar flashes red with each beat
+    lightbar = tuple((value, 0, 0) for value in values)
+    return _table(values, [0.1, 0.1, 0.1, 0.6], lightbar=lightbar)
+
+
+def _compile_silence(intensity: int, tick_rate: float) -> PatternTable:
+    return _table([0], [1.0 / tick_rate])
+
+
+_COMPILERS: dict[PatternType, Callable[[int, float], PatternTable]] = {
+    PatternType.CONSTANT: _compile_constant,
+    PatternType.PULSE: _compile_pulse,
+    PatternType.WAVE: _compile_wave,
+    PatternType.HEARTBEAT: _compile_heartbeat,
+    # Played from an AudioSource; silent until one is attached
+    PatternType.AUDIO: _compile_silence,
+    # Played from a FrameSlot fed by a client; silent until one is attached
+    PatternType.STREAM: _compile_silence,
+}
+
+
+@lru_cache(maxsize=128)
+def compile_pattern(
+    pattern_type: PatternType, intensity: int, tick_rate: float = DEFAULT_TICK_RATE
+) -> PatternTable:
+    """Compile one cycle of a pattern into a cached table.
+
+    Tables are shared between callers and must not be modified.
+
+    Args:
+        pattern_type: The type of pattern to compile
+        intensity: Motor intensity (0-255)
+        tick_rate: Step rate in Hz for continuously modulated patterns
+
+    Returns:
+        PatternTable holding one cycle of (left, right, duration) steps
+    """
+    compiler = _COMPILERS.get(pattern_type, _compile_constant)
+    return compiler(max(0, min(255, intensity)), tick_rate)
+
+
+class PatternCursor:
+    """Playback position within a pattern table.
+
+    The cursor tracks the current step and the time left in it, so the
+    table can be swapped (e.g. for a new intensity) without losing phase.
+    """
+
+    __slots__ = ("table", "step", "remaining")
+
+    # Patterns loop forever
+    finished = False
+
+    def __init__(self, table: PatternTable, position: float = 0.0) -> None:
+        """Create a cursor.
+
+        Args:
+            table: Table to play
+            position: Pattern clock in seconds, wrapped to one cycle
+        """
+        self.table = table
+        self.step = 0
+        self.remaining = 0.0
+        self.seek(position)
+
+    @property
+    def left(self) -> int:
+        """Get the left motor intensity of the current step."""
+        return self.table.left[self.step]
+
+    @property
+    def right(self) -> int:
+        """Get the right motor intensity of the current step."""
+        return self.table.right[self.step]
+
+    def fields(self) -> Optional[dict[str, object]]:
+        """Get the non-rumble output fields of the current step."""
+        return self.table.fields(self.step)
+
+    def seek(self, position: float) -> None:
+        """Move to a position in seconds from the start of the cycle."""
+        durations = self.table.durations
+        cycle = self.table.cycle_duration
+        position = position % cycle if cycle > 0 else 0.0
+
+        step = 0
+        last = len(durations) - 1
+        while step < last and position >= durations[step]:
+            position -= durations[step]
+            step += 1
+
+        self.step = step
+        self.remaining = max(0.0, durations[step] - position)
+
+    def advance(self, elapsed: float) -> None:
+        """Advance the cursor by elapsed seconds."""
+        durations = self.table.durations
+        step_count = len(durations)
+        remaining = self.remaining - elapsed
+        step = self.step
+        while remaining <= 1e-9:
+            step += 1
+            if step == step_count:
+                step = 0
+            remaining += durations[step]
+        self.step = step
+        self.remaining = remaining
@@ -0,0 +1,212 @@
+"""Opt-in real-time scheduling and garbage collection control for the output thread."""
+
+from dataclasses import dataclass, field
+from typing import Optional
+import gc
+import os
+import threading
+
+
+# Idle time before the next step needed to run a deferred collection
+DEFAULT_GC_SLACK = 0.001
+# Young collections overdue by this factor run without waiting for idle
+# time, so outputs too fast to leave any still bound memory growth
+_OVERDUE = 8
+
+
+@dataclass(frozen=True)
+class RealtimeProfile:
+    """How the output thread is scheduled while it plays.
+
+    Each setting is applied where the platform and permissions allow it,
+    and skipped otherwise (see RealtimeStatus).
+
+    Attributes:
+        priority: SCHED_FIFO priority (1-99) for the output thread (Linux,
+            needs CAP_SYS_NICE or an rtprio limit)
+        nice: Niceness for the output thread when SCHED_FIFO is not set
+            or not permitted (negative values need privileges)
+        cpus: CPUs the output thread is pinned to
+        freeze_gc: Move everything allocated during warm-up out of the
+            collector's reach with gc.freeze()
+        defer_gc: Disable automatic collection while playing and collect
+            in the idle time before a step instead
+        gc_slack: Idle time in seconds a deferred collection needs
+    """
+    priority: Optional[int] = 10
+    nice: Optional[int] = -10
+    cpus: Optional[frozenset[int]] = None
+    freeze_gc: bool = True
+    defer_gc: bool = True
+    gc_slack: float = DEFAULT_GC_SLACK
+
+
+@dataclass
+class RealtimeStatus:
+    """What a profile actually changed on the output thread."""
+    scheduler: str = "default"
+    cpus: Optional[frozenset[int]] = None
+    gc_frozen: int = 0
+    gc_deferred: bool = False
+    errors: list[str] = field(default_factory=list)
+
+    def describe(self) -> str:
+        """Summarize the status in one line."""
+        parts = [f"scheduler {self.scheduler}"]
+        if self.cpus is not None:
+            parts.append(f"cpus {','.join(map(str, sorted(self.cpus)))}")
+        if self.gc_frozen:
+            parts.append(f"{self.gc_frozen} objects frozen")
+        if self.gc_deferred:
+            parts.append("gc deferred")
+        parts.extend(f"skipped {error}" for error in self.errors)
+        return ", ".join(parts)
+
+
+class RealtimeThread:
+    """Applies a RealtimeProfile to the thread that calls enter().
+
+    Scheduling and affinity are per thread (Linux applies them to the
+    calling thread), so enter() and leave() must run on the output thread.
+    Garbage collection settings are process-wide: while deferred, no
+    thread collects automatically and collect_idle() does it instead.
+    """
+
+    def __init__(self, profile: RealtimeProfile) -> None:
+        """Create a controller for one profile.
+
+        Args:
+            profile: Settings to apply
+        """
+        self.profile = profile
+        self.status = RealtimeStatus()
+        self._saved_policy: Optional[tuple[int, int]] = None
+        self._saved_nice: Optional[int] = None
+        self._saved_cpus: Optional[set[int]] = None
+        self._gc_was_enabled = False
+        self._thresholds = gc.get_threshold()
+
+    def enter(self) -> RealtimeStatus:
+        """Apply scheduling and affinity to the calling thread.
+
+        Returns:
+            What was applied
+        """
+        profile = self.profile
+        status = self.status = RealtimeStatus()
+        tid = threading.get_native_id()
+
+        if profile.priority is not None:
+            try:
+                self._saved_policy = (os.sched_getscheduler(0), os.sched_getparam(0).sched_priority)
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(profile.priority))
+                status.scheduler = f"fifo {profile.priority}"
+            except (AttributeError, OSError) as e:
+                self._saved_policy = None
+                status.errors.append(f"SCHED_FIFO ({_reason(e)})")
+        if status.scheduler == "default" and profile.nice is not None:
+            try:
+                self._saved_nice = os.getpriority(os.PRIO_PROCESS, tid)
+                os.setpriority(os.PRIO_PROCESS, tid, profile.nice)
+                status.scheduler = f"nice {profile.nice}"
+            except (AttributeError, OSError) as e:
+                self._saved_nice = None
+                status.errors.append(f"nice {profile.nice} ({_reason(e)})")
+
+        if profile.cpus is not None:
+            try:
+                self._saved_cpus = os.sched_getaffinity(0)
+                os.sched_setaffinity(0, profile.cpus)
+                status.cpus = frozenset(os.sched_getaffinity(0))
+            except (AttributeError, OSError) as e:
+                self._saved_cpus = None
+                status.errors.append(f"affinity ({_reason(e)})")
+        return status
+
+    def warmed_up(self) -> None:
+        """Freeze and defer garbage collection once the loop's data is built.
+
+        Call after the first cursor is opened, before timing starts; the
+        full collection here keeps garbage out of the frozen generation.
+        """
+        profile = self.profile
+        if profile.freeze_gc:
+            gc.collect()
+            gc.freeze()
+            self.status.gc_frozen = gc.get_freeze_count()
+        if profile.defer_gc:
+            self._thresholds = gc.get_threshold()
+            self._gc_was_enabled = gc.isenabled()
+            gc.disable()
+            self.status.gc_deferred = True
+
+    def collect_idle(self, idle: float) -> None:
+        """Run a deferred collection that is due, if ``idle`` seconds allow it.
+
+        Generations are chosen as automatic collection would choose them,
+        so deferring changes when collections happen, not how many. A young
+        collection far overdue runs even without the idle time.
+
+        Args:
+            idle: Seconds until the next step
+        """
+        count0, count1, count2 = gc.get_count()
+        threshold0, threshold1, threshold2 = self._thresholds
+        if not threshold0 or count0 < threshold0:
+            return
+        if idle < self.profile.gc_slack:
+            if count0 >= _OVERDUE * threshold0:
+                gc.collect(0)
+            return
+        if count1 >= threshold1:
+            gc.collect(2 if threshold2 and count2 >= threshold2 else 1)
+        else:
+            gc.collect(0)
+
+    def leave(self) -> None:
+        """Restore the calling thread and the collector."""
+        if self.status.gc_deferred and self._gc_was_enabled:
+            gc.enable()
+        if self.status.gc_frozen:
+            gc.unfreeze()
+        tid = threading.get_native_id()
+        try:
+            if self._saved_policy is not None:
+                policy, priority = self._saved_policy
+                os.sched_setscheduler(0, policy, os.sched_param(priority))
+            if self._saved_nice is not None:
+                os.setpriority(os.PRIO_PROCESS, tid, self._saved_nice)
+            if self._saved_cpus is not None:
+                os.sched_setaffinity(0, self._saved_cpus)
+        except OSError:
+            # Raising priority back needs no privilege, but lowering nice
+            # again can; the thread keeps the profile's setting then
+            pass
+        self._saved_policy = self._saved_nice = self._saved_cpus = None
+        self.status = RealtimeStatus()
+
+
+def _reason(error: Exception) -> str:
+    if isinstance(error, AttributeError):
+        return "not supported on this platform"
+    if isinstance(error, PermissionError):
+        return "not permitted"
+    return error.strerror or str(error)
+
+
+def parse_cpus(value: str) -> frozenset[int]:
+    """Parse a CPU list such as ``2,3`` or ``0-3``.
+
+    Raises:
+        ValueError: If the list is malformed
+    """
+    cpus = set()
+    for part in value.split(","):
+        first, _, last = part.strip().partition("-")
+        if last:
+            cpus.update(range(int(first), int(last) + 1))
+        else:
+            cpus.add(int(first))
+    if not cpus or min(cpus) < 0:
+        raise ValueError(f"invalid CPU list: {value!r}")
+    return frozenset(cpus)
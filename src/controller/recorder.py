@@ -0,0 +1,343 @@
+"""Session recording of motor output to compact binary files.
+
+File layout (little-endian)::
+
+    header  magic "DSRC", version u16, reserved u16, started_ns u64
+            (wall-clock time.time_ns() when recording started)
+    blocks  repeated to the end of the file, each
+            count u32, dropped u32 (frames lost before this block),
+            first_us u64 (time of the first frame since recording started)
+            times  count unsigned LEB128 varints, microseconds since the
+                   previous frame (the first is relative to first_us)
+            left   u8[count] change from the previous value, mod 256
+            right  u8[count] change from the previous value, mod 256
+
+Values in a block start from 0, so every block decodes on its own and a
+file cut short by a crash loses at most its last block.
+"""
+
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+import struct
+import threading
+import time
+
+
+MAGIC = b"DSRC"
+VERSION = 1
+DEFAULT_CAPACITY = 8192
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+_HEADER = struct.Struct("<4sHHQ")
+_BLOCK = struct.Struct("<IIQ")
+
+
+class RecordingError(Exception):
+    """Raised when a recording file is invalid."""
+
+
+def _encode_block(times: array, left: array, right: array, dropped: int) -> bytes:
+    """Delta-encode one block of frames (times in nanoseconds)."""
+    out = bytearray(_BLOCK.pack(len(times), dropped, times[0] // 1000))
+    previous = times[0] // 1000
+    for t in times:
+        us = t // 1000
+        delta = us - previous
+        previous = us
+        while delta >= 0x80:
+            out.append((delta & 0x7F) | 0x80)
+            delta >>= 7
+        out.append(delta)
+    for values in (left, right):
+        previous = 0
+        for value in values:
+            out.append((value - previous) & 0xFF)
+            previous = value
+    return bytes(out)
+
+
+class SessionRecorder:
+    """Records timestamped motor frames to a recording file.
+
+    append() only stores into preallocated arrays used as a ring buffer, so
+    it is safe to call on every step of the output loop. A background
+    thread takes whatever accumulated, in bulk, once per flush interval or
+    when the buffer is half full, and writes it as one block. If the
+    writer laps the flusher, the oldest frames are dropped and counted.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        capacity: int = DEFAULT_CAPACITY,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    ) -> None:
+        """Create a stopped recorder.
+
+        Args:
+            path: Recording file to write (replaced if it exists)
+            capacity: Frames the ring buffer holds
+            flush_interval: Longest time in seconds between flushes
+        """
+        self._path = Path(path)
+        self._capacity = max(2, capacity)
+        self._flush_interval = flush_interval
+        self._times = array("q", bytes(8 * self._capacity))
+        self._left = array("B", bytes(self._capacity))
+        self._right = array("B", bytes(self._capacity))
+        # Frames appended (written by the output thread only) and frames
+        # taken by the flusher (written by the flusher only)
+        self._written = 0
+        self._taken = 0
+        self._dropped = 0
+        self._origin = time.perf_counter_ns()
+        self._file = None
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "SessionRecorder":
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    @property
+    def path(self) -> Path:
+        """Get the recording file path."""
+        return self._path
+
+    @property
+    def frames(self) -> int:
+        """Get the number of frames appended."""
+        return self._written
+
+    @property
+    def dropped(self) -> int:
+        """Get the number of frames lost because the buffer overflowed."""
+        return self._dropped
+
+    @property
+    def is_recording(self) -> bool:
+        """Check if the flush thread is running."""
+        return self._thread is not None
+
+    def start(self) -> None:
+        """Create the file and start the flush thread.
+
+        Raises:
+            OSError: If the file cannot be created
+        """
+        if self._thread is not None:
+            return
+        self._file = open(self._path, "wb")
+        self._file.write(_HEADER.pack(MAGIC, VERSION, 0, time.time_ns()))
+        self._origin = time.perf_counter_ns()
+        # Frames appended before starting are not part of the session
+        self._taken = self._written
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._flush_loop, name="SessionRecorder", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Flush what is buffered, stop the thread and close the file."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._thread = None
+        self._stop_event.set()
+        self._wake.set()
+        thread.join()
+        self._flush()
+        self._file.close()
+        self._file = None
+
+    def append(self, left: int, right: int) -> None:
+        """Record a frame written now (called from the output loop).
+
+        Args:
+            left: Left motor intensity (0-255)
+            right: Right motor intensity (0-255)
+        """
+        written = self._written
+        slot = written % self._capacity
+        self._times[slot] = time.perf_counter_ns() - self._origin
+        self._left[slot] = left
+        self._right[slot] = right
+        self._written = written + 1
+        if written + 1 - self._taken == self._capacity // 2:
+            self._wake.set()
+
+    def _flush_loop(self) -> None:
+        while not self._stop_event.is_set():
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            self._flush()
+
+    def _take(self) -> Optional[tuple[array, array, array, int]]:
+        """Copy the frames appended since the last take out of the ring."""
+        capacity = self._capacity
+        written = self._written
+        start = self._taken
+        if written == start:
+            return None
+        dropped = 0
+        if written - start > capacity:
+            dropped = written - capacity - start
+            start = written - capacity
+
+        times = array("q")
+        left = array("B")
+        right = array("B")
+        first = start % capacity
+        last = first + (written - start)
+        for begin, end in ((first, min(last, capacity)), (0, max(0, last - capacity))):
+            times.extend(self._times[begin:end])
+            left.extend(self._left[begin:end])
+            right.extend(self._right[begin:end])
+
+        # Slots the writer reused while they were copied (including the one
+        # it may be writing now) hold newer frames, so drop them
+        lapped = self._written - capacity + 1 - start
+        if lapped > 0:
+            dropped += lapped
+            del times[:lapped], left[:lapped], right[:lapped]
+        self._taken = written
+        self._dropped += dropped
+        return times, left, right, dropped
+
+    def _flush(self) -> None:
+        taken = self._take()
+        if taken is None:
+            return
+        times, left, right, dropped = taken
+        if times:
+            self._file.write(_encode_block(times, left, right, dropped))
+            self._file.flush()
+
+
+@dataclass
+class Recording:
+    """Decoded recording.
+
+    Has the read interface of Timeline (find, record, end_ms, duration), so
+    a TimelineCursor, and so the engine, plays it back frame for frame at
+    the recorded microsecond timing.
+
+    Attributes:
+        started_ns: Wall-clock time.time_ns() when recording started
+        times: Frame times in microseconds since recording started
+        left: Left motor value of each frame
+        right: Right motor value of each frame
+        dropped: Frames lost to buffer overflow while recording
+    """
+    started_ns: int
+    times: array
+    left: array
+    right: array
+    dropped: int = 0
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @property
+    def duration(self) -> float:
+        """Get the time from the first to the last frame in seconds."""
+        if not self.times:
+            return 0.0
+        return (self.times[-1] - self.times[0]) / 1e6
+
+    def close(self) -> None:
+        """Do nothing; recordings are held in memory."""
+
+    def find(self, ms: float) -> int:
+        """Find the frame active at a time since the first frame.
+
+        Args:
+            ms: Time in milliseconds
+
+        Returns:
+            Index of the last frame at or before ``ms``
+        """
+        if not self.times:
+            return 0
+        return max(0, bisect_right(self.times, self.times[0] + ms * 1000) - 1)
+
+    def record(self, index: int) -> tuple[float, int, int]:
+        """Get a frame as (time_ms since the first frame, left, right)."""
+        return (
+            (self.times[index] - self.times[0]) / 1000,
+            self.left[index],
+            self.right[index],
+        )
+
+    def end_ms(self, index: int) -> float:
+        """Get the time at which a frame was replaced."""
+        if index + 1 < len(self.times):
+            return self.record(index + 1)[0]
+        return self.duration * 1000
+
+
+def read_recording(path: str | Path) -> Recording:
+    """Decode a recording file.
+
+    A truncated last block, left by a crash while recording, is ignored.
+
+    Args:
+        path: Recording file
+
+    Returns:
+        Every recorded frame
+
+    Raises:
+        RecordingError: If the file is not a recording
+    """
+    path = Path(path)
+    data = path.read_bytes()
+    if len(data) < _HEADER.size:
+        raise RecordingError(f"{path.name} is truncated")
+    magic, version, _, started_ns = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise RecordingError(f"{path.name} is not a version {VERSION} recording")
+
+    times = array("q")
+    left = array("B")
+    right = array("B")
+    dropped = 0
+    offset = _HEADER.size
+    while offset + _BLOCK.size <= len(data):
+        count, block_dropped, us = _BLOCK.unpack_from(data, offset)
+        position = offset + _BLOCK.size
+        block_times = array("q")
+        for _ in range(count):
+            delta = 0
+            shift = 0
+            while position < len(data):
+                byte = data[position]
+                position += 1
+                delta |= (byte & 0x7F) << shift
+                shift += 7
+                if byte < 0x80:
+                    break
+            else:
+                break
+            us += delta
+            block_times.append(us)
+        if len(block_times) < count or position + 2 * count > len(data):
+            break
+        for values in (left, right):
+            value = 0
+            for delta in data[position:position + count]:
+                value = (value + delta) & 0xFF
+                values.append(value)
+            position += count
+        times.extend(block_times)
+        dropped += block_dropped
+        offset = position
+    return Recording(started_ns, times, left, right, dropped)
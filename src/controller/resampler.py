@@ -0,0 +1,204 @@
+"""Upsampling of coarse pattern tables to a high output rate."""
+
+from array import array
+from enum import Enum
+from functools import lru_cache
+
+from controller.patterns import (
+    DEFAULT_TICK_RATE,
+    PatternTable,
+    PatternType,
+    _numpy,
+    compile_pattern,
+)
+
+# Highest supported output rate in Hz; pydualsense sends a report per input
+# report (about 250 Hz over USB), so faster writes only add CPU cost
+MAX_OUTPUT_RATE = 1000.0
+
+
+class Interpolation(Enum):
+    """Curve used between pattern steps."""
+    STEP = "step"  # Hold each step, as authored
+    LINEAR = "linear"
+    CUBIC = "cubic"  # Catmull-Rom through the neighbouring steps
+
+
+def _curve_weights(interpolation: Interpolation, x: float) -> tuple[float, ...]:
+    """Weights of steps (k-2, k-1, k, k+1) at position x (0-1) of the k-1 -> k blend."""
+    if interpolation is Interpolation.LINEAR:
+        return (0.0, 1.0 - x, x, 0.0)
+    x2 = x * x
+    x3 = x2 * x
+    return (
+        -0.5 * x + x2 - 0.5 * x3,
+        1.0 - 2.5 * x2 + 1.5 * x3,
+        0.5 * x + 2.0 * x2 - 1.5 * x3,
+        -0.5 * x2 + 0.5 * x3,
+    )
+
+
+@lru_cache(maxsize=64)
+def _resample_weights(
+    durations: tuple[float, ...],
+    rate: float,
+    tick_rate: float,
+    interpolation: Interpolation,
+) -> tuple[float, tuple[int, ...], tuple[tuple[int, ...], ...], tuple[tuple[float, ...], ...]]:
+    """Express every output sample as a weighted sum of table steps.
+
+    Each step is held, and the change into it is blended over a window
+    centred on the step boundary, no longer than either step or one
+    pattern tick. For patterns authored one tick per step (Wave) this is
+    plain interpolation between steps; pulses keep their flat tops and
+    get softened edges. The result only depends on the table layout, so
+    it is shared by every intensity.
+
+    Returns:
+        (sample duration, step of each sample, step indices, weights)
+    """
+    count = len(durations)
+    cycle = sum(durations)
+    samples = max(1, round(cycle * rate))
+    sample_duration = cycle / samples
+
+    starts = [0.0] * count
+    for k in range(1, count):
+        starts[k] = starts[k - 1] + durations[k - 1]
+    tick = 1.0 / tick_rate
+    windows = [
+        min(durations[k - 1], durations[k], tick) for k in range(count)
+    ]
+
+    steps = []
+    indices = []
+    weights = []
+    k = 0
+    for i in range(samples):
+        t = (i + 0.5) * sample_duration
+        while k < count - 1 and t >= starts[k] + durations[k]:
+            k += 1
+        steps.append(k)
+        if count == 1:
+            indices.append((k,))
+            weights.append((1.0,))
+            continue
+
+        # Blend into this step from the previous one, or out of it into the next
+        offset = t - starts[k]
+        boundary = k
+        if offset >= durations[k] / 2:
+            boundary = (k + 1) % count
+            offset -= durations[k]
+        window = windows[boundary]
+        if abs(offset) >= window / 2:
+            indices.append((k,))
+            weights.append((1.0,))
+            continue
+
+        x = offset / window + 0.5
+        indices.append(tuple((boundary + d) % count for d in (-2, -1, 0, 1)))
+        weights.append(_curve_weights(interpolation, x))
+
+    return sample_duration, tuple(steps), tuple(indices), tuple(weights)
+
+
+@lru_cache(maxsize=64)
+def _weight_arrays(
+    durations: tuple[float, ...],
+    rate: float,
+    tick_rate: float,
+    interpolation: Interpolation,
+):
+    """Get the resample weights as padded (samples, 4) NumPy arrays."""
+    np = _numpy()
+    _, _, indices, weights = _resample_weights(durations, rate, tick_rate, interpolation)
+    index = np.zeros((len(indices), 4), dtype=np.intp)
+    weight = np.zeros((len(indices), 4))
+    for row, (i, w) in enumerate(zip(indices, weights)):
+        index[row, :len(i)] = i
+        weight[row, :len(w)] = w
+    return index, weight
+
+
+def _apply(values: array, indices, weights) -> array:
+    """Evaluate the weighted sums, rounded and clipped to 0-255."""
+    out = array("B", bytes(len(indices)))
+    for i, (index, weight) in enumerate(zip(indices, weights)):
+        total = 0.0
+        for step, w in zip(index, weight):
+            total += values[step] * w
+        out[i] = min(255, max(0, round(total)))
+    return out
+
+
+def resample_table(
+    table: PatternTable,
+    rate: float,
+    tick_rate: float = DEFAULT_TICK_RATE,
+    interpolation: Interpolation = Interpolation.LINEAR,
+) -> PatternTable:
+    """Upsample a table to fixed steps of ``1 / rate`` seconds.
+
+    Args:
+        table: Coarse table to resample
+        rate: Output rate in Hz
+        tick_rate: Rate the table was compiled at (limits blend windows)
+        interpolation: Curve between steps
+
+    Returns:
+        Table with the same cycle length; other channels hold per step
+    """
+    if interpolation is Interpolation.STEP:
+        return table
+
+    layout = (tuple(table.durations), rate, tick_rate, interpolation)
+    sample_duration, steps, indices, weights = _resample_weights(*layout)
+
+    np = _numpy()
+    if np is not None:
+        # Every sample padded to four terms, so each motor is one gather
+        index, weight = _weight_arrays(*layout)
+        motors = []
+        for values in (table.left, table.right):
+            source = np.frombuffer(values, dtype=np.uint8).astype(np.float64)
+            mixed = np.clip(np.rint((source[index] * weight).sum(axis=1)), 0, 255)
+            motors.append(array("B", mixed.astype(np.uint8).tobytes()))
+        left, right = motors
+    else:
+        left = _apply(table.left, indices, weights)
+        right = _apply(table.right, indices, weights)
+
+    tracks = {
+        name: tuple(track[step] for step in steps) for name, track in table.tracks.items()
+    }
+    durations = array("f", [sample_duration]) * len(steps)
+    return PatternTable(left, right, durations, tracks)
+
+
+@lru_cache(maxsize=128)
+def compile_resampled(
+    pattern_type: PatternType,
+    intensity: int,
+    tick_rate: float,
+    rate: float,
+    interpolation: Interpolation,
+) -> PatternTable:
+    """Compile a pattern at its authored rate and upsample it to ``rate``.
+
+    Tables are shared between callers and must not be modified.
+
+    Args:
+        pattern_type: The type of pattern to compile
+        intensity: Motor intensity (0-255)
+        tick_rate: Authored step rate in Hz of continuously modulated patterns
+        rate: Output rate in Hz
+        interpolation: Curve between steps
+
+    Returns:
+        PatternTable with steps of ``1 / rate`` seconds
+    """
+    table = compile_pattern(pattern_type, intensity, tick_rate)
+    if rate <= tick_rate:
+        return table
+    return resample_table(table, rate, tick_rate, interpolation)
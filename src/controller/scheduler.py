@@ -0,0 +1,139 @@
+"""Drift-free deadline scheduler for pattern steps."""
+
+from dataclasses import dataclass, replace
+from enum import Enum
+import threading
+import time
+
+
+class LatePolicy(Enum):
+    """How steps that start after their deadline are handled."""
+    CATCH_UP = "Catch up"  # Play late steps back-to-back until on schedule
+    DROP = "Drop"  # Skip steps whose whole window has already elapsed
+
+
+class SleepMode(Enum):
+    """How the scheduler waits for the next deadline."""
+    SLEEP = "Sleep"  # Block on the stop event until the deadline
+    HYBRID = "Hybrid"  # Block until close to the deadline, then spin
+
+
+@dataclass
+class LatenessStats:
+    """Per-step lateness statistics in seconds."""
+    steps: int = 0
+    dropped: int = 0
+    resyncs: int = 0
+    total_lateness: float = 0.0
+    max_lateness: float = 0.0
+    last_lateness: float = 0.0
+
+    @property
+    def mean_lateness(self) -> float:
+        """Get average lateness of played steps."""
+        if self.steps == 0:
+            return 0.0
+        return self.total_lateness / self.steps
+
+
+class DeadlineScheduler:
+    """Schedules pattern steps against absolute monotonic deadlines.
+
+    Step ``n`` is due at ``t0 + sum(durations[:n])``, so the time spent
+    writing motors and emitting signals is not added to each step.
+    """
+
+    def __init__(
+        self,
+        late_policy: LatePolicy = LatePolicy.CATCH_UP,
+        sleep_mode: SleepMode = SleepMode.SLEEP,
+        spin_threshold: float = 0.002,
+        max_catch_up: float = 1.0,
+    ) -> None:
+        """Create a scheduler.
+
+        Args:
+            late_policy: Policy for steps that start late
+            sleep_mode: Waiting strategy for deadlines
+            spin_threshold: Seconds before a deadline to start spinning (HYBRID)
+            max_catch_up: Lateness in seconds after which the schedule is
+                re-anchored to now instead of catching up (e.g. after suspend)
+        """
+        self.late_policy = late_policy
+        self.sleep_mode = sleep_mode
+        self.spin_threshold = spin_threshold
+        self.max_catch_up = max_catch_up
+        self._deadline = time.perf_counter()
+        self._stats = LatenessStats()
+
+    @property
+    def stats(self) -> LatenessStats:
+        """Get a snapshot of the lateness statistics."""
+        return replace(self._stats)
+
+    @property
+    def deadline(self) -> float:
+        """Get the perf_counter time the current step is due."""
+        return self._deadline
+
+    def reset(self) -> None:
+        """Anchor the schedule to now and clear statistics."""
+        self._deadline = time.perf_counter()
+        self._stats = LatenessStats()
+
+    def wait(self, stop_event: threading.Event) -> bool:
+        """Wait until the current step deadline.
+
+        Args:
+            stop_event: Event that aborts the wait when set
+
+        Returns:
+            False if the stop event was set, True otherwise.
+        """
+        deadline = self._deadline
+        remaining = deadline - time.perf_counter()
+
+        if self.sleep_mode == SleepMode.HYBRID:
+            remaining -= self.spin_threshold
+
+        if remaining > 0 and stop_event.wait(remaining):
+            return False
+
+        if self.sleep_mode == SleepMode.HYBRID:
+            while time.perf_counter() < deadline:
+                if stop_event.is_set():
+                    return False
+
+        return not stop_event.is_set()
+
+    def begin_step(self, duration: float) -> bool:
+        """Record the step starting now and schedule the next deadline.
+
+        Args:
+            duration: Requested duration of the step in seconds
+
+        Returns:
+            False if the step should be skipped under LatePolicy.DROP.
+        """
+        now = time.perf_counter()
+        lateness = now - self._deadline
+        stats = self._stats
+
+        if lateness > self.max_catch_up:
+            # Too far behind to recover the tempo, start a new schedule
+            self._deadline = now
+            lateness = 0.0
+            stats.resyncs += 1
+        elif self.late_policy == LatePolicy.DROP and lateness >= duration:
+            self._deadline += duration
+            stats.dropped += 1
+            return False
+
+        self._deadline += duration
+
+        stats.steps += 1
+        stats.last_lateness = lateness
+        stats.total_lateness += max(0.0, lateness)
+        if lateness > stats.max_lateness:
+            stats.max_lateness = lateness
+        return True
@@ -0,0 +1,199 @@
+"""Programs of pattern segments compiled into one seekable timeline."""
+
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from itertools import accumulate
+from pathlib import Path
+from typing import Iterable
+
+from controller.patterns import (
+    DEFAULT_TICK_RATE,
+    LIVE_PATTERNS,
+    PatternTable,
+    PatternType,
+    compile_pattern,
+)
+from controller.timeline import write_timeline
+
+
+@dataclass(frozen=True)
+class Segment:
+    """One step of a program.
+
+    Attributes:
+        pattern: Pattern to play
+        duration: Length in seconds, including the ramp
+        intensity: Motor intensity (0-255)
+        ramp: Seconds at the start spent crossfading from the previous
+            segment (or from silence for the first one)
+    """
+    pattern: PatternType
+    duration: float
+    intensity: int = 255
+    ramp: float = 0.0
+
+    def __post_init__(self) -> None:
+        if self.pattern in LIVE_PATTERNS:
+            raise ValueError(f"{self.pattern.value} cannot be part of a program")
+        if self.duration <= 0:
+            raise ValueError("Segment duration must be positive")
+        if not 0 <= self.ramp <= self.duration:
+            raise ValueError("Segment ramp must be between 0 and its duration")
+
+
+class _TableClock:
+    """Value of a looping pattern table at any time since it started."""
+
+    def __init__(self, table: PatternTable) -> None:
+        self.table = table
+        self.ends = list(accumulate(table.durations))
+        self.cycle = self.ends[-1]
+
+    def step_at(self, t: float) -> int:
+        return min(len(self.ends) - 1, bisect_right(self.ends, t % self.cycle))
+
+    def value_at(self, t: float) -> tuple[int, int]:
+        step = self.step_at(t)
+        return self.table.left[step], self.table.right[step]
+
+
+class ProgramTimeline:
+    """Precomputed keyframes of a program.
+
+    Has the read interface of Timeline (find, record, end_ms, duration), so
+    the engine plays it through a TimelineCursor: seeking bisects the
+    keyframe times, and segment boundaries are plain keyframes instead of
+    pattern switches. Only the motors are compiled; other channels of the
+    patterns are not played.
+    """
+
+    def __init__(
+        self,
+        segments: Iterable[Segment],
+        tick_rate: float = DEFAULT_TICK_RATE,
+    ) -> None:
+        """Compile a program.
+
+        Steady parts keep their pattern's step timing. Ramps are sampled once
+        per tick, crossfading the outgoing pattern (still on its own clock)
+        into the incoming one at its target intensity.
+
+        Args:
+            segments: Segments in play order
+            tick_rate: Rate in Hz patterns are compiled and ramps sampled at
+
+        Raises:
+            ValueError: If the program has no segments
+        """
+        self.segments = tuple(segments)
+        if not self.segments:
+            raise ValueError("Program has no segments")
+
+        self._times = array("d")
+        self._left = array("B")
+        self._right = array("B")
+        self._starts = []
+
+        tick = 1.0 / tick_rate
+        previous = None  # (clock, start time) of the outgoing segment
+        start = 0.0
+        for segment in self.segments:
+            self._starts.append(start)
+            clock = _TableClock(compile_pattern(segment.pattern, segment.intensity, tick_rate))
+            end = start + segment.duration
+
+            # Crossfade from the previous segment, one tick at a time
+            ramp_end = start + segment.ramp
+            ticks = round(segment.ramp * tick_rate)
+            for k in range(ticks):
+                t = start + k * tick
+                mix = (k + 0.5) / ticks
+                left, right = clock.value_at(t - start)
+                if previous is None:
+                    old_left = old_right = 0
+                else:
+                    old_clock, old_start = previous
+                    old_left, old_right = old_clock.value_at(t - old_start)
+                self._add(
+                    t,
+                    round(old_left + (left - old_left) * mix),
+                    round(old_right + (right - old_right) * mix),
+                )
+
+            # Then the pattern's own steps, continuing its clock
+            t = ramp_end
+            table = clock.table
+            step = clock.step_at(t - start)
+            offset = (t - start) % clock.cycle
+            next_edge = t + (clock.ends[step] - offset)
+            while t < end - 1e-9:
+                self._add(t, table.left[step], table.right[step])
+                t = next_edge
+                step = (step + 1) % len(table)
+                next_edge = t + table.durations[step]
+
+            previous = (clock, start)
+            start = end
+
+        self._duration_ms = start * 1000
+
+    def _add(self, t: float, left: int, right: int) -> None:
+        """Append a keyframe unless it repeats the last one."""
+        if self._left and self._left[-1] == left and self._right[-1] == right:
+            return
+        self._times.append(t * 1000)
+        self._left.append(left)
+        self._right.append(right)
+
+    def __len__(self) -> int:
+        return len(self._times)
+
+    @property
+    def duration(self) -> float:
+        """Get the program length in seconds."""
+        return self._duration_ms / 1000
+
+    def segment_at(self, position: float) -> int:
+        """Get the index of the segment playing at a position in seconds."""
+        return max(0, bisect_right(self._starts, position) - 1)
+
+    def segment_start(self, index: int) -> float:
+        """Get the position in seconds at which a segment starts."""
+        return self._starts[index]
+
+    def close(self) -> None:
+        """Do nothing; programs are held in memory."""
+
+    def find(self, ms: float) -> int:
+        """Find the keyframe active at a time in O(log n).
+
+        Args:
+            ms: Time in milliseconds
+
+        Returns:
+            Index of the last keyframe at or before ``ms``
+        """
+        return max(0, bisect_right(self._times, ms) - 1)
+
+    def record(self, index: int) -> tuple[float, int, int]:
+        """Get a keyframe as (time_ms, left, right)."""
+        return self._times[index], self._left[index], self._right[index]
+
+    def end_ms(self, index: int) -> float:
+        """Get the time at which a keyframe stops holding."""
+        if index + 1 < len(self._times):
+            return self._times[index + 1]
+        return self._duration_ms
+
+    def save(self, path: str | Path) -> None:
+        """Write the program as a timeline file (times rounded to milliseconds).
+
+        Args:
+            path: Timeline file to write
+        """
+        write_timeline(
+            path,
+            ((t / 1000, left, right) for t, left, right in zip(self._times, self._left, self._right)),
+            duration=self.duration,
+        )
@@ -0,0 +1,175 @@
+"""Simulated DualSense backend for running the engine without hardware."""
+
+from array import array
+from typing import Optional
+import random
+import threading
+import time
+
+from controller.output_frame import OutputFrame
+
+
+class SimulatedBackend:
+    """In-memory controller that records every frame it is sent.
+
+    Frames are stored with a ``perf_counter_ns`` timestamp in a ring buffer
+    allocated up front, so recording adds no allocations to the output
+    path; once full, the oldest records are overwritten. Write latency,
+    jitter and failures can be injected to model a real HID link.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 65536,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        """Create a simulated controller.
+
+        Args:
+            capacity: Frames kept in the ring buffer
+            latency: Seconds each write blocks for
+            jitter: Extra random blocking of up to this many seconds
+            failure_rate: Probability (0-1) that a write raises OSError
+            seed: Seed for the jitter and failure random generator
+        """
+        self._capacity = capacity
+        self._times = array("q", bytes(8 * capacity))
+        self._left = array("B", bytes(capacity))
+        self._right = array("B", bytes(capacity))
+        self._frames: list[Optional[OutputFrame]] = [None] * capacity
+        self._next = 0
+        self._writes = 0
+        self._failures = 0
+        self._fail_next = 0
+
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._open = False
+        self._alive = True
+
+    @property
+    def blocking(self) -> bool:
+        """Check if writes block (latency or jitter is set)."""
+        return self.latency > 0 or self.jitter > 0
+
+    @property
+    def capacity(self) -> int:
+        """Get the ring buffer size in frames."""
+        return self._capacity
+
+    @property
+    def is_open(self) -> bool:
+        """Check if the device is open."""
+        return self._open
+
+    @property
+    def is_alive(self) -> bool:
+        """Check if the device is still attached (see unplug())."""
+        return self._open and self._alive
+
+    @property
+    def writes(self) -> int:
+        """Get the number of frames written since the last clear()."""
+        return self._writes
+
+    @property
+    def failures(self) -> int:
+        """Get the number of injected write failures since the last clear()."""
+        return self._failures
+
+    def __len__(self) -> int:
+        return min(self._writes, self._capacity)
+
+    def open(self) -> None:
+        """Open the simulated device."""
+        self._open = True
+        self._alive = True
+
+    def close(self) -> None:
+        """Close the simulated device."""
+        self._open = False
+
+    def unplug(self) -> None:
+        """Simulate the controller being disconnected."""
+        self._alive = False
+
+    def fail_next(self, count: int = 1) -> None:
+        """Make the next ``count`` writes fail."""
+        self._fail_next = count
+
+    def clear(self) -> None:
+        """Forget recorded frames and reset the counters."""
+        with self._lock:
+            self._next = 0
+            self._writes = 0
+            self._failures = 0
+
+    def _block(self, delay: float) -> None:
+        """Block like a HID write would: sleep, then spin the last millisecond."""
+        deadline = time.perf_counter() + delay
+        if delay > 0.001:
+            time.sleep(delay - 0.001)
+        while time.perf_counter() < deadline:
+            pass
+
+    def write(self, frame: OutputFrame) -> None:
+        """Record a frame after the injected latency.
+
+        Raises:
+            OSError: If the device is unplugged or a failure is injected
+        """
+        delay = self.latency
+        if self.jitter > 0:
+            delay += self._random.random() * self.jitter
+        if delay > 0:
+            self._block(delay)
+
+        with self._lock:
+            if not self._alive:
+                self._failures += 1
+                raise OSError("Simulated device is unplugged")
+            if self._fail_next > 0 or (
+                self.failure_rate > 0 and self._random.random() < self.failure_rate
+            ):
+                self._fail_next = max(0, self._fail_next - 1)
+                self._failures += 1
+                raise OSError("Simulated write failure")
+
+            index = self._next
+            self._times[index] = time.perf_counter_ns()
+            self._left[index] = frame.left_motor
+            self._right[index] = frame.right_motor
+            self._frames[index] = frame
+            self._next = (index + 1) % self._capacity
+            self._writes += 1
+
+    def _order(self) -> list[int]:
+        """Get ring indices of the stored records, oldest first."""
+        count = len(self)
+        start = (self._next - count) % self._capacity
+        return [(start + i) % self._capacity for i in range(count)]
+
+    def records(self) -> list[tuple[int, int, int]]:
+        """Get stored (timestamp_ns, left, right) records, oldest first."""
+        with self._lock:
+            return [(self._times[i], self._left[i], self._right[i]) for i in self._order()]
+
+    def frames(self) -> list[OutputFrame]:
+        """Get stored frames, oldest first."""
+        with self._lock:
+            return [self._frames[i] for i in self._order()]
+
+    def timestamps(self) -> array:
+        """Get stored write timestamps in nanoseconds, oldest first."""
+        with self._lock:
+            count = len(self)
+            start = (self._next - count) % self._capacity
+            if start + count <= self._capacity:
+                return self._times[start:start + count]
+            return self._times[start:] + self._times[:self._next]
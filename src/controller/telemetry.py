@@ -0,0 +1,156 @@
+"""Coalesced motor telemetry shared between the worker and the GUI."""
+
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Optional
+import threading
+import time
+
+
+@dataclass(frozen=True)
+class MotorSample:
+    """Motor state at a point in time."""
+    timestamp: float
+    left: int
+    right: int
+
+
+class TelemetryChannel:
+    """Latest-value slot with rate-limited change notifications.
+
+    The worker publishes every step; consumers are notified at most
+    ``max_rate`` times per second and only after they have read the
+    previous value, so intermediate samples are dropped instead of queued.
+    A sample held back by the rate limit is announced once the interval
+    has passed, even if nothing is published after it.
+    """
+
+    def __init__(
+        self,
+        max_rate: float = 60.0,
+        history: int = 0,
+        notify: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Create a telemetry channel.
+
+        Args:
+            max_rate: Maximum notifications per second
+            history: Number of recent samples kept for graphing (0 disables)
+            notify: Callback invoked when a new sample is ready
+        """
+        self._min_interval = 1.0 / max_rate
+        self._notify = notify
+        # (timestamp, left, right), replaced whole every step so readers
+        # never mix two steps; latest() turns it into a MotorSample
+        self._latest: Optional[tuple[float, int, int]] = None
+        self._history: Optional[deque[MotorSample]] = (
+            deque(maxlen=history) if history > 0 else None
+        )
+        self._pending = False
+        self._unseen = False
+        self._last_notify = 0.0
+        # The output thread and the trailing thread both notify
+        self._fire_lock = threading.Lock()
+        # Trailing notification for samples held back by the rate limit
+        self._trailing: Optional[threading.Thread] = None
+        self._trailing_armed = False
+        self._trailing_stop = False
+        self._trailing_wake = threading.Event()
+
+    @property
+    def max_rate(self) -> float:
+        """Get the maximum notification rate in Hz."""
+        return 1.0 / self._min_interval
+
+    @max_rate.setter
+    def max_rate(self, value: float) -> None:
+        """Set the maximum notification rate in Hz."""
+        self._min_interval = 1.0 / value
+
+    def set_notify(self, notify: Optional[Callable[[], None]]) -> None:
+        """Set the callback invoked when a new sample is ready."""
+        self._notify = notify
+        self._pending = False
+
+    def publish(self, left: int, right: int) -> None:
+        """Publish the current motor state (called from the output loop).
+
+        Args:
+            left: Left motor intensity (0-255)
+            right: Right motor intensity (0-255)
+        """
+        now = time.perf_counter()
+        self._latest = (now, left, right)
+        if self._history is not None:
+            self._history.append(MotorSample(now, left, right))
+
+        self._unseen = True
+        if not self._pending:
+            if now - self._last_notify >= self._min_interval:
+                self._fire(now)
+            elif not self._trailing_armed:
+                self._arm_trailing()
+
+    def flush(self) -> None:
+        """Notify consumers of a sample held back by the rate limit."""
+        if self._unseen and not self._pending:
+            self._fire(time.perf_counter())
+
+    def close(self) -> None:
+        """Stop the trailing notification thread (a later publish restarts it)."""
+        thread = self._trailing
+        if thread is None:
+            return
+        self._trailing_stop = True
+        self._trailing_wake.set()
+        thread.join()
+        self._trailing = None
+        self._trailing_armed = False
+
+    def _arm_trailing(self) -> None:
+        """Have the trailing thread flush once the rate limit allows."""
+        self._trailing_armed = True
+        if self._trailing is None:
+            self._trailing_stop = False
+            self._trailing = threading.Thread(
+                target=self._trailing_loop, name="TelemetryTrailing", daemon=True
+            )
+            self._trailing.start()
+        self._trailing_wake.set()
+
+    def _trailing_loop(self) -> None:
+        while True:
+            self._trailing_wake.wait()
+            self._trailing_wake.clear()
+            if self._trailing_stop:
+                return
+            delay = self._last_notify + self._min_interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            self._trailing_armed = False
+            self.flush()
+
+    def _fire(self, now: float) -> None:
+        with self._fire_lock:
+            # The other thread may have notified since the caller checked
+            if self._pending:
+                return
+            self._pending = True
+            self._last_notify = now
+        if self._notify is not None:
+            self._notify()
+
+    def latest(self) -> Optional[MotorSample]:
+        """Read the most recent sample and acknowledge the notification."""
+        self._unseen = False
+        self._pending = False
+        latest = self._latest
+        if latest is None:
+            return None
+        return MotorSample(*latest)
+
+    def recent_samples(self) -> list[MotorSample]:
+        """Get the recent sample history, oldest first."""
+        if self._history is None:
+            return []
+        return list(self._history)
@@ -0,0 +1,382 @@
+"""Binary haptic timelines with memory-mapped, lazily decoded playback.
+
+File layout (little-endian)::
+
+    header   magic "DSTL", version u16, reserved u16, chunk_size u32,
+             duration_ms u32, record_count u64
+    index    u32 start time of every chunk of ``chunk_size`` records
+    times    u32[record_count] keyframe times in milliseconds, ascending
+    left     u8[record_count] left motor values
+    right    u8[record_count] right motor values
+
+Each keyframe holds its values until the next keyframe; the last one holds
+until ``duration_ms``. Seeking bisects the index, then one decoded chunk,
+so only a few pages of a multi-hour file are touched.
+"""
+
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+from typing import Iterable, Optional
+import csv
+import json
+import math
+import mmap
+import struct
+import sys
+
+
+MAGIC = b"DSTL"
+VERSION = 1
+DEFAULT_CHUNK_SIZE = 4096
+
+_HEADER = struct.Struct("<4sHHIIQ")
+
+
+class TimelineError(Exception):
+    """Raised when a timeline file or script is invalid."""
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def write_timeline(
+    path: str | Path,
+    keyframes: Iterable[tuple[float, int, int]],
+    duration: Optional[float] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> None:
+    """Write keyframes to a binary timeline file.
+
+    Args:
+        path: Destination file
+        keyframes: (time_seconds, left, right) tuples in ascending time
+        duration: Total length in seconds (defaults to the last keyframe)
+        chunk_size: Records per index entry
+
+    Raises:
+        TimelineError: If keyframes are empty or out of order, or chunk_size
+            is not positive
+    """
+    if chunk_size < 1:
+        raise TimelineError(f"Chunk size must be positive, got {chunk_size}")
+    times = array("I")
+    left = array("B")
+    right = array("B")
+    for t, l, r in keyframes:
+        ms = int(round(t * 1000))
+        if times and ms < times[-1]:
+            raise TimelineError(f"Keyframe at {t}s is out of order")
+        if not times and ms > 0:
+            # Silence before the first keyframe
+            times.append(0)
+            left.append(0)
+            right.append(0)
+        times.append(ms)
+        left.append(max(0, min(255, int(l))))
+        right.append(max(0, min(255, int(r))))
+
+    if not times:
+        raise TimelineError("Timeline has no keyframes")
+
+    duration_ms = times[-1]
+    if duration is not None:
+        duration_ms = max(duration_ms, int(round(duration * 1000)))
+
+    index = array("I", times[::chunk_size])
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, chunk_size, duration_ms, len(times)))
+        f.write(_little_endian(index))
+        f.write(_little_endian(times))
+        f.write(left.tobytes())
+        f.write(right.tobytes())
+
+
+def _parse_row(row: list[str] | tuple, source: str) -> tuple[float, int, int]:
+    try:
+        return float(row[0]), int(float(row[1])), int(float(row[2]))
+    except (IndexError, ValueError) as e:
+        raise TimelineError(f"Invalid keyframe in {source}: {row!r}") from e
+
+
+def load_keyframes(path: str | Path) -> list[tuple[float, int, int]]:
+    """Read keyframes from a JSON or CSV script.
+
+    JSON scripts are a list (or ``{"keyframes": [...]}``) of
+    ``{"t": seconds, "left": 0-255, "right": 0-255}`` objects or
+    ``[t, left, right]`` lists. CSV scripts have ``t,left,right`` rows with
+    an optional header row.
+
+    Args:
+        path: Script file (.json or .csv)
+
+    Returns:
+        Keyframes sorted by time
+    """
+    path = Path(path)
+    keyframes = []
+
+    if path.suffix.lower() == ".json":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("keyframes", [])
+        for item in data:
+            if isinstance(item, dict):
+                item = (item.get("t"), item.get("left"), item.get("right"))
+            keyframes.append(_parse_row(item, path.name))
+    else:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for line, row in enumerate(csv.reader(f)):
+                if not row or row[0].strip().startswith("#"):
+                    continue
+                try:
+                    keyframes.append(_parse_row(row, path.name))
+                except TimelineError:
+                    if line > 0:
+                        raise
+                    # Header row
+
+    keyframes.sort(key=lambda keyframe: keyframe[0])
+    return keyframes
+
+
+def import_script(
+    source: str | Path, destination: str | Path, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> None:
+    """Convert a JSON or CSV keyframe script to a binary timeline.
+
+    Args:
+        source: Script file (.json or .csv)
+        destination: Timeline file to write
+        chunk_size: Records per index entry
+    """
+    write_timeline(destination, load_keyframes(source), chunk_size=chunk_size)
+
+
+class Timeline:
+    """Memory-mapped binary timeline.
+
+    Opening only reads the header and index; keyframes are decoded one
+    chunk at a time as playback reaches them.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """Open a timeline file.
+
+        Args:
+            path: Timeline file
+
+        Raises:
+            TimelineError: If the file is not a valid timeline
+        """
+        self._path = Path(path)
+        self._file = open(self._path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:
+            self._file.close()
+            raise TimelineError(f"{self._path.name} is empty") from e
+
+        if len(self._map) < _HEADER.size:
+            self.close()
+            raise TimelineError(f"{self._path.name} is truncated")
+        magic, version, _, chunk_size, duration_ms, count = _HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise TimelineError(f"{self._path.name} is not a version {VERSION} timeline")
+        if chunk_size == 0:
+            self.close()
+            raise TimelineError(f"{self._path.name} has a chunk size of 0")
+
+        self._chunk_size = chunk_size
+        self._duration_ms = duration_ms
+        self._count = count
+        chunks = math.ceil(count / chunk_size)
+
+        self._times_offset = _HEADER.size + 4 * chunks
+        self._left_offset = self._times_offset + 4 * count
+        self._right_offset = self._left_offset + count
+        if len(self._map) < self._right_offset + count:
+            self.close()
+            raise TimelineError(f"{self._path.name} is truncated")
+
+        self._index = self._decode_u32(_HEADER.size, chunks)
+        self._chunk = -1
+        self._chunk_times = array("I")
+        self._chunk_left = b""
+        self._chunk_right = b""
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __enter__(self) -> "Timeline":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def path(self) -> Path:
+        """Get the timeline file path."""
+        return self._path
+
+    @property
+    def duration(self) -> float:
+        """Get the timeline length in seconds."""
+        return self._duration_ms / 1000
+
+    def close(self) -> None:
+        """Unmap and close the file."""
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def _decode_u32(self, offset: int, count: int) -> array:
+        values = array("I", self._map[offset:offset + 4 * count])
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
+
+    def _load_chunk(self, chunk: int) -> None:
+        """Decode one chunk of records into memory."""
+        if chunk == self._chunk:
+            return
+        start = chunk * self._chunk_size
+        count = min(self._chunk_size, self._count - start)
+        self._chunk_times = self._decode_u32(self._times_offset + 4 * start, count)
+        self._chunk_left = self._map[self._left_offset + start:self._left_offset + start + count]
+        self._chunk_right = self._map[self._right_offset + start:self._right_offset + start + count]
+        self._chunk = chunk
+
+    def find(self, ms: int) -> int:
+        """Find the record active at a time in O(log n).
+
+        Args:
+            ms: Time in milliseconds
+
+        Returns:
+            Index of the last keyframe at or before ``ms``
+        """
+        chunk = max(0, bisect_right(self._index, ms) - 1)
+        self._load_chunk(chunk)
+        offset = max(0, bisect_right(self._chunk_times, ms) - 1)
+        return chunk * self._chunk_size + offset
+
+    def record(self, index: int) -> tuple[int, int, int]:
+        """Get a record, decoding its chunk if needed.
+
+        Args:
+            index: Record index
+
+        Returns:
+            (time_ms, left, right) tuple
+        """
+        chunk, offset = divmod(index, self._chunk_size)
+        self._load_chunk(chunk)
+        return (
+            self._chunk_times[offset],
+            self._chunk_left[offset],
+            self._chunk_right[offset],
+        )
+
+    def end_ms(self, index: int) -> int:
+        """Get the time at which a record stops holding."""
+        if index + 1 < self._count:
+            return self.record(index + 1)[0]
+        return self._duration_ms
+
+
+class TimelineCursor:
+    """Playback position within a timeline.
+
+    Has the same stepping interface as PatternCursor, with intensity
+    applied as a gain over the authored values.
+    """
+
+    __slots__ = (
+        "timeline", "loop", "gain", "index", "remaining", "left", "right", "finished", "position",
+    )
+
+    def __init__(
+        self,
+        timeline: Timeline,
+        position: float = 0.0,
+        loop: bool = False,
+        gain: int = 255,
+    ) -> None:
+        """Create a cursor.
+
+        Args:
+            timeline: Timeline to play
+            position: Start position in seconds
+            loop: Restart at the beginning after the end
+            gain: Output scale (0-255, 255 plays authored values)
+        """
+        self.timeline = timeline
+        self.loop = loop
+        self.gain = gain
+        self.index = 0
+        self.remaining = 0.0
+        self.left = 0
+        self.right = 0
+        self.finished = False
+        self.position = 0.0
+        self.seek(position)
+
+    def _enter(self, index: int, position_ms: float) -> None:
+        timeline = self.timeline
+        _, left, right = timeline.record(index)
+        self.index = index
+        self.left = left * self.gain // 255
+        self.right = right * self.gain // 255
+        self.remaining = max(0.0, (timeline.end_ms(index) - position_ms) / 1000)
+        # Single assignment, so other threads can read the play position
+        self.position = position_ms / 1000
+
+    def seek(self, position: float) -> None:
+        """Move to a position in seconds."""
+        duration = self.timeline.duration
+        if self.loop and duration > 0:
+            position %= duration
+        ms = max(0.0, position * 1000)
+        self._enter(self.timeline.find(int(ms)), ms)
+        self.finished = duration <= 0 or (not self.loop and position >= duration)
+        if self.finished:
+            self.left = 0
+            self.right = 0
+
+    def set_gain(self, gain: int) -> None:
+        """Change the output scale without moving the cursor."""
+        self.gain = gain
+        _, left, right = self.timeline.record(self.index)
+        self.left = left * gain // 255
+        self.right = right * gain // 255
+
+    def advance(self, elapsed: float) -> None:
+        """Advance the cursor by elapsed seconds."""
+        timeline = self.timeline
+        if self.finished:
+            return
+        remaining = self.remaining - elapsed
+        index = self.index
+        count = len(timeline)
+        while remaining <= 1e-9:
+            index += 1
+            if index >= count:
+                if not self.loop:
+                    self.finished = True
+                    self.left = 0
+                    self.right = 0
+                    self.remaining = 0.0
+                    self.position = timeline.duration
+                    return
+                index = 0
+            start_ms = timeline.record(index)[0]
+            remaining += (timeline.end_ms(index) - start_ms) / 1000
+        self._enter(index, timeline.end_ms(index) - remaining * 1000)
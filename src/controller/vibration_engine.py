@@ -1,119 +1,115 @@
-"""Vibration engine with threaded pattern execution."""
+"""Qt adapter over the vibration engine core."""
 
-import threading
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from PyQt6.QtCore import QObject, QThread, pyqtSignal
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
 
-from controller.dualsense_manager import DualSenseManager
-from controller.patterns import PatternType, get_pattern_generator
+from controller.compositor import FrameCompositor
+from controller.dualsense_manager import ConnectionType
+from controller.engine_core import EngineCore
+from controller.engine_process import EngineProcess
+from controller.frame_stream import FrameSlot
+from controller.instrumentation import Instrumentation
+from controller.mixer import Mix
+from controller.output_frame import MotorOutput
+from controller.patterns import PatternType
+from controller.realtime import RealtimeProfile
+from controller.resampler import Interpolation
+from controller.scheduler import DeadlineScheduler, LatenessStats
+from controller.sequencer import ProgramTimeline
+from controller.telemetry import MotorSample, TelemetryChannel
+from controller.timeline import Timeline
 
+if TYPE_CHECKING:
+    from controller.audio_source import AudioSource
 
-class VibrationWorker(QObject):
-    """Worker that runs vibration patterns in a separate thread."""
+
+class VibrationEngine(QObject):
+    """EngineCore with its callbacks delivered as Qt signals.
+
+    Worker callbacks are emitted as signals, so connected slots run on the
+    GUI thread through Qt's queued connections.
+    """
 
     intensity_updated = pyqtSignal(int)
+    playback_finished = pyqtSignal()
     error_occurred = pyqtSignal(str)
 
-    def __init__(self) -> None:
+    _telemetry_ready = pyqtSignal()
+
+    def __init__(
+        self,
+        scheduler: Optional[DeadlineScheduler] = None,
+        telemetry: Optional[TelemetryChannel] = None,
+        output: Optional[MotorOutput] = None,
+    ) -> None:
+        """Create an engine.
+
+        Args:
+            scheduler: Step scheduler (defaults to a new DeadlineScheduler)
+            telemetry: Telemetry channel (defaults to a new TelemetryChannel)
+            output: Motor destination, e.g. a DualSenseDevice or DevicePool
+                (defaults to the DualSenseManager singleton)
+        """
         super().__init__()
-        self._stop_event = threading.Event()
-        self._running = False
-        self._intensity = 128
-        self._pattern_type = PatternType.CONSTANT
-        self._manager = DualSenseManager()
-        self._lock = threading.Lock()
+        self._core = EngineCore(
+            scheduler,
+            telemetry,
+            output,
+            on_finished=self.playback_finished.emit,
+            on_error=self.error_occurred.emit,
+        )
+        self._telemetry_ready.connect(self._on_telemetry)
+        self._core.telemetry.set_notify(self._telemetry_ready.emit)
 
     @property
-    def intensity(self) -> int:
-        """Get current intensity."""
-        with self._lock:
-            return self._intensity
+    def core(self) -> EngineCore:
+        """Get the Qt-free engine this adapter wraps."""
+        return self._core
 
-    @intensity.setter
-    def intensity(self, value: int) -> None:
-        """Set intensity (0-255)."""
-        with self._lock:
-            self._intensity = max(0, min(255, value))
+    @property
+    def is_active(self) -> bool:
+        """Check if engine is currently running."""
+        return self._core.is_active
 
     @property
-    def pattern_type(self) -> PatternType:
-        """Get current pattern type."""
-        with self._lock:
-            return self._pattern_type
-
-    @pattern_type.setter
-    def pattern_type(self, value: PatternType) -> None:
-        """Set pattern type."""
-        with self._lock:
-            self._pattern_type = value
-
-    def start_pattern(self) -> None:
-        """Start the vibration pattern loop."""
-        self._stop_event.clear()
-        self._running = True
-        self._run_pattern_loop()
-
-    def stop_pattern(self) -> None:
-        """Stop the vibration pattern loop."""
-        self._stop_event.set()
-        self._running = False
-        self._manager.stop_motors()
-
-    def _run_pattern_loop(self) -> None:
-        """Main pattern execution loop."""
-        while not self._stop_event.is_set():
-            try:
-                # Get current settings
-                with self._lock:
-                    intensity = self._intensity
-                    pattern_type = self._pattern_type
-
-                # Create pattern generator
-                pattern = get_pattern_generator(pattern_type, intensity)
-
-                # Run pattern until settings change or stop requested
-                for left, right, duration in pattern:
-                    if self._stop_event.is_set():
-                        break
-
-                    # Check if settings changed
-                    with self._lock:
-                        if (self._intensity != intensity or
-                            self._pattern_type != pattern_type):
-                            break
-
-                    # Apply motor values
-                    self._manager.set_motors(left, right)
-                    self.intensity_updated.emit(max(left, right))
-
-                    # Wait for duration
-                    self._stop_event.wait(duration)
-
-            except Exception as e:
-                self.error_occurred.emit(str(e))
-                break
-
-        # Ensure motors are stopped
-        self._manager.stop_motors()
+    def is_paused(self) -> bool:
+        """Check if playback is paused."""
+        return self._core.is_paused
 
+    @property
+    def timeline_position(self) -> Optional[float]:
+        """Get the play position in seconds of the timeline (None when none played)."""
+        return self._core.timeline_position
 
-class VibrationEngine(QObject):
-    """Engine that manages vibration worker thread."""
+    @property
+    def scheduler(self) -> DeadlineScheduler:
+        """Get the step scheduler (late policy and sleep mode are adjustable)."""
+        return self._core.scheduler
 
-    intensity_updated = pyqtSignal(int)
-    error_occurred = pyqtSignal(str)
+    @property
+    def timing_stats(self) -> LatenessStats:
+        """Get per-step lateness statistics of the current or last run."""
+        return self._core.timing_stats
 
-    def __init__(self) -> None:
-        super().__init__()
-        self._thread: Optional[QThread] = None
-        self._worker: Optional[VibrationWorker] = None
-        self._active = False
+    @property
+    def telemetry(self) -> TelemetryChannel:
+        """Get the telemetry channel (rate limit and history are adjustable)."""
+        return self._core.telemetry
 
     @property
-    def is_active(self) -> bool:
-        """Check if engine is currently running."""
-        return self._active
+    def instrumentation(self) -> Instrumentation:
+        """Get the loop and write histograms (enable() to start recording)."""
+        return self._core.instrumentation
+
+    @property
+    def compositor(self) -> FrameCompositor:
+        """Get the compositor (channel mask and static channel values)."""
+        return self._core.compositor
+
+    def recent_samples(self) -> list[MotorSample]:
+        """Get recent motor samples for graphing, oldest first."""
+        return self._core.recent_samples()
 
     def start_vibration(
         self, intensity: int = 128, pattern_type: PatternType = PatternType.CONSTANT
@@ -124,43 +120,220 @@ class VibrationEngine(QObject):
             intensity: Motor intensity (0-255)
             pattern_type: Type of vibration pattern
         """
-        if self._active:
-            self.stop_vibration()
+        self._core.start_vibration(intensity, pattern_type)
+
+    def start_timeline(
+        self,
+        timeline: Timeline | ProgramTimeline,
+        intensity: int = 255,
+        loop: bool = False,
+        position: Optional[float] = None,
+    ) -> None:
+        """Start playing a timeline.
+
+        Args:
+            timeline: Timeline or compiled program to play
+            intensity: Output scale (0-255, 255 plays authored values)
+            loop: Restart the timeline when it ends
+            position: Start position in seconds (None starts where seek()
+                moved the next timeline, or at the beginning)
+        """
+        self._core.start_timeline(timeline, intensity, loop, position)
+
+    def pause(self) -> None:
+        """Stop the motors, keeping the timeline position for resume()."""
+        self._core.pause()
 
-        # Create worker and thread
-        self._thread = QThread()
-        self._worker = VibrationWorker()
-        self._worker.intensity = intensity
-        self._worker.pattern_type = pattern_type
+    def resume(self) -> None:
+        """Continue playback after pause()."""
+        self._core.resume()
 
-        # Move worker to thread
-        self._worker.moveToThread(self._thread)
+    def seek(self, position: float) -> None:
+        """Move the timeline to a position in seconds."""
+        self._core.seek(position)
 
-        # Connect signals
-        self._thread.started.connect(self._worker.start_pattern)
-        self._worker.intensity_updated.connect(self.intensity_updated)
-        self._worker.error_occurred.connect(self._on_error)
+    def start_mix(self, mix: Mix, intensity: int = 255) -> None:
+        """Start playing a layered mix.
 
-        # Start thread
-        self._active = True
-        self._thread.start()
+        Args:
+            mix: Mix to play
+            intensity: Output scale of the whole mix (0-255)
+        """
+        self._core.start_mix(mix, intensity)
 
     def stop_vibration(self) -> None:
-        """Stop vibration and cleanup thread."""
-        if not self._active:
-            return
+        """Stop vibration without waiting for the worker loop to exit."""
+        self._core.stop_vibration()
 
-        self._active = False
+    def shutdown(self) -> None:
+        """Stop vibration and end the worker thread."""
+        self._core.shutdown()
 
-        if self._worker is not None:
-            self._worker.stop_pattern()
+    def set_intensity(self, intensity: int) -> None:
+        """Update vibration intensity.
 
-        if self._thread is not None:
-            self._thread.quit()
-            self._thread.wait(1000)
-            self._thread = None
+        Args:
+            intensity: Motor intensity (0-255)
+        """
+        self._core.set_intensity(intensity)
 
-        self._worker = None
+    def set_pattern(self, pattern_type: PatternType) -> None:
+        """Update vibration pattern.
+
+        Args:
+            pattern_type: Type of vibration pattern
+        """
+        self._core.set_pattern(pattern_type)
+
+    def set_timeline(self, timeline: Optional[Timeline], loop: bool = False) -> None:
+        """Switch to a timeline, or back to the pattern with None.
+
+        Args:
+            timeline: Timeline to play
+            loop: Restart the timeline when it ends
+        """
+        self._core.set_timeline(timeline, loop)
+
+    def set_mix(self, mix: Optional[Mix]) -> None:
+        """Switch to a layered mix, or back to the pattern with None.
+
+        Args:
+            mix: Mix to play
+        """
+        self._core.set_mix(mix)
+
+    def set_output(
+        self,
+        rate: Optional[float],
+        interpolation: Interpolation = Interpolation.LINEAR,
+        slew_rate: Optional[float] = None,
+    ) -> None:
+        """Write motors at a fixed rate, upsampling patterns to it.
+
+        Args:
+            rate: Output rate in Hz (None writes once per pattern step)
+            interpolation: Curve between pattern steps
+            slew_rate: Largest motor change in intensity units per second
+        """
+        self._core.set_output(rate, interpolation, slew_rate)
+
+    def set_audio_source(self, source: Optional["AudioSource"]) -> None:
+        """Set the audio source played by PatternType.AUDIO.
+
+        Args:
+            source: Started audio source (None makes AUDIO silent)
+        """
+        self._core.set_audio_source(source)
+
+    def set_frame_slot(self, slot: Optional[FrameSlot]) -> None:
+        """Set the frame slot played by PatternType.STREAM.
+
+        Args:
+            slot: Slot fed by a frame producer (None makes STREAM silent)
+        """
+        self._core.set_frame_slot(slot)
+
+    def set_crossfade(self, seconds: float) -> None:
+        """Update the crossfade window used when switching patterns.
+
+        Args:
+            seconds: Crossfade length in seconds (0 switches immediately)
+        """
+        self._core.set_crossfade(seconds)
+
+    def _on_telemetry(self) -> None:
+        """Forward the latest motor state to listeners."""
+        sample = self._core.telemetry.latest()
+        if sample is not None:
+            self.intensity_updated.emit(max(sample.left, sample.right))
+
+
+class ProcessVibrationEngine(QObject):
+    """EngineProcess with its status delivered as Qt signals.
+
+    The engine and the controller live in a child process, so painting
+    and signal dispatch on the GUI thread cannot delay motor writes. The
+    status block is polled on the GUI thread at the telemetry rate.
+    """
+
+    intensity_updated = pyqtSignal(int)
+    error_occurred = pyqtSignal(str)
+    connection_changed = pyqtSignal(bool)
+
+    # Status polls per second
+    POLL_RATE = 60
+
+    def __init__(
+        self,
+        simulate: bool = False,
+        realtime: Optional[RealtimeProfile] = None,
+    ) -> None:
+        """Create an engine and start its process.
+
+        Args:
+            simulate: Play to a simulated controller in the child
+            realtime: Real-time profile for the child's output thread
+
+        Raises:
+            RuntimeError: If the engine process does not start
+        """
+        super().__init__()
+        self._process = EngineProcess(
+            simulate=simulate,
+            realtime=realtime,
+            on_error=self.error_occurred.emit,
+            on_connection=self.connection_changed.emit,
+        )
+        self._process.start()
+        self._level = 0
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._poll)
+        self._timer.start(round(1000 / self.POLL_RATE))
+
+    @property
+    def process(self) -> EngineProcess:
+        """Get the engine process this adapter wraps."""
+        return self._process
+
+    @property
+    def is_active(self) -> bool:
+        """Check if engine is currently running."""
+        return self._process.is_active
+
+    @property
+    def is_connected(self) -> bool:
+        """Check if the engine process has a controller connected."""
+        return self._process.is_connected
+
+    @property
+    def connection_type(self) -> ConnectionType:
+        """Get how the engine process's controller is connected."""
+        return self._process.connection_type
+
+    @property
+    def timing_stats(self) -> LatenessStats:
+        """Get per-step lateness statistics of the current or last run."""
+        return self._process.timing_stats
+
+    def start_vibration(
+        self, intensity: int = 128, pattern_type: PatternType = PatternType.CONSTANT
+    ) -> None:
+        """Start vibration with specified settings.
+
+        Args:
+            intensity: Motor intensity (0-255)
+            pattern_type: Type of vibration pattern
+        """
+        self._process.start_vibration(intensity, pattern_type)
+
+    def stop_vibration(self) -> None:
+        """Stop vibration without waiting for the engine process."""
+        self._process.stop_vibration()
+
+    def shutdown(self) -> None:
+        """Stop vibration and end the engine process."""
+        self._timer.stop()
+        self._process.shutdown()
 
     def set_intensity(self, intensity: int) -> None:
         """Update vibration intensity.
@@ -168,8 +341,7 @@ class VibrationEngine(QObject):
         Args:
             intensity: Motor intensity (0-255)
         """
-        if self._worker is not None:
-            self._worker.intensity = intensity
+        self._process.set_intensity(intensity)
 
     def set_pattern(self, pattern_type: PatternType) -> None:
         """Update vibration pattern.
@@ -177,10 +349,35 @@ class VibrationEngine(QObject):
         Args:
             pattern_type: Type of vibration pattern
         """
-        if self._worker is not None:
-            self._worker.pattern_type = pattern_type
+        self._process.set_pattern(pattern_type)
+
+    def set_output(
+        self,
+        rate: Optional[float],
+        interpolation: Interpolation = Interpolation.LINEAR,
+        slew_rate: Optional[float] = None,
+    ) -> None:
+        """Write motors at a fixed rate, upsampling patterns to it.
+
+        Args:
+            rate: Output rate in Hz (None writes once per pattern step)
+            interpolation: Curve between pattern steps
+            slew_rate: Largest motor change in intensity units per second
+        """
+        self._process.set_output(rate, interpolation, slew_rate)
 
-    def _on_error(self, error: str) -> None:
-        """Handle worker error."""
-        self.stop_vibration()
-        self.error_occurred.emit(error)
+    def set_crossfade(self, seconds: float) -> None:
+        """Update the crossfade window used when switching patterns.
+
+        Args:
+            seconds: Crossfade length in seconds (0 switches immediately)
+        """
+        self._process.set_crossfade(seconds)
+
+    def _poll(self) -> None:
+        """Forward status changes to listeners."""
+        status = self._process.poll()
+        level = max(status.left, status.right)
+        if level != self._level:
+            self._level = level
+            self.intensity_updated.emit(level)
@@ -0,0 +1,9 @@
+"""Run the headless CLI with ``python -m dualsensual``."""
+
+import sys
+
+from dualsensual.cli import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,547 @@
+"""Headless command line interface and daemon.
+
+Nothing here imports PyQt6: patterns run on EngineCore directly.
+"""
+
+from typing import TYPE_CHECKING, Optional
+import argparse
+import signal
+import sys
+import threading
+import wave
+
+from controller.device_monitor import DeviceEvent, DeviceMonitor
+from controller.dualsense_manager import DualSenseManager
+from controller.engine_core import EngineCore
+from controller.input_pipeline import InputPipeline
+from controller.instrumentation import instrumentation
+from controller.mixer import Layer, Mix, Route
+from controller.patterns import LIVE_PATTERNS, PatternType
+from controller.realtime import RealtimeProfile, parse_cpus
+from controller.recorder import RecordingError, SessionRecorder, read_recording
+from controller.resampler import MAX_OUTPUT_RATE, Interpolation
+from controller.sequencer import ProgramTimeline, Segment
+from controller.simulated_backend import SimulatedBackend
+from controller.timeline import Timeline, TimelineError, import_script
+from dualsensual.server import DEFAULT_PORT, DEFAULT_WS_PORT, ControlServer
+from utils.config import Config
+
+if TYPE_CHECKING:
+    from controller.audio_source import AudioSource
+
+
+PATTERN_NAMES = {
+    pattern.name.lower(): pattern for pattern in PatternType if pattern not in LIVE_PATTERNS
+}
+
+
+def _intensity(value: str) -> int:
+    """Parse an intensity argument (0-255)."""
+    intensity = int(value)
+    if not 0 <= intensity <= 255:
+        raise argparse.ArgumentTypeError("intensity must be between 0 and 255")
+    return intensity
+
+
+def _layer(value: str) -> Layer:
+    """Parse a mix layer argument: PATTERN[:GAIN[:ROUTE]]."""
+    name, _, rest = value.partition(":")
+    gain_text, _, route_text = rest.partition(":")
+    pattern = PATTERN_NAMES.get(name.lower())
+    if pattern is None:
+        raise argparse.ArgumentTypeError(
+            f"unknown pattern {name!r} (choose from {', '.join(sorted(PATTERN_NAMES))})"
+        )
+    try:
+        gain = float(gain_text) if gain_text else 1.0
+        route = Route(route_text.lower()) if route_text else Route.BOTH
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"bad layer {value!r}: gain is 0-1, route is both, left or right"
+        ) from None
+    if not 0.0 <= gain <= 1.0:
+        raise argparse.ArgumentTypeError(f"bad layer {value!r}: gain is 0-1")
+    return Layer(pattern, gain, route)
+
+
+def _segment(value: str) -> Segment:
+    """Parse a program segment argument: PATTERN:SECONDS[:INTENSITY[:RAMP]]."""
+    name, *numbers = value.split(":")
+    pattern = PATTERN_NAMES.get(name.lower())
+    if pattern is None:
+        raise argparse.ArgumentTypeError(
+            f"unknown pattern {name!r} (choose from {', '.join(sorted(PATTERN_NAMES))})"
+        )
+    if not 1 <= len(numbers) <= 3:
+        raise argparse.ArgumentTypeError(
+            f"bad segment {value!r}: expected PATTERN:SECONDS[:INTENSITY[:RAMP]]"
+        )
+    try:
+        duration = float(numbers[0])
+        intensity = _intensity(numbers[1]) if len(numbers) > 1 else 255
+        ramp = float(numbers[2]) if len(numbers) > 2 else 0.0
+        return Segment(pattern, duration, intensity, ramp)
+    except (ValueError, argparse.ArgumentTypeError) as e:
+        raise argparse.ArgumentTypeError(f"bad segment {value!r}: {e}") from None
+
+
+def _output_rate(value: str) -> float:
+    """Parse an output rate argument in Hz."""
+    rate = float(value)
+    if not 0 < rate <= MAX_OUTPUT_RATE:
+        raise argparse.ArgumentTypeError(
+            f"output rate must be between 0 and {MAX_OUTPUT_RATE:g} Hz"
+        )
+    return rate
+
+
+def _cpus(value: str) -> frozenset[int]:
+    """Parse a CPU list argument such as 2,3 or 0-3."""
+    try:
+        return parse_cpus(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bad CPU list {value!r}: expected e.g. 2,3 or 0-3") from None
+
+
+def _rt_priority(value: str) -> int:
+    """Parse a SCHED_FIFO priority argument (1-99)."""
+    priority = int(value)
+    if not 1 <= priority <= 99:
+        raise argparse.ArgumentTypeError("priority must be between 1 and 99")
+    return priority
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create the argument parser."""
+    parser = argparse.ArgumentParser(
+        prog="dualsensual", description="Drive DualSense vibration without the GUI."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    stats = argparse.ArgumentParser(add_help=False)
+    stats.add_argument(
+        "--stats", type=float, metavar="SECONDS",
+        help="print loop and write timing histograms to stderr at this interval",
+    )
+
+    controls = argparse.ArgumentParser(add_help=False)
+    controls.add_argument(
+        "--input", action="store_true",
+        help="R2 scales intensity, the touchpad sets balance and triangle cycles patterns",
+    )
+
+    controls.add_argument(
+        "--record", metavar="PATH",
+        help="record every motor write to this file (play it back with replay)",
+    )
+    controls.add_argument(
+        "--realtime", action="store_true",
+        help="raise the output thread's priority and keep garbage collection out of its steps",
+    )
+    controls.add_argument(
+        "--rt-priority", type=_rt_priority, default=10, metavar="1-99",
+        help="SCHED_FIFO priority for --realtime (falls back to nice -10 if not permitted)",
+    )
+    controls.add_argument(
+        "--cpus", type=_cpus, metavar="LIST",
+        help="pin the output thread to these CPUs with --realtime (e.g. 3 or 2-3)",
+    )
+
+    output = argparse.ArgumentParser(add_help=False, parents=[stats, controls])
+    output.add_argument(
+        "--simulate", action="store_true",
+        help="write to a simulated controller and print write timing",
+    )
+    output.add_argument(
+        "--output-rate", type=_output_rate, metavar="HZ",
+        help="write motors at this rate, upsampling patterns (e.g. 250)",
+    )
+    output.add_argument(
+        "--interpolation", choices=[mode.value for mode in Interpolation], default="linear",
+        help="curve between pattern steps at the output rate",
+    )
+    output.add_argument(
+        "--slew", type=float, metavar="PER_SECOND",
+        help="limit motor changes to this many intensity units per second",
+    )
+
+    play = commands.add_parser("play", parents=[output], help="play a pattern")
+    play.add_argument("pattern", nargs="?", default="constant", choices=sorted(PATTERN_NAMES))
+    play.add_argument("-i", "--intensity", type=_intensity, default=128, help="0-255")
+    play.add_argument("-d", "--duration", type=float, help="stop after this many seconds")
+
+    mix = commands.add_parser("mix", parents=[output], help="play layered patterns")
+    mix.add_argument(
+        "layers", nargs="+", type=_layer, metavar="PATTERN[:GAIN[:ROUTE]]",
+        help="e.g. constant:0.2 heartbeat:0.8:left wave:0.5:right",
+    )
+    mix.add_argument("-i", "--intensity", type=_intensity, default=255, help="0-255")
+    mix.add_argument("-d", "--duration", type=float, help="stop after this many seconds")
+
+    timeline = commands.add_parser("timeline", parents=[output], help="play a .dstl timeline")
+    timeline.add_argument("path")
+    timeline.add_argument("-i", "--intensity", type=_intensity, default=255, help="0-255")
+    timeline.add_argument("--loop", action="store_true", help="restart at the end")
+
+    program = commands.add_parser(
+        "program", parents=[output], help="play a sequence of patterns with ramps"
+    )
+    program.add_argument(
+        "segments", nargs="+", type=_segment, metavar="PATTERN:SECONDS[:INTENSITY[:RAMP]]",
+        help="e.g. wave:300:100 heartbeat:60:200:30 pulse:120 (RAMP fades in from the previous)",
+    )
+    program.add_argument("-i", "--intensity", type=_intensity, default=255, help="0-255")
+    program.add_argument("--loop", action="store_true", help="restart at the end")
+    program.add_argument("--start", type=float, default=0.0, metavar="SECONDS", help="start here")
+    program.add_argument("--save", metavar="PATH", help="write a .dstl timeline instead of playing")
+
+    audio = commands.add_parser(
+        "audio", parents=[output], help="vibrate to a WAV file or raw PCM on stdin"
+    )
+    audio.add_argument("path", nargs="?", default="-", help="WAV file, or - for stdin")
+    audio.add_argument("-i", "--intensity", type=_intensity, default=255, help="0-255")
+    audio.add_argument(
+        "--rate", type=int, default=44100, help="sample rate of 16-bit stereo stdin PCM"
+    )
+
+    replay = commands.add_parser(
+        "replay", parents=[output], help="play a recording made with --record"
+    )
+    replay.add_argument("path")
+    replay.add_argument("-i", "--intensity", type=_intensity, default=255, help="0-255")
+    replay.add_argument("--loop", action="store_true", help="restart at the end")
+
+    convert = commands.add_parser("import", help="convert a JSON/CSV script to a timeline")
+    convert.add_argument("script")
+    convert.add_argument("output")
+
+    daemon = commands.add_parser(
+        "daemon", parents=[stats, controls], help="keep controllers connected and serve control clients"
+    )
+    daemon.add_argument(
+        "pattern", nargs="?", choices=sorted(PATTERN_NAMES),
+        help="pattern to play whenever a controller is connected",
+    )
+    daemon.add_argument("-i", "--intensity", type=_intensity, default=128, help="0-255")
+    daemon.add_argument(
+        "--port", type=int, default=DEFAULT_PORT, help="TCP control port (0 disables)"
+    )
+    daemon.add_argument(
+        "--ws-port", type=int, nargs="?", default=0, const=DEFAULT_WS_PORT,
+        help=f"serve WebSocket clients too (default port {DEFAULT_WS_PORT}, needs websockets)",
+    )
+
+    return parser
+
+
+def _stop_on_signals(done: threading.Event) -> None:
+    """Set done on SIGINT/SIGTERM instead of raising KeyboardInterrupt."""
+    def handler(signum, frame):
+        done.set()
+
+    signal.signal(signal.SIGINT, handler)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, handler)
+
+
+def _wait(done: threading.Event, timeout: Optional[float] = None) -> None:
+    """Wait for done in short slices so signals are handled on Windows too."""
+    remaining = timeout
+    while not done.is_set():
+        slice_ = 0.2 if remaining is None else min(0.2, remaining)
+        if slice_ <= 0:
+            return
+        done.wait(slice_)
+        if remaining is not None:
+            remaining -= slice_
+
+
+def _print_write_timing(backend: SimulatedBackend) -> None:
+    """Summarize the frames a simulated controller received."""
+    times = backend.timestamps()
+    intervals = [(b - a) / 1e6 for a, b in zip(times, times[1:])]
+    print(f"{backend.writes} frames written, {backend.failures} failed", file=sys.stderr)
+    if intervals:
+        print(
+            f"interval ms: mean {sum(intervals) / len(intervals):.3f}, "
+            f"min {min(intervals):.3f}, max {max(intervals):.3f}",
+            file=sys.stderr,
+        )
+
+
+def _attach_input(pipeline: InputPipeline, manager: DualSenseManager) -> bool:
+    """Attach the input pipeline to the connected controller, if it can read input."""
+    controller = manager.controller
+    if controller is None:
+        print("Controller input needs a real controller; ignoring --input", file=sys.stderr)
+        return False
+    pipeline.attach(controller)
+    return True
+
+
+def _print_input_latency(pipeline: InputPipeline) -> None:
+    """Summarize how quickly controller input reached the motors."""
+    latency = instrumentation.input_latency
+    print(f"{pipeline.forwarded} input changes forwarded", file=sys.stderr)
+    if latency.count:
+        print(
+            f"input latency ms: mean {latency.mean * 1e3:.3f}, "
+            f"p99 {latency.percentile(0.99) * 1e3:.3f}, max {latency.max * 1e3:.3f}",
+            file=sys.stderr,
+        )
+
+
+def _start_recorder(path: Optional[str], manager: DualSenseManager) -> Optional[SessionRecorder]:
+    """Record the manager's motor writes to path, if one was given."""
+    if path is None:
+        return None
+    recorder = SessionRecorder(path)
+    recorder.start()
+    manager.set_recorder(recorder)
+    return recorder
+
+
+def _stop_recorder(recorder: Optional[SessionRecorder], manager: DualSenseManager) -> None:
+    """Detach and close a recorder started by _start_recorder."""
+    if recorder is None:
+        return
+    manager.set_recorder(None)
+    recorder.stop()
+    dropped = f" ({recorder.dropped} dropped)" if recorder.dropped else ""
+    print(f"{recorder.frames} frames recorded to {recorder.path}{dropped}", file=sys.stderr)
+
+
+def _open_source(args: argparse.Namespace) -> tuple[Optional[Timeline], Optional["AudioSource"]]:
+    """Open the timeline or audio source a command plays, if it has one.
+
+    Returns:
+        (timeline, audio source), either of which may be None
+
+    Raises:
+        TimelineError: If the timeline file is invalid
+        OSError: If a file cannot be read
+        ValueError, EOFError, wave.Error: If the audio input is invalid
+        RuntimeError: If audio is requested without NumPy
+    """
+    if args.command == "timeline":
+        return Timeline(args.path), None
+    if args.command != "audio":
+        return None, None
+    # Imported here because audio sources need NumPy
+    from controller.audio_source import AudioSource
+
+    if args.path == "-":
+        return None, AudioSource.from_pipe(sample_rate=args.rate)
+    return None, AudioSource.from_wav(args.path)
+
+
+def _apply_realtime(args: argparse.Namespace, engine: EngineCore) -> None:
+    """Set the real-time profile requested with --realtime."""
+    if args.realtime:
+        engine.set_realtime(RealtimeProfile(priority=args.rt_priority, cpus=args.cpus))
+
+
+def _print_realtime(engine: EngineCore) -> None:
+    """Print what --realtime changed for the last run."""
+    status = engine.realtime_status
+    if status is not None:
+        print(f"realtime: {status.describe()}", file=sys.stderr)
+
+
+def _run_engine(args: argparse.Namespace) -> int:
+    """Connect, play the requested source and wait until it ends."""
+    recording = None
+    if args.command == "replay":
+        try:
+            recording = read_recording(args.path)
+        except (OSError, RecordingError) as e:
+            print(f"Cannot replay {args.path}: {e}", file=sys.stderr)
+            return 1
+        if not recording:
+            print(f"{args.path} has no frames", file=sys.stderr)
+            return 1
+        if recording.dropped:
+            print(f"{recording.dropped} frames were lost while recording", file=sys.stderr)
+
+    program = None
+    if args.command == "program":
+        program = ProgramTimeline(args.segments)
+        if args.save:
+            try:
+                program.save(args.save)
+            except OSError as e:
+                print(f"Cannot save {args.save}: {e}", file=sys.stderr)
+                return 1
+            return 0
+
+    manager = DualSenseManager()
+    backend = None
+    if args.simulate:
+        backend = SimulatedBackend()
+        manager.use_backend(backend)
+    if not manager.connect():
+        print("No DualSense controller found", file=sys.stderr)
+        return 1
+    try:
+        recorder = _start_recorder(args.record, manager)
+    except OSError as e:
+        print(f"Cannot record to {args.record}: {e}", file=sys.stderr)
+        manager.disconnect()
+        return 1
+    try:
+        timeline, source = _open_source(args)
+    except (TimelineError, OSError, ValueError, EOFError, wave.Error, RuntimeError) as e:
+        # wave raises a bare EOFError for a truncated header
+        print(f"Cannot play {args.path}: {str(e) or 'file is truncated'}", file=sys.stderr)
+        _stop_recorder(recorder, manager)
+        manager.disconnect()
+        return 1
+
+    done = threading.Event()
+    errors: list[str] = []
+
+    def on_error(error: str) -> None:
+        errors.append(error)
+        done.set()
+
+    engine = EngineCore(on_finished=done.set, on_error=on_error)
+    _apply_realtime(args, engine)
+    if args.output_rate or args.slew is not None:
+        engine.set_output(args.output_rate, Interpolation(args.interpolation), args.slew)
+    _stop_on_signals(done)
+    pipeline = None
+    if args.input:
+        pipeline = InputPipeline(engine)
+        pipeline.base_intensity = args.intensity
+        if not _attach_input(pipeline, manager):
+            pipeline = None
+    duration = None
+
+    try:
+        if args.command == "play":
+            engine.start_vibration(args.intensity, PATTERN_NAMES[args.pattern])
+            duration = args.duration
+        elif args.command == "mix":
+            engine.start_mix(Mix(args.layers), args.intensity)
+            duration = args.duration
+        elif args.command == "timeline":
+            engine.start_timeline(timeline, args.intensity, args.loop)
+        elif args.command == "replay":
+            engine.start_timeline(recording, args.intensity, args.loop)
+        elif args.command == "program":
+            engine.start_timeline(program, args.intensity, args.loop, args.start)
+        else:
+            source.start()
+            engine.set_audio_source(source)
+            engine.start_vibration(args.intensity, PatternType.AUDIO)
+
+        _wait(done, duration)
+    finally:
+        if pipeline is not None:
+            pipeline.detach()
+        engine.shutdown()
+        _stop_recorder(recorder, manager)
+        if source is not None:
+            source.close()
+        if timeline is not None:
+            timeline.close()
+        manager.disconnect()
+
+    _print_realtime(engine)
+    if backend is not None:
+        _print_write_timing(backend)
+    if pipeline is not None:
+        _print_input_latency(pipeline)
+    if errors:
+        print(f"Vibration error: {errors[0]}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _run_daemon(args: argparse.Namespace) -> int:
+    """Serve control clients and keep controllers connected, until signalled."""
+    done = threading.Event()
+    _stop_on_signals(done)
+    manager = DualSenseManager()
+    engine = EngineCore(on_error=lambda error: print(f"Vibration error: {error}", file=sys.stderr))
+    _apply_realtime(args, engine)
+    pattern = PATTERN_NAMES[args.pattern] if args.pattern else None
+    pipeline = None
+    if args.input:
+        pipeline = InputPipeline(engine)
+        pipeline.base_intensity = args.intensity
+
+    server = None
+    if args.port or args.ws_port:
+        server = ControlServer(engine, port=args.port or None, ws_port=args.ws_port or None)
+        try:
+            server.start()
+        except (OSError, RuntimeError) as e:
+            print(f"Cannot start control server: {e}", file=sys.stderr)
+            engine.shutdown()
+            return 1
+        for host, port in server.addresses:
+            print(f"Listening on {host}:{port}", file=sys.stderr)
+
+    def on_device(event: DeviceEvent, devices) -> None:
+        if event == DeviceEvent.DISCONNECTED:
+            if pipeline is not None:
+                pipeline.detach()
+            engine.stop_vibration()
+            return
+        if pipeline is not None:
+            _attach_input(pipeline, manager)
+        if pattern is not None:
+            engine.start_vibration(args.intensity, pattern)
+
+    try:
+        recorder = _start_recorder(args.record, manager)
+    except OSError as e:
+        print(f"Cannot record to {args.record}: {e}", file=sys.stderr)
+        if server is not None:
+            server.stop()
+        engine.shutdown()
+        return 1
+
+    monitor = DeviceMonitor(poll_interval=Config.CONNECTION_CHECK_INTERVAL / 1000)
+    monitor.add_listener(on_device)
+    monitor.start()
+    try:
+        _wait(done)
+    finally:
+        monitor.stop()
+        if pipeline is not None:
+            pipeline.detach()
+            _print_input_latency(pipeline)
+        if server is not None:
+            server.stop()
+        engine.shutdown()
+        _stop_recorder(recorder, manager)
+        manager.disconnect()
+    _print_realtime(engine)
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """CLI entry point.
+
+    Args:
+        argv: Arguments (defaults to sys.argv[1:])
+
+    Returns:
+        Process exit code
+    """
+    args = build_parser().parse_args(argv)
+    if getattr(args, "stats", None):
+        instrumentation.start_dump(args.stats)
+
+    if args.command == "import":
+        try:
+            import_script(args.script, args.output)
+        except (OSError, TimelineError) as e:
+            print(e, file=sys.stderr)
+            return 1
+        return 0
+    if args.command == "daemon":
+        return _run_daemon(args)
+    return _run_engine(args)
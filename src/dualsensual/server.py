@@ -0,0 +1,390 @@
+"""Localhost control server over TCP and WebSocket.
+
+Clients send JSON commands and compact binary frames. Over TCP, commands
+are newline-terminated JSON objects and frames are three bytes::
+
+    0x01 left right
+
+Over WebSocket, text messages are commands and binary messages carry one
+or more frames. Commands (each may carry an ``"id"`` echoed in the reply)::
+
+    {"cmd": "start", "pattern": "wave", "intensity": 128}
+    {"cmd": "stop"}
+    {"cmd": "set-intensity", "value": 200}
+    {"cmd": "set-pattern", "pattern": "stream"}
+    {"cmd": "subscribe"} / {"cmd": "unsubscribe"}
+    {"cmd": "status"}  (includes timing histograms when instrumentation is on)
+
+Pattern "stream" plays the frames clients send. Frames only replace the
+value the engine reads on its next tick, so bursts never queue up.
+Subscribers receive ``0x02 left right`` telemetry messages; each one has a
+latest-value slot, so a slow client drops samples instead of stalling
+others or the output loop.
+"""
+
+from typing import Awaitable, Callable, Optional
+import asyncio
+import json
+import threading
+
+from controller.engine_core import EngineCore
+from controller.frame_stream import FrameSlot
+from controller.patterns import PatternType
+
+
+FRAME = 0x01
+TELEMETRY = 0x02
+
+DEFAULT_PORT = 8765
+DEFAULT_WS_PORT = 8766
+
+# Longest JSON command accepted over TCP
+MAX_LINE = 64 * 1024
+
+PATTERN_NAMES = {
+    pattern.name.lower(): pattern for pattern in PatternType if pattern != PatternType.AUDIO
+}
+
+
+class CommandError(Exception):
+    """Raised for an invalid client command."""
+
+
+class _Subscriber:
+    """Telemetry destination with a latest-value slot and its own sender task."""
+
+    def __init__(self, send: Callable[[bytes], Awaitable[None]]) -> None:
+        self.send = send
+        self.pending: Optional[bytes] = None
+        self.ready = asyncio.Event()
+        self.task = asyncio.create_task(self._pump())
+
+    def offer(self, data: bytes) -> None:
+        self.pending = data
+        self.ready.set()
+
+    async def _pump(self) -> None:
+        try:
+            while True:
+                await self.ready.wait()
+                self.ready.clear()
+                data, self.pending = self.pending, None
+                if data is not None:
+                    await self.send(data)
+        except Exception:
+            # The client went away; its handler unsubscribes it
+            pass
+
+
+class ControlServer:
+    """Serves engine control on localhost.
+
+    Run it on its own thread with start()/stop(), or await serve() from an
+    existing event loop. The server takes over the engine's telemetry
+    notification callback while it runs.
+    """
+
+    def __init__(
+        self,
+        engine: EngineCore,
+        host: str = "127.0.0.1",
+        port: Optional[int] = DEFAULT_PORT,
+        ws_port: Optional[int] = None,
+    ) -> None:
+        """Create a server.
+
+        Args:
+            engine: Engine to control
+            host: Interface to bind (keep it on localhost)
+            port: TCP port (None disables TCP)
+            ws_port: WebSocket port (None disables WebSocket)
+        """
+        self._engine = engine
+        self._host = host
+        self._port = port
+        self._ws_port = ws_port
+        self._slot = FrameSlot()
+        self._subscribers: set[_Subscriber] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self._bound: list[tuple[str, int]] = []
+
+    @property
+    def frame_slot(self) -> FrameSlot:
+        """Get the slot client frames are written to."""
+        return self._slot
+
+    @property
+    def addresses(self) -> list[tuple[str, int]]:
+        """Get the bound (host, port) addresses."""
+        return list(self._bound)
+
+    @property
+    def subscriber_count(self) -> int:
+        """Get the number of telemetry subscribers."""
+        return len(self._subscribers)
+
+    def start(self) -> None:
+        """Serve on a background thread.
+
+        Raises:
+            OSError: If a port cannot be bound
+            RuntimeError: If WebSocket is enabled but websockets is missing
+        """
+        if self._thread is not None:
+            return
+        ready = threading.Event()
+        errors: list[BaseException] = []
+
+        def run() -> None:
+            try:
+                asyncio.run(self.serve(ready))
+            except BaseException as e:
+                errors.append(e)
+                ready.set()
+
+        self._thread = threading.Thread(target=run, name="ControlServer", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if errors:
+            self._thread = None
+            raise errors[0]
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """Stop serving and wait for the server thread.
+
+        Args:
+            timeout: Seconds to wait for the thread to exit
+        """
+        loop, stopping = self._loop, self._stopping
+        if loop is not None and stopping is not None:
+            try:
+                loop.call_soon_threadsafe(stopping.set)
+            except RuntimeError:
+                # The loop already closed
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    async def serve(self, ready: Optional[threading.Event] = None) -> None:
+        """Serve until stop() is called.
+
+        Args:
+            ready: Set once every port is bound
+        """
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        servers = []
+        telemetry = self._engine.telemetry
+        self._engine.set_frame_slot(self._slot)
+        telemetry.set_notify(self._notify)
+
+        try:
+            if self._port is not None:
+                server = await asyncio.start_server(self._serve_tcp, self._host, self._port)
+                servers.append(server)
+                self._bound.extend(sock.getsockname()[:2] for sock in server.sockets)
+            if self._ws_port is not None:
+                try:
+                    import websockets
+                except ImportError as e:
+                    raise RuntimeError(
+                        "WebSocket control requires websockets (pip install websockets)"
+                    ) from e
+                server = await websockets.serve(self._serve_ws, self._host, self._ws_port)
+                servers.append(server)
+                self._bound.extend(sock.getsockname()[:2] for sock in server.sockets)
+            if ready is not None:
+                ready.set()
+            await self._stopping.wait()
+        finally:
+            telemetry.set_notify(None)
+            for server in servers:
+                server.close()
+            for subscriber in list(self._subscribers):
+                subscriber.task.cancel()
+            self._subscribers.clear()
+            for server in servers:
+                await server.wait_closed()
+            self._bound.clear()
+            self._loop = None
+
+    def _notify(self) -> None:
+        """Hand a telemetry notification to the event loop (worker thread)."""
+        loop = self._loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self._broadcast)
+            except RuntimeError:
+                pass
+
+    def _broadcast(self) -> None:
+        """Offer the latest sample to every subscriber."""
+        sample = self._engine.telemetry.latest()
+        if sample is None or not self._subscribers:
+            return
+        data = bytes((TELEMETRY, sample.left, sample.right))
+        for subscriber in self._subscribers:
+            subscriber.offer(data)
+
+    def _subscribe(
+        self, client: dict, send: Callable[[bytes], Awaitable[None]]
+    ) -> None:
+        if client.get("subscriber") is None:
+            subscriber = _Subscriber(send)
+            client["subscriber"] = subscriber
+            self._subscribers.add(subscriber)
+
+    def _unsubscribe(self, client: dict) -> None:
+        subscriber = client.pop("subscriber", None)
+        if subscriber is not None:
+            self._subscribers.discard(subscriber)
+            subscriber.task.cancel()
+
+    @staticmethod
+    def _pattern(message: dict) -> PatternType:
+        name = str(message.get("pattern", "constant")).lower()
+        if name not in PATTERN_NAMES:
+            raise CommandError(f"Unknown pattern: {name}")
+        return PATTERN_NAMES[name]
+
+    @staticmethod
+    def _intensity(message: dict, key: str, default: int) -> int:
+        try:
+            value = int(message.get(key, default))
+        except (TypeError, ValueError) as e:
+            raise CommandError(f"{key} must be an integer") from e
+        if not 0 <= value <= 255:
+            raise CommandError(f"{key} must be between 0 and 255")
+        return value
+
+    def _command(
+        self, raw: bytes | str, client: dict, send: Callable[[bytes], Awaitable[None]]
+    ) -> dict:
+        """Run one JSON command and build its reply."""
+        reply: dict = {"ok": True}
+        try:
+            try:
+                message = json.loads(raw)
+            except ValueError as e:
+                raise CommandError("Invalid JSON") from e
+            if not isinstance(message, dict):
+                raise CommandError("Command must be a JSON object")
+            if "id" in message:
+                reply["id"] = message["id"]
+
+            engine = self._engine
+            command = message.get("cmd")
+            if command == "start":
+                pattern = self._pattern(message)
+                default = 255 if pattern == PatternType.STREAM else 128
+                engine.start_vibration(self._intensity(message, "intensity", default), pattern)
+            elif command == "stop":
+                engine.stop_vibration()
+            elif command == "set-intensity":
+                engine.set_intensity(self._intensity(message, "value", None))
+            elif command == "set-pattern":
+                engine.set_pattern(self._pattern(message))
+            elif command == "subscribe":
+                self._subscribe(client, send)
+            elif command == "unsubscribe":
+                self._unsubscribe(client)
+            elif command == "status":
+                slot = self._slot
+                reply["active"] = engine.is_active
+                reply["frames"] = {
+                    "received": slot.received,
+                    "played": slot.played,
+                    "coalesced": slot.coalesced,
+                }
+                reply["subscribers"] = len(self._subscribers)
+                if engine.instrumentation.enabled:
+                    reply["instrumentation"] = engine.instrumentation.stats()
+            else:
+                raise CommandError(f"Unknown command: {command}")
+        except CommandError as e:
+            reply["ok"] = False
+            reply["error"] = str(e)
+        return reply
+
+    async def _serve_tcp(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Handle one TCP client."""
+        client: dict = {}
+
+        async def send(data: bytes) -> None:
+            writer.write(data)
+            await writer.drain()
+
+        buffer = bytearray()
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                buffer += data
+
+                # Only the newest frame of a chunk matters
+                frame = None
+                frames = 0
+                pos = 0
+                while pos < len(buffer):
+                    kind = buffer[pos]
+                    if kind == FRAME:
+                        if len(buffer) - pos < 3:
+                            break
+                        frame = (buffer[pos + 1], buffer[pos + 2])
+                        frames += 1
+                        pos += 3
+                    elif kind == ord("{"):
+                        end = buffer.find(b"\n", pos)
+                        if end < 0:
+                            if len(buffer) - pos > MAX_LINE:
+                                raise CommandError("Command too long")
+                            break
+                        if frame is not None:
+                            # Keep frames ordered with commands that follow them
+                            self._slot.write(*frame, frames)
+                            frame = None
+                            frames = 0
+                        reply = self._command(bytes(buffer[pos:end]), client, send)
+                        writer.write(json.dumps(reply).encode() + b"\n")
+                        pos = end + 1
+                    elif kind in b" \t\r\n":
+                        pos += 1
+                    else:
+                        raise CommandError(f"Unexpected byte 0x{kind:02x}")
+                del buffer[:pos]
+
+                if frame is not None:
+                    self._slot.write(*frame, frames)
+                await writer.drain()
+        except CommandError as e:
+            writer.write(json.dumps({"ok": False, "error": str(e)}).encode() + b"\n")
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._unsubscribe(client)
+            writer.close()
+
+    async def _serve_ws(self, websocket) -> None:
+        """Handle one WebSocket client."""
+        client: dict = {}
+        try:
+            async for message in websocket:
+                if isinstance(message, bytes):
+                    # One or more frames; only the newest matters
+                    end = len(message) - len(message) % 3
+                    if end and message[end - 3] == FRAME:
+                        self._slot.write(message[end - 2], message[end - 1], end // 3)
+                    continue
+                reply = self._command(message, client, websocket.send)
+                await websocket.send(json.dumps(reply))
+        except Exception:
+            # Connection closed
+            pass
+        finally:
+            self._unsubscribe(client)
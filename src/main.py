@@ -1,5 +1,6 @@
 """Dual Sensual - DualSense Controller Vibration Application."""
 
+import multiprocessing
 import sys
 from pathlib import Path
 
@@ -20,6 +21,9 @@ def load_stylesheet(app: QApplication) -> None:
 
 def main() -> int:
     """Application entry point."""
+    # The engine process starts this executable again when frozen
+    multiprocessing.freeze_support()
+
     # Create application
     app = QApplication(sys.argv)
     app.setApplicationName("Dual Sensual")
@@ -34,7 +38,7 @@ def main() -> int:
     load_stylesheet(app)
 
     # Create and show main window
-    window = MainWindow()
+    window = MainWindow(engine_process="--engine-process" in sys.argv[1:])
     window.show()
 
     # Run event loop
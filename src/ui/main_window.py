@@ -15,18 +15,25 @@ from ui.widgets.power_toggle import PowerToggle
 from ui.widgets.intensity_slider import IntensitySlider
 from ui.widgets.status_display import StatusDisplay
 from ui.styles.theme import Theme
-from controller.vibration_engine import VibrationEngine
-from controller.patterns import PatternType
+from controller.vibration_engine import ProcessVibrationEngine, VibrationEngine
+from controller.patterns import LIVE_PATTERNS, PatternType
 from controller.dualsense_manager import DualSenseManager
 
 
 class MainWindow(QMainWindow):
     """Main application window for Dual Sensual."""
 
-    def __init__(self) -> None:
+    def __init__(self, engine_process: bool = False) -> None:
+        """Create the window.
+
+        Args:
+            engine_process: Run the engine and the controller in a child
+                process, so GUI work cannot delay motor writes
+        """
         super().__init__()
         self._manager = DualSenseManager()
-        self._engine = VibrationEngine()
+        self._engine_process = ProcessVibrationEngine() if engine_process else None
+        self._engine = self._engine_process or VibrationEngine()
         self._setup_window()
         self._setup_ui()
         self._connect_signals()
@@ -66,7 +73,7 @@ class MainWindow(QMainWindow):
         status_group = self._create_group_box("")
         status_layout = QVBoxLayout(status_group)
         status_layout.setContentsMargins(0, 0, 0, 0)
-        self._status_display = StatusDisplay()
+        self._status_display = StatusDisplay(engine_process=self._engine_process)
         status_layout.addWidget(self._status_display)
         layout.addWidget(status_group)
 
@@ -93,6 +100,9 @@ class MainWindow(QMainWindow):
 
         self._pattern_combo = QComboBox()
         for pattern in PatternType:
+            # Live sources need a stream the window cannot provide
+            if pattern in LIVE_PATTERNS:
+                continue
             self._pattern_combo.addItem(pattern.value, pattern)
         pattern_layout.addWidget(self._pattern_combo)
 
@@ -112,14 +122,16 @@ class MainWindow(QMainWindow):
         self._intensity_slider.value_changed.connect(self._on_intensity_changed)
         self._pattern_combo.currentIndexChanged.connect(self._on_pattern_changed)
         self._engine.error_occurred.connect(self._on_engine_error)
+        self._status_display.connection_changed.connect(self._on_connection_changed)
 
     def _on_power_toggled(self, checked: bool) -> None:
         """Handle power toggle state change."""
         if checked:
-            if not self._manager.is_connected:
-                if not self._manager.connect():
-                    self._power_toggle.set_checked(False, animated=True)
-                    return
+            # Connecting is left to the device monitor thread
+            if not self._status_display.is_connected:
+                self._power_toggle.set_checked(False, animated=True)
+                self._status_display.refresh()
+                return
 
             intensity = self._intensity_slider.intensity
             pattern = self._pattern_combo.currentData()
@@ -138,6 +150,11 @@ class MainWindow(QMainWindow):
             pattern = self._pattern_combo.currentData()
             self._engine.set_pattern(pattern)
 
+    def _on_connection_changed(self, connected: bool) -> None:
+        """Handle controller connect or disconnect."""
+        if not connected:
+            self._power_toggle.set_checked(False, animated=True)
+
     def _on_engine_error(self, error: str) -> None:
         """Handle vibration engine error."""
         self._power_toggle.set_checked(False, animated=True)
@@ -145,6 +162,7 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event) -> None:
         """Handle window close event."""
         # Stop vibration and disconnect controller
-        self._engine.stop_vibration()
+        self._engine.shutdown()
+        self._status_display.shutdown()
         self._manager.disconnect()
         event.accept()
@@ -1,20 +1,46 @@
 """Connection status display widget."""
 
-from PyQt6.QtCore import Qt, QTimer
+from typing import Optional
+
+from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel
 
 from ui.styles.theme import Theme
 from controller.dualsense_manager import DualSenseManager, ConnectionType
+from controller.device_monitor import DeviceEvent, DeviceInfo, DeviceMonitor
+from controller.vibration_engine import ProcessVibrationEngine
+from utils.config import Config
 
 
 class StatusDisplay(QWidget):
     """Display for controller connection status."""
 
-    def __init__(self, parent: QWidget | None = None) -> None:
+    connection_changed = pyqtSignal(bool)
+
+    # Carries monitor events from the monitor thread to the GUI thread
+    _device_event = pyqtSignal(object)
+
+    def __init__(
+        self,
+        parent: QWidget | None = None,
+        engine_process: Optional[ProcessVibrationEngine] = None,
+    ) -> None:
+        """Create the display.
+
+        Args:
+            parent: Parent widget
+            engine_process: Engine process that owns the controller; its
+                status is shown instead of running a device monitor here
+        """
         super().__init__(parent)
-        self._manager = DualSenseManager()
+        # Either owns the controller and reports its connection
+        self._manager = engine_process if engine_process is not None else DualSenseManager()
+        self._monitor: Optional[DeviceMonitor] = None
         self._setup_ui()
-        self._setup_refresh_timer()
+        if engine_process is not None:
+            engine_process.connection_changed.connect(self._on_connection)
+        else:
+            self._setup_monitor()
 
     def _setup_ui(self) -> None:
         """Set up the widget UI."""
@@ -64,18 +90,27 @@ class StatusDisplay(QWidget):
         # Initial update
         self._update_status()
 
-    def _setup_refresh_timer(self) -> None:
-        """Set up timer to periodically check connection status."""
-        self._refresh_timer = QTimer(self)
-        self._refresh_timer.timeout.connect(self._check_connection)
-        self._refresh_timer.start(2000)  # Check every 2 seconds
-
-    def _check_connection(self) -> None:
-        """Check and update connection status."""
-        if not self._manager.is_connected:
-            # Try to connect
-            self._manager.connect()
+    def _setup_monitor(self) -> None:
+        """Start the background device monitor."""
+        self._device_event.connect(self._on_device_event)
+        self._monitor = DeviceMonitor(
+            poll_interval=Config.CONNECTION_CHECK_INTERVAL / 1000
+        )
+        self._monitor.add_listener(self._on_monitor_event)
+        self._monitor.start()
+
+    def _on_monitor_event(self, event: DeviceEvent, devices: list[DeviceInfo]) -> None:
+        """Forward a monitor event to the GUI thread."""
+        self._device_event.emit(event)
+
+    def _on_device_event(self, event: DeviceEvent) -> None:
+        """Update the display for a connect or disconnect event."""
+        self._on_connection(event == DeviceEvent.CONNECTED)
+
+    def _on_connection(self, connected: bool) -> None:
+        """Update the display for a connection change."""
         self._update_status()
+        self.connection_changed.emit(connected)
 
     def _update_status(self) -> None:
         """Update the status display."""
@@ -108,4 +143,11 @@ class StatusDisplay(QWidget):
 
     def refresh(self) -> None:
         """Manually refresh connection status."""
-        self._check_connection()
+        self._update_status()
+        if self._monitor is not None:
+            self._monitor.poke()
+
+    def shutdown(self) -> None:
+        """Stop the background device monitor."""
+        if self._monitor is not None:
+            self._monitor.stop()
@@ -0,0 +1,35 @@
+"""Shared fixtures; the packages are imported from src/ like the benchmarks do."""
+
+from pathlib import Path
+import sys
+
+import pytest
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+from controller.dualsense_device import DualSenseDevice  # noqa: E402
+from controller.engine_core import EngineCore  # noqa: E402
+from controller.simulated_backend import SimulatedBackend  # noqa: E402
+
+
+@pytest.fixture
+def backend():
+    """Open simulated controller."""
+    return SimulatedBackend(capacity=4096)
+
+
+@pytest.fixture
+def device(backend):
+    """Device driving the simulated controller."""
+    device = DualSenseDevice(backend=backend)
+    device.open()
+    return device
+
+
+@pytest.fixture
+def engine(device):
+    """Engine writing to the simulated controller."""
+    engine = EngineCore(output=device)
+    yield engine
+    engine.shutdown()
@@ -0,0 +1,38 @@
+"""Tests for merging output channels into frames."""
+
+from controller.compositor import NEUTRAL_FIELDS, Channel, FrameCompositor
+from controller.output_frame import TriggerEffect
+
+
+def test_patterns_drive_only_the_motors_by_default():
+    compositor = FrameCompositor()
+    frame = compositor.compose(10, 20, {"lightbar": (1, 2, 3)})
+    assert (frame.left_motor, frame.right_motor, frame.lightbar) == (10, 20, None)
+
+
+def test_unchanged_step_reuses_the_frame():
+    compositor = FrameCompositor(mask=Channel.ALL)
+    frame = compositor.compose(10, 10, {"player_leds": 3})
+    assert compositor.compose(10, 10, {"player_leds": 3}) is frame
+    assert compositor.compose(11, 10, {"player_leds": 3}) is not frame
+
+
+def test_channel_no_longer_driven_falls_back():
+    compositor = FrameCompositor(mask=Channel.ALL)
+    rigid = TriggerEffect(1, (0, 200))
+    compositor.set_static(lightbar=(9, 9, 9))
+    compositor.compose(10, 10, {"right_trigger": rigid, "lightbar": (1, 2, 3)})
+
+    # A source without channel fields takes over
+    frame = compositor.compose(20, 20, None)
+    assert frame.right_trigger == NEUTRAL_FIELDS["right_trigger"]
+    assert frame.lightbar == (9, 9, 9)
+    assert frame.left_trigger is None
+
+
+def test_release_restores_driven_channels():
+    compositor = FrameCompositor(mask=Channel.ALL)
+    compositor.compose(10, 10, {"player_leds": 3})
+    frame = compositor.release()
+    assert (frame.left_motor, frame.player_leds) == (0, NEUTRAL_FIELDS["player_leds"])
+    assert compositor.compose(0, 0).player_leds is None
@@ -0,0 +1,49 @@
+"""Tests for fanning frames out to several controllers."""
+
+import pytest
+
+from controller import device_pool
+from controller.device_pool import DevicePool
+from controller.dualsense_device import DeviceInfo, DualSenseDevice
+from controller.output_frame import OutputFrame
+from controller.simulated_backend import SimulatedBackend
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """Pool over three simulated controllers whose writes block."""
+    infos = [DeviceInfo(bytes([index]), f"serial{index}", 0x0CE6) for index in range(3)]
+    backends = {}
+
+    def make_device(info):
+        backends[info.serial_number] = SimulatedBackend(latency=0.001)
+        return DualSenseDevice(info, backend=backends[info.serial_number])
+
+    monkeypatch.setattr(device_pool, "enumerate_dualsense", lambda: infos)
+    monkeypatch.setattr(device_pool, "DualSenseDevice", make_device)
+    pool = DevicePool()
+    pool.open_all()
+    pool.backends = backends
+    yield pool
+    pool.close_all()
+
+
+def test_write_reaches_every_device(pool):
+    assert pool.write_frame(OutputFrame(10, 20)) == 3
+    assert all(backend.writes == 1 for backend in pool.backends.values())
+
+
+def test_write_survives_executor_shut_down_mid_tick(pool):
+    # As if close_all() or a resize on another thread retired it
+    pool._executor.shutdown(wait=True)
+    assert pool.write_frame(OutputFrame(10, 20)) == 3
+
+
+def test_prune_drops_unplugged_devices_from_selection(pool):
+    pool.select(["serial0", "serial1"])
+    pool.backends["serial1"].unplug()
+    removed = pool.prune()
+
+    assert [info.serial_number for info in removed] == ["serial1"]
+    assert [device.info.serial_number for device in pool.selected] == ["serial0"]
+    assert pool.write_frame(OutputFrame(10, 20)) == 1
@@ -0,0 +1,82 @@
+"""Tests for the engine's output loop."""
+
+import threading
+import time
+
+import pytest
+
+from controller.engine_core import EngineCore
+from controller.patterns import PatternType
+from controller.sequencer import ProgramTimeline, Segment
+from controller.timeline import Timeline, write_timeline
+
+
+def _wait_for(condition, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+def test_crossfade_from_timeline_that_ends_mid_fade(engine, backend):
+    # The outgoing timeline runs out 150 ms into a one second fade
+    engine.set_crossfade(1.0)
+    engine.start_timeline(ProgramTimeline([Segment(PatternType.CONSTANT, 0.2, 100)]))
+    time.sleep(0.05)
+    engine.set_timeline(None)
+
+    started = time.process_time()
+    assert _wait_for(lambda: backend.records()[-1][1] == 255)
+    time.sleep(0.3)
+    # The worker sleeps between steps instead of spinning on zero-length ones
+    assert time.process_time() - started < 0.5
+    assert engine.is_active
+
+
+def test_crossfade_into_timeline_shorter_than_fade(device):
+    finished = threading.Event()
+    engine = EngineCore(output=device, on_finished=finished.set)
+    try:
+        engine.set_crossfade(1.0)
+        engine.start_vibration(200, PatternType.CONSTANT)
+        time.sleep(0.05)
+        engine.set_timeline(ProgramTimeline([Segment(PatternType.CONSTANT, 0.1, 50)]))
+        assert finished.wait(2.0)
+        assert _wait_for(lambda: not engine.is_active)
+    finally:
+        engine.shutdown()
+
+
+def test_mix_timeline_layers_start_at_the_clock(engine, tmp_path):
+    path = tmp_path / "ramp.dstl"
+    write_timeline(path, [(t / 10, t * 10, t * 10) for t in range(20)], duration=2.0)
+    timeline = Timeline(path)
+    try:
+        cursor = engine.worker._open_layer(timeline, 255, 1.25)
+        assert cursor.position == pytest.approx(1.25)
+        assert cursor.left == 120
+    finally:
+        timeline.close()
+
+
+@pytest.mark.parametrize("seconds", [0.0, -0.01, float("nan")])
+def test_max_step_must_be_positive(engine, seconds):
+    with pytest.raises(ValueError):
+        engine.set_max_step(seconds)
+    assert engine.worker.max_step is None
+
+
+def test_seek_before_start_applies_to_next_timeline(engine):
+    engine.seek(1.5)
+    engine.start_timeline(ProgramTimeline([Segment(PatternType.CONSTANT, 3.0, 100)]))
+    time.sleep(0.05)
+    assert engine.timeline_position == pytest.approx(1.55, abs=0.05)
+
+    # Consumed by that timeline; the next one starts at the beginning
+    engine.stop_vibration()
+    engine.set_timeline(None)
+    engine.start_timeline(ProgramTimeline([Segment(PatternType.CONSTANT, 3.0, 100)]))
+    time.sleep(0.05)
+    assert engine.timeline_position == pytest.approx(0.05, abs=0.05)
@@ -0,0 +1,56 @@
+"""Tests for layered mixing."""
+
+from controller.mixer import Layer, Mix, MixCursor, Route, _expand
+from controller.patterns import PatternType, compile_pattern
+
+TICK_RATE = 50.0
+
+
+def _expected(layers, gain, ticks):
+    """Sum each layer compiled at its own gain, the way a mix sounds."""
+    left = [0] * ticks
+    right = [0] * ticks
+    for layer in layers:
+        table = compile_pattern(layer.source, round(gain * layer.gain), TICK_RATE)
+        layer_left, layer_right, _ = _expand(table, TICK_RATE)
+        for tick in range(ticks):
+            if layer.route is not Route.RIGHT:
+                left[tick] += layer_left[tick % len(layer_left)]
+            if layer.route is not Route.LEFT:
+                right[tick] += layer_right[tick % len(layer_right)]
+    return [min(255, value) for value in left], [min(255, value) for value in right]
+
+
+def _play(cursor, ticks):
+    left = []
+    right = []
+    for _ in range(ticks):
+        left.append(cursor.left)
+        right.append(cursor.right)
+        cursor.advance(cursor.step)
+    return left, right
+
+
+def test_mix_follows_layer_gains():
+    layers = (Layer(PatternType.WAVE, 0.5), Layer(PatternType.HEARTBEAT, 1.0, Route.LEFT))
+    cursor = MixCursor(Mix(layers), TICK_RATE, gain=200)
+    played = _play(cursor, 200)
+    expected = _expected(layers, 200, 200)
+    for actual, wanted in zip(played, expected):
+        assert max(abs(a - b) for a, b in zip(actual, wanted)) <= len(layers)
+
+
+def test_gain_change_reuses_compiled_layers():
+    compiled = []
+
+    def compile(pattern_type, intensity):
+        compiled.append((pattern_type, intensity))
+        return compile_pattern(pattern_type, intensity, TICK_RATE)
+
+    cursor = MixCursor(Mix([Layer(PatternType.WAVE)]), TICK_RATE, gain=255, compile=compile)
+    _play(cursor, 10)
+    compiled.clear()
+    cursor.set_gain(100)
+    _play(cursor, 10)
+    assert compiled == []
+    assert max(_play(cursor, 250)[0]) <= 100
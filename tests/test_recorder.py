@@ -0,0 +1,104 @@
+"""Tests for session recording and the recording file format."""
+
+from array import array
+
+from controller.recorder import (
+    _HEADER,
+    MAGIC,
+    VERSION,
+    SessionRecorder,
+    _encode_block,
+    read_recording,
+)
+
+FRAMES = [(0, 0), (255, 1), (3, 254), (128, 128), (0, 255), (17, 0)]
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "session.dsrc"
+    with SessionRecorder(path) as recorder:
+        for left, right in FRAMES:
+            recorder.append(left, right)
+    recording = read_recording(path)
+
+    assert list(zip(recording.left, recording.right)) == FRAMES
+    assert recording.dropped == 0
+    assert list(recording.times) == sorted(recording.times)
+
+
+def test_blocks_decode_large_gaps(tmp_path):
+    # Gaps that need one, two and four LEB128 bytes, split over two blocks
+    times_us = [5, 100, 20_000, 10_000_000, 10_000_001]
+    nanoseconds = array("q", (us * 1000 for us in times_us))
+    path = tmp_path / "session.dsrc"
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, 42))
+        f.write(_encode_block(nanoseconds[:3], array("B", [1, 2, 3]), array("B", [9, 8, 7]), 0))
+        f.write(_encode_block(nanoseconds[3:], array("B", [250, 4]), array("B", [0, 6]), 5))
+    recording = read_recording(path)
+
+    assert recording.started_ns == 42
+    assert list(recording.times) == times_us
+    assert list(recording.left) == [1, 2, 3, 250, 4]
+    assert list(recording.right) == [9, 8, 7, 0, 6]
+    assert recording.dropped == 5
+    # find() counts from the first frame
+    assert recording.find(9_999.0) == 2
+    assert recording.find(9_999.995) == 3
+
+
+def test_truncated_last_block_is_ignored(tmp_path):
+    path = tmp_path / "session.dsrc"
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, 0))
+        f.write(_encode_block(array("q", [0, 1000]), array("B", [1, 2]), array("B", [3, 4]), 0))
+        block = _encode_block(array("q", [2000, 3000]), array("B", [5, 6]), array("B", [7, 8]), 0)
+        f.write(block[:-1])
+    recording = read_recording(path)
+    assert list(recording.left) == [1, 2]
+
+
+def _recorder(tmp_path, capacity):
+    # Not started: _take() is driven by hand instead of the flush thread
+    return SessionRecorder(tmp_path / "session.dsrc", capacity=capacity)
+
+
+def test_take_full_ring(tmp_path):
+    recorder = _recorder(tmp_path, 8)
+    for value in range(8):
+        recorder.append(value, value)
+    times, left, right, dropped = recorder._take()
+
+    # The oldest slot is the one the writer fills next, so it is not trusted
+    assert list(left) == list(range(1, 8))
+    assert list(right) == list(range(1, 8))
+    assert dropped == 1
+    assert list(times) == sorted(times)
+    assert recorder._take() is None
+
+
+def test_take_overflowed_ring(tmp_path):
+    recorder = _recorder(tmp_path, 8)
+    for value in range(20):
+        recorder.append(value, 255 - value)
+    times, left, right, dropped = recorder._take()
+
+    assert list(left) == list(range(13, 20))
+    assert list(right) == [255 - value for value in range(13, 20)]
+    assert dropped == 13
+    assert recorder.dropped == 13
+    assert len(left) + dropped == recorder.frames
+
+
+def test_take_wrapped_ring(tmp_path):
+    recorder = _recorder(tmp_path, 8)
+    for value in range(6):
+        recorder.append(value, 0)
+    recorder._take()
+    for value in range(6, 11):
+        recorder.append(value, 0)
+    _, left, _, dropped = recorder._take()
+
+    # Frames 6 and 7 sit at the end of the ring, 8 to 10 at its start
+    assert list(left) == [6, 7, 8, 9, 10]
+    assert dropped == 0
@@ -0,0 +1,70 @@
+"""Tests for the coalesced telemetry channel."""
+
+import threading
+import time
+
+from controller.telemetry import TelemetryChannel
+
+
+def test_sample_held_back_by_rate_limit_is_announced():
+    channel = TelemetryChannel(max_rate=50)
+    seen = []
+    channel.set_notify(lambda: seen.append(channel.latest()))
+    try:
+        channel.publish(1, 1)
+        # Inside the 20 ms interval, and nothing is published after it
+        channel.publish(2, 3)
+        time.sleep(0.1)
+        assert [(sample.left, sample.right) for sample in seen] == [(1, 1), (2, 3)]
+    finally:
+        channel.close()
+
+
+def test_one_notification_until_read():
+    channel = TelemetryChannel(max_rate=1000)
+    notified = []
+    channel.set_notify(lambda: notified.append(1))
+    try:
+        channel.publish(1, 1)
+        time.sleep(0.01)
+        channel.publish(2, 2)
+        channel.flush()
+        time.sleep(0.01)
+        assert len(notified) == 1
+    finally:
+        channel.close()
+
+
+def test_samples_are_never_torn():
+    channel = TelemetryChannel(max_rate=1e6)
+    stop = threading.Event()
+
+    def publish():
+        value = 0
+        while not stop.is_set():
+            value = (value + 1) % 256
+            channel.publish(value, value)
+
+    thread = threading.Thread(target=publish)
+    thread.start()
+    try:
+        deadline = time.monotonic() + 0.3
+        while time.monotonic() < deadline:
+            sample = channel.latest()
+            if sample is not None:
+                assert sample.left == sample.right
+    finally:
+        stop.set()
+        thread.join()
+        channel.close()
+
+
+def test_close_stops_trailing_thread():
+    channel = TelemetryChannel(max_rate=10)
+    channel.publish(1, 1)
+    channel.latest()
+    channel.publish(2, 2)
+    thread = channel._trailing
+    assert thread is not None and thread.is_alive()
+    channel.close()
+    assert not thread.is_alive()
@@ -0,0 +1,77 @@
+"""Tests for the binary timeline format."""
+
+import json
+
+import pytest
+
+from controller.timeline import (
+    Timeline,
+    TimelineCursor,
+    TimelineError,
+    import_script,
+    write_timeline,
+)
+
+KEYFRAMES = [(0.0, 0, 255), (0.25, 10, 20), (0.5, 300, -5), (1.0, 128, 64), (2.5, 0, 0)]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 64])
+def test_round_trip(tmp_path, chunk_size):
+    path = tmp_path / "t.dstl"
+    write_timeline(path, KEYFRAMES, chunk_size=chunk_size)
+    with Timeline(path) as timeline:
+        assert len(timeline) == len(KEYFRAMES)
+        assert timeline.duration == 2.5
+        # Values are clamped to the motor range
+        assert [timeline.record(i) for i in range(len(timeline))] == [
+            (0, 0, 255), (250, 10, 20), (500, 255, 0), (1000, 128, 64), (2500, 0, 0)
+        ]
+        assert [timeline.find(ms) for ms in (0, 249, 250, 999, 1000, 9999)] == [0, 0, 1, 2, 3, 4]
+        assert timeline.end_ms(4) == 2500
+
+
+def test_silence_before_first_keyframe_and_duration(tmp_path):
+    path = tmp_path / "t.dstl"
+    write_timeline(path, [(1.0, 50, 60)], duration=3.0)
+    with Timeline(path) as timeline:
+        assert [timeline.record(i) for i in range(len(timeline))] == [(0, 0, 0), (1000, 50, 60)]
+        assert timeline.duration == 3.0
+
+
+def test_cursor_seeks_and_loops(tmp_path):
+    path = tmp_path / "t.dstl"
+    write_timeline(path, KEYFRAMES)
+    with Timeline(path) as timeline:
+        cursor = TimelineCursor(timeline, 0.3, loop=True, gain=255)
+        assert (cursor.left, cursor.right) == (10, 20)
+        assert cursor.remaining == pytest.approx(0.2)
+        cursor.seek(2.6)
+        assert (cursor.left, cursor.right, cursor.finished) == (0, 255, False)
+
+
+def test_import_json_script(tmp_path):
+    script = tmp_path / "script.json"
+    script.write_text(json.dumps({"keyframes": [{"t": 0.5, "left": 1, "right": 2}, [0, 3, 4]]}))
+    path = tmp_path / "t.dstl"
+    import_script(script, path)
+    with Timeline(path) as timeline:
+        assert [timeline.record(i) for i in range(len(timeline))] == [(0, 3, 4), (500, 1, 2)]
+
+
+@pytest.mark.parametrize(
+    "keyframes, chunk_size",
+    [([], 64), ([(1.0, 0, 0), (0.5, 0, 0)], 64), (KEYFRAMES, 0)],
+)
+def test_invalid_input_is_rejected(tmp_path, keyframes, chunk_size):
+    with pytest.raises(TimelineError):
+        write_timeline(tmp_path / "t.dstl", keyframes, chunk_size=chunk_size)
+
+
+def test_invalid_files_are_rejected(tmp_path):
+    path = tmp_path / "t.dstl"
+    write_timeline(path, KEYFRAMES)
+    data = path.read_bytes()
+    for content in (b"", data[:10], b"XXXX" + data[4:], data[:-3]):
+        path.write_bytes(content)
+        with pytest.raises(TimelineError):
+            Timeline(path)